@@ -0,0 +1,194 @@
+import os
+import sys
+import glob
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import cv2
+
+# 카메라 1개 검사에 허용하는 최대 시간(초). 응답 없는 장치 때문에 UI가 멈추지 않도록 제한합니다.
+PROBE_TIMEOUT = 0.8
+
+# V4L2 ioctl 번호 및 상수 (linux/videodev2.h)
+VIDIOC_QUERYCAP = 0x80685600
+VIDIOC_ENUM_FMT = 0xC0405602
+VIDIOC_ENUM_FRAMESIZES = 0xC02C564A
+V4L2_CAP_VIDEO_CAPTURE = 0x00000001
+V4L2_CAP_DEVICE_CAPS = 0x80000000
+V4L2_BUF_TYPE_VIDEO_CAPTURE = 1
+V4L2_FRMSIZE_TYPE_DISCRETE = 1
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def platform_backends() -> list[int]:
+    """현재 OS에서 시도할 VideoCapture 백엔드 순서를 반환합니다."""
+    if sys.platform.startswith('win'):
+        return [cv2.CAP_DSHOW, cv2.CAP_MSMF, cv2.CAP_ANY]
+    if sys.platform.startswith('linux'):
+        return [cv2.CAP_V4L2, cv2.CAP_ANY]
+    return [cv2.CAP_ANY]
+
+
+def _fourcc_str(code: int) -> str:
+    return ''.join(chr((code >> (8 * i)) & 0xFF) for i in range(4))
+
+
+def _v4l2_query(device: str) -> dict | None:
+    """V4L2 ioctl로 장치 이름, 캡처 가능 여부, 지원 포맷/해상도를 조회합니다."""
+    import fcntl  # Linux 전용
+
+    fd = os.open(device, os.O_RDWR | os.O_NONBLOCK)
+    try:
+        cap_buf = bytearray(104)
+        fcntl.ioctl(fd, VIDIOC_QUERYCAP, cap_buf)
+        card = bytes(cap_buf[16:48]).split(b'\0', 1)[0].decode(errors='ignore')
+        capabilities, device_caps = struct.unpack_from('<II', cap_buf, 84)
+        caps = device_caps if capabilities & V4L2_CAP_DEVICE_CAPS else capabilities
+        if not caps & V4L2_CAP_VIDEO_CAPTURE:
+            return None  # 메타데이터 전용 노드 등은 제외
+
+        formats = {}
+        fmt_index = 0
+        while True:
+            fmt_buf = bytearray(struct.pack('<III', fmt_index, V4L2_BUF_TYPE_VIDEO_CAPTURE, 0)) + bytearray(52)
+            try:
+                fcntl.ioctl(fd, VIDIOC_ENUM_FMT, fmt_buf)
+            except OSError:
+                break
+            pixel_format = struct.unpack_from('<I', fmt_buf, 44)[0]
+
+            sizes = []
+            size_index = 0
+            while True:
+                size_buf = bytearray(struct.pack('<II', size_index, pixel_format)) + bytearray(36)
+                try:
+                    fcntl.ioctl(fd, VIDIOC_ENUM_FRAMESIZES, size_buf)
+                except OSError:
+                    break
+                size_type, width, height = struct.unpack_from('<III', size_buf, 8)
+                if size_type != V4L2_FRMSIZE_TYPE_DISCRETE:
+                    # stepwise/continuous: 최대 해상도만 기록
+                    _min_w, max_w, _step_w, _min_h, max_h, _step_h = struct.unpack_from('<6I', size_buf, 12)
+                    sizes.append((max_w, max_h))
+                    break
+                sizes.append((width, height))
+                size_index += 1
+
+            formats[_fourcc_str(pixel_format)] = sizes
+            fmt_index += 1
+
+        return {'name': card, 'formats': formats}
+    finally:
+        os.close(fd)
+
+
+def _discover_v4l2() -> list[dict]:
+    """/dev/video* 노드를 직접 열거합니다 (인덱스를 무작정 열어보지 않음)."""
+    devices = []
+    nodes = [p for p in glob.glob('/dev/video*') if p[len('/dev/video'):].isdigit()]
+    for device in sorted(nodes, key=lambda p: int(p[len('/dev/video'):])):
+        suffix = device[len('/dev/video'):]
+        try:
+            info = _v4l2_query(device)
+        except OSError as e:
+            print(f"V4L2 query failed for {device}: {e}")
+            continue
+        if info is None:
+            continue
+        resolutions = sorted({size for sizes in info['formats'].values() for size in sizes})
+        devices.append({
+            'index': int(suffix),
+            'device': device,
+            'name': info['name'],
+            'backend': cv2.CAP_V4L2,
+            'formats': info['formats'],
+            'resolutions': resolutions,
+        })
+    return devices
+
+
+def _probe_index(index: int, backends: list[int]) -> dict | None:
+    """VideoCapture로 인덱스 하나를 열어보고, 처음 성공한 백엔드와 기본 해상도를 반환합니다."""
+    for backend in backends:
+        cap = cv2.VideoCapture(index, backend)
+        try:
+            if cap.isOpened():
+                width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+                height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+                return {
+                    'index': index,
+                    'device': str(index),
+                    'name': f"Camera {index}",
+                    'backend': backend,
+                    'formats': {},
+                    'resolutions': [(width, height)] if width and height else [],
+                }
+        finally:
+            cap.release()
+    return None
+
+
+def _discover_by_probe(max_to_check: int, timeout: float) -> list[dict]:
+    """
+    인덱스 0..max_to_check-1 을 스레드 풀에서 동시에 검사합니다.
+    timeout 안에 응답하지 않은 장치는 결과에서 제외하고 기다리지 않습니다.
+    """
+    backends = platform_backends()
+    pool = ThreadPoolExecutor(max_workers=max_to_check, thread_name_prefix="cam-probe")
+    futures = [pool.submit(_probe_index, i, backends) for i in range(max_to_check)]
+    done, not_done = wait(futures, timeout=timeout)
+    pool.shutdown(wait=False, cancel_futures=True)  # 멈춘 프로브는 백그라운드에서 정리됨
+    if not_done:
+        print(f"Camera probe: {len(not_done)} device(s) did not respond within {timeout:.1f}s")
+
+    devices = []
+    for future in done:
+        try:
+            info = future.result()
+        except Exception as e:
+            print(f"Camera probe error: {e}")
+            continue
+        if info is not None:
+            devices.append(info)
+    return sorted(devices, key=lambda d: d['index'])
+
+
+def discover_cameras(refresh: bool = False, max_to_check: int = 10, timeout: float = PROBE_TIMEOUT) -> list[dict]:
+    """
+    연결된 카메라 목록(인덱스, 이름, 백엔드, 지원 해상도)을 반환합니다.
+    결과는 캐시되며, refresh=True 일 때만 다시 검색합니다.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is not None and not refresh:
+            return list(_cache)
+
+        start = time.perf_counter()
+        devices = []
+        if sys.platform.startswith('linux') and glob.glob('/dev/video*'):
+            devices = _discover_v4l2()
+        if not devices:
+            devices = _discover_by_probe(max_to_check, timeout)
+        print(f"Camera discovery found {len(devices)} device(s) in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        _cache = devices
+        return list(devices)
+
+
+def cached_backend(index: int) -> int | None:
+    """검색 캐시에 기록된 해당 인덱스의 백엔드를 반환합니다 (검색 전이면 None)."""
+    if _cache is None:
+        return None
+    for device in _cache:
+        if device['index'] == index:
+            return device['backend']
+    return None
+
+
+def cached_cameras() -> list[dict]:
+    """검색 없이 캐시된 카메라 목록만 반환합니다 (검색 전이면 빈 리스트)."""
+    return list(_cache) if _cache is not None else []
@@ -1,38 +1,130 @@
 import cv2
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+import camera_discovery
+from replay_source import ReplaySource
+
+# 캡처 프로파일 기본값 (config.json 카메라별 'capture' 항목으로 덮어씀)
+DEFAULT_CAPTURE_PROFILE = {
+    "width": 1280,
+    "height": 720,
+    "fps": 30,
+    "fourcc": "MJPG",   # 같은 USB 허브의 카메라 2대가 대역폭을 나눠 쓰도록 압축 포맷 사용
+    "buffer_size": 1    # 드라이버 버퍼 최소화 -> 항상 최신 프레임
+}
+
+# 흑백 센서 포맷 (capture.fourcc 에 지정하면 카메라에서 바로 1채널 프레임을 받음)
+MONO_FOURCCS = ("GREY", "Y800", "Y8  ")
+
+def _fourcc_to_str(value: float) -> str:
+    code = int(value)
+    return ''.join(chr((code >> (8 * i)) & 0xFF) for i in range(4)) if code else ""
+
+def apply_capture_profile(cap, profile: dict) -> dict:
+    """
+    캡처 포맷(FOURCC -> 해상도 -> FPS -> 버퍼 크기 순)을 설정하고,
+    드라이버가 실제로 적용한 값을 읽어 반환합니다.
+    값이 0/빈 문자열인 항목은 드라이버 기본값을 유지합니다.
+    """
+    merged = {**DEFAULT_CAPTURE_PROFILE, **(profile or {})}
+
+    fourcc = str(merged.get("fourcc") or "").upper()
+    if len(fourcc) == 4:
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+    if merged.get("width") and merged.get("height"):
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, int(merged["width"]))
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, int(merged["height"]))
+    if merged.get("fps"):
+        cap.set(cv2.CAP_PROP_FPS, float(merged["fps"]))
+    if merged.get("buffer_size"):
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, int(merged["buffer_size"]))
+
+    actual = {
+        "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        "fps": round(cap.get(cv2.CAP_PROP_FPS), 2),
+        "fourcc": _fourcc_to_str(cap.get(cv2.CAP_PROP_FOURCC)),
+        "buffer_size": int(cap.get(cv2.CAP_PROP_BUFFERSIZE)),
+    }
+
+    # 요청값과 다른 항목 경고 (드라이버가 지원하지 않으면 가까운 값으로 대체됨)
+    for key, requested in merged.items():
+        if not requested:
+            continue
+        if key == "fourcc":
+            mismatch = len(fourcc) == 4 and actual["fourcc"] and actual["fourcc"].upper() != fourcc
+        elif key == "fps":
+            mismatch = actual["fps"] > 0 and abs(actual["fps"] - float(requested)) > 0.5
+        else:
+            mismatch = actual.get(key, 0) > 0 and actual.get(key) != int(requested)
+        if mismatch:
+            print(f"Capture profile: requested {key}={requested}, driver accepted {actual[key]}")
+    return actual
+
+def to_gray(frame: np.ndarray) -> np.ndarray:
+    """프레임을 2차원(H, W) 흑백 배열로 만듭니다. 이미 흑백이면 복사하지 않습니다."""
+    if frame.ndim == 2:
+        return frame
+    if frame.shape[2] == 1:
+        return frame[:, :, 0]
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
 
 class CameraManager:
     """두 개의 USB 카메라를 관리하는 클래스"""
-    def __init__(self):
+    def __init__(self, grayscale: bool = False):
         self.cam_front = None
         self.cam_back = None
+        # 흑백 모드: 프레임을 캡처 직후 한 번만 1채널로 변환 (이후 저장/추론/표시는 모두 1채널)
+        self.grayscale = grayscale
+        self.negotiated = {}  # 카메라별 실제 적용된 캡처 포맷 {"FRONT": {...}, "BACK": {...}}
 
     def open(self, front_config: dict, back_config: dict) -> bool:
-        """설정값(USB/RTSP)에 따라 두 카메라를 엽니다."""
+        """설정값(USB/RTSP/REPLAY)에 따라 두 카메라를 엽니다."""
         self.close()  # 기존 연결이 있다면 해제
+        self.negotiated = {}
 
-        def _open_cam(cfg):
+        def _open_cam(cfg, camera_name):
             src_type = cfg.get('type', 'USB')
             address = cfg.get('address', 0)
             
             if src_type == 'USB':
                 idx = int(address)
-                # Fallback Strategy: DSHOW -> MSMF -> ANY
-                backends = [cv2.CAP_DSHOW, cv2.CAP_MSMF, cv2.CAP_ANY]
+                # Fallback Strategy: (검색 시 성공한 백엔드) -> OS별 기본 순서 (Windows: DSHOW -> MSMF -> ANY)
+                backends = camera_discovery.platform_backends()
+                known = camera_discovery.cached_backend(idx)
+                if known is not None:
+                    backends = [known] + [b for b in backends if b != known]
                 for backend in backends:
                     cap = cv2.VideoCapture(idx, backend)
                     if cap.isOpened():
                         print(f"Camera {idx} opened with backend {backend}")
+                        self.negotiated[camera_name] = apply_capture_profile(cap, cfg.get('capture'))
+                        if self.grayscale and self.negotiated[camera_name]["fourcc"].upper() in MONO_FOURCCS:
+                            # 흑백 포맷(GREY/Y800)은 RGB 변환 없이 그대로 받음
+                            cap.set(cv2.CAP_PROP_CONVERT_RGB, 0)
+                        print(f"{camera_name} capture format: {self.negotiated[camera_name]}")
                         return cap
                     cap.release()
                 print(f"Failed to open Camera {idx} with any backend.")
                 return cv2.VideoCapture(idx) # Return closed capture as last resort
+            elif src_type == 'REPLAY':
+                # 녹화 세션(폴더/동영상) 재생 - 카메라 없이 부하 테스트용
+                source = ReplaySource(address, camera_name,
+                                      speed=cfg.get('replay_speed', 'realtime'),
+                                      loop=cfg.get('replay_loop', True),
+                                      grayscale=self.grayscale)
+                print(f"Replay source {address} opened={source.isOpened()}")
+                return source
             else:
                 # RTSP 등 네트워크 스트림
                 return cv2.VideoCapture(str(address))
 
-        self.cam_front = _open_cam(front_config)
-        self.cam_back = _open_cam(back_config)
+        # 두 카메라를 동시에 열어 대기 시간을 줄임
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            front_future = pool.submit(_open_cam, front_config, "FRONT")
+            back_future = pool.submit(_open_cam, back_config, "BACK")
+            self.cam_front = front_future.result()
+            self.cam_back = back_future.result()
 
         if not self.cam_front.isOpened() or not self.cam_back.isOpened():
             self.close()
@@ -56,21 +148,20 @@ class CameraManager:
 
         ret1, frame1 = self.cam_front.read()
         ret2, frame2 = self.cam_back.read()
+        frame1 = frame1 if ret1 else None
+        frame2 = frame2 if ret2 else None
 
-        return frame1 if ret1 else None, frame2 if ret2 else None
+        if self.grayscale:
+            frame1 = to_gray(frame1) if frame1 is not None else None
+            frame2 = to_gray(frame2) if frame2 is not None else None
+        return frame1, frame2
 
     @staticmethod
-    def get_available_cameras(max_to_check: int = 10) -> list[int]:
+    def get_available_cameras(max_to_check: int = 10, refresh: bool = False) -> list[int]:
         """
-        0부터 max_to_check까지 순회하며 열리는 카메라 인덱스 리스트를 반환합니다.
-        DSHOW 등 특정 백엔드 강제보다 기본값(ANY)으로 검색하여 호환성을 높입니다.
+        사용 가능한 카메라 인덱스 리스트를 반환합니다.
+        Linux에서는 /dev/video* 를 직접 열거하고, 그 외에는 0..max_to_check-1 을 병렬로 검사합니다.
+        결과는 캐시되며 refresh=True 일 때만 다시 검색합니다.
         """
-        available_indices = []
-        for i in range(max_to_check):
-            # 검색 시에는 CAP_DSHOW 강제보다는 ANY(자동) 혹은 MSMF/DSHOW 순차 시도가 안전할 수 있음.
-            # 하지만 간단히 CAP_ANY(0)로 시도하여 열리는지 확인.
-            cap = cv2.VideoCapture(i) 
-            if cap.isOpened():
-                available_indices.append(i)
-                cap.release()
-        return available_indices
\ No newline at end of file
+        devices = camera_discovery.discover_cameras(refresh=refresh, max_to_check=max_to_check)
+        return [d['index'] for d in devices]
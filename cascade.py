@@ -0,0 +1,225 @@
+"""
+2단계 캐스케이드: 작은 타일 분류기(결함/정상)가 먼저 프레임을 격자 타일로 검사하고,
+결함 의심 타일이 있는 프레임(또는 그 타일 영역)만 YOLO 검출기로 넘깁니다.
+
+config.json 예:
+    "cascade": {"enabled": true, "classifier_path": "runs/classify/tile_gate/weights/best.pt",
+                "tile_size": 64, "threshold": 0.12, "recall_target": 0.99, "mode": "frame"}
+"""
+import glob
+import os
+
+import cv2
+import numpy as np
+
+from defect import Defect
+
+TILE_CLASSES = ("clean", "defect")
+
+
+def tile_grid(height: int, width: int, tile: int) -> list[tuple[int, int]]:
+    """프레임을 덮는 타일의 좌상단 (y, x) 목록. 마지막 타일은 가장자리에 맞춰 겹치게 배치합니다."""
+    def _starts(size):
+        if size <= tile:
+            return [0]
+        starts = list(range(0, size - tile + 1, tile))
+        if starts[-1] != size - tile:
+            starts.append(size - tile)
+        return starts
+    return [(y, x) for y in _starts(height) for x in _starts(width)]
+
+
+def read_yolo_boxes(label_path: str, width: int, height: int) -> list[tuple[float, float, float, float]]:
+    """YOLO 라벨(정규화 중심좌표)을 픽셀 xyxy 박스로 읽습니다."""
+    boxes = []
+    if not os.path.exists(label_path):
+        return boxes
+    with open(label_path) as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) != 5:
+                continue
+            _cls, cx, cy, w, h = (float(v) for v in parts)
+            boxes.append(((cx - w / 2) * width, (cy - h / 2) * height, (cx + w / 2) * width, (cy + h / 2) * height))
+    return boxes
+
+
+def tile_is_defect(y: int, x: int, tile: int, boxes, min_overlap: float = 0.25) -> bool:
+    """타일 면적 또는 박스 면적 대비 겹침이 min_overlap 이상이면 결함 타일로 봅니다 (작은 결함 포함)."""
+    for x1, y1, x2, y2 in boxes:
+        inter_w = min(x + tile, x2) - max(x, x1)
+        inter_h = min(y + tile, y2) - max(y, y1)
+        if inter_w <= 0 or inter_h <= 0:
+            continue
+        inter = inter_w * inter_h
+        box_area = max((x2 - x1) * (y2 - y1), 1e-6)
+        if inter >= min_overlap * tile * tile or inter >= min_overlap * box_area:
+            return True
+    return False
+
+
+def build_tile_dataset(src_root: str = './neu_yolo_data', out_root: str = './neu_tile_data',
+                       tile: int = 64, min_overlap: float = 0.25) -> dict:
+    """
+    neu_yolo_data(convert.py 출력)의 라벨로 타일 분류 데이터셋을 만듭니다.
+    출력 구조는 ultralytics 분류 형식: out_root/{train,val}/{clean,defect}/*.png
+    """
+    counts = {}
+    for split in ('train', 'val'):
+        for cls_name in TILE_CLASSES:
+            os.makedirs(os.path.join(out_root, split, cls_name), exist_ok=True)
+        images = sorted(glob.glob(os.path.join(src_root, 'images', split, '*')))
+        for img_path in images:
+            img = cv2.imread(img_path)
+            if img is None:
+                continue
+            h, w = img.shape[:2]
+            file_id = os.path.splitext(os.path.basename(img_path))[0]
+            boxes = read_yolo_boxes(os.path.join(src_root, 'labels', split, file_id + '.txt'), w, h)
+            for y, x in tile_grid(h, w, tile):
+                cls_name = 'defect' if tile_is_defect(y, x, tile, boxes, min_overlap) else 'clean'
+                out_path = os.path.join(out_root, split, cls_name, f"{file_id}_{y}_{x}.png")
+                cv2.imwrite(out_path, img[y:y + tile, x:x + tile])
+                counts[(split, cls_name)] = counts.get((split, cls_name), 0) + 1
+    return counts
+
+
+def calibrate_threshold(defect_scores: np.ndarray, recall_target: float) -> float:
+    """결함 타일 중 recall_target 비율 이상이 통과하도록 하는 가장 높은 임계값을 반환합니다."""
+    scores = np.sort(np.asarray(defect_scores, dtype=np.float64))
+    if scores.size == 0:
+        return 0.0
+    index = int(np.floor((1.0 - recall_target) * scores.size))
+    return float(scores[min(index, scores.size - 1)])
+
+
+class TileGate:
+    """타일 분류기로 프레임의 타일별 결함 확률을 계산합니다 (한 번의 배치 호출)."""
+    def __init__(self, classifier_path: str, tile_size: int = 64, device: str = 'cpu'):
+        from ultralytics import YOLO
+
+        self.model = YOLO(classifier_path)
+        self.tile_size = tile_size
+        self.device = device
+        names = self.model.names
+        names = dict(enumerate(names)) if isinstance(names, (list, tuple)) else names
+        self.defect_index = next(int(k) for k, v in names.items() if v == 'defect')
+
+    def score_tiles(self, tiles: list[np.ndarray]) -> np.ndarray:
+        if not tiles:
+            return np.zeros(0, dtype=np.float32)
+        # 타일 분류기는 3채널 모델: 흑백 프레임의 타일만 작게 변환
+        tiles = [cv2.cvtColor(t, cv2.COLOR_GRAY2BGR) if t.ndim == 2 else t for t in tiles]
+        results = self.model(tiles, imgsz=self.tile_size, verbose=False, device=self.device)
+        return np.array([float(r.probs.data[self.defect_index]) for r in results], dtype=np.float32)
+
+    def tile_scores(self, image: np.ndarray) -> tuple[list[tuple[int, int]], np.ndarray]:
+        h, w = image.shape[:2]
+        positions = tile_grid(h, w, self.tile_size)
+        tiles = [image[y:y + self.tile_size, x:x + self.tile_size] for y, x in positions]
+        return positions, self.score_tiles(tiles)
+
+
+class CascadeDetector:
+    """
+    타일 분류기 게이트 + 검출기.
+    mode "frame": 의심 타일이 하나라도 있으면 전체 프레임 검출 (기본, 정확도 동일)
+    mode "tiles": 의심 타일 주변(context 여백 포함)만 잘라 배치 검출 후 원본 좌표로 되돌림
+    """
+    def __init__(self, detector, cascade_config: dict, load_model: bool = True):
+        self.detector = detector
+        self.config = detector.config
+        self.cascade_config = cascade_config
+        self.threshold = float(cascade_config.get('threshold', 0.5))
+        self.mode = cascade_config.get('mode', 'frame')
+        self.context = int(cascade_config.get('context', 16))
+        self.gate = None
+        self.frames = 0
+        self.frames_skipped = 0
+        self.tiles_total = 0
+        self.tiles_flagged = 0
+        if load_model:
+            self._load_gate()
+
+    def __getattr__(self, name):
+        return getattr(self.detector, name)
+
+    def _load_gate(self):
+        try:
+            self.gate = TileGate(self.cascade_config['classifier_path'],
+                                 int(self.cascade_config.get('tile_size', 64)),
+                                 getattr(self.detector, 'device', 'cpu'))
+        except Exception as e:
+            print(f"Error loading tile classifier (cascade disabled): {e}")
+            self.gate = None
+
+    def load_model(self):
+        self.detector.load_model()
+        self._load_gate()
+
+    def detect(self, image: np.ndarray, camera_name: str) -> list[Defect]:
+        if image is None:
+            return []
+        if self.gate is None:
+            return self.detector.detect(image, camera_name)  # 게이트가 없으면 항상 검출 (결함을 놓치지 않음)
+
+        positions, scores = self.gate.tile_scores(image)
+        flagged = scores >= self.threshold
+        self.frames += 1
+        self.tiles_total += len(scores)
+        self.tiles_flagged += int(flagged.sum())
+        if not flagged.any():
+            self.frames_skipped += 1
+            return []
+
+        if self.mode != 'tiles' or not hasattr(self.detector, 'input_size') or flagged.mean() > 0.5:
+            return self.detector.detect(image, camera_name)
+        return self._detect_tiles(image, camera_name, [p for p, f in zip(positions, flagged) if f])
+
+    def _tile_imgsz(self, height: int, width: int, crop: int) -> int:
+        """
+        타일 크롭의 추론 입력 크기. 전체 프레임 추론과 같은 축척(imgsz / 프레임 긴 변)이 되도록
+        크롭 크기를 줄여 stride(32) 배수로 맞춥니다 (크롭을 640으로 키우면 타일마다 전체 크기 추론 비용).
+        """
+        scale = self.detector.input_size() / max(height, width)
+        return max(32, int(np.ceil(crop * scale / 32)) * 32)
+
+    def _detect_tiles(self, image: np.ndarray, camera_name: str, positions) -> list[Defect]:
+        """
+        의심 타일 영역만 배치로 검출하고, 타일 경계에서 중복된 박스는 클래스별 NMS로 합칩니다.
+        크롭은 크롭 크기에 맞춘 imgsz로 추론하며 TTA 2차 추론은 하지 않습니다 (타일 모드는 비용 절감용).
+        """
+        from detector import greedy_nms
+
+        h, w = image.shape[:2]
+        tile, pad = self.gate.tile_size, self.context
+        crops, offsets = [], []
+        for y, x in positions:
+            y0, x0 = max(0, y - pad), max(0, x - pad)
+            y1, x1 = min(h, y + tile + pad), min(w, x + tile + pad)
+            crops.append(image[y0:y1, x0:x1])
+            offsets.append((x0, y0))
+
+        imgsz = self._tile_imgsz(h, w, tile + 2 * pad)
+        all_xyxy, all_scores, all_cls = [], [], []
+        for (xyxy, scores, class_ids), (ox, oy) in zip(self.detector._predict_batch(crops, imgsz, refine=False),
+                                                       offsets):
+            all_xyxy.append(xyxy + np.array([ox, oy, ox, oy], dtype=xyxy.dtype))
+            all_scores.append(scores)
+            all_cls.append(class_ids)
+        xyxy = np.concatenate(all_xyxy) if all_xyxy else np.zeros((0, 4), dtype=np.float32)
+        scores = np.concatenate(all_scores) if all_scores else np.zeros(0, dtype=np.float32)
+        class_ids = np.concatenate(all_cls) if all_cls else np.zeros(0, dtype=np.int64)
+
+        keep = np.zeros(len(scores), dtype=bool)
+        for cls_id in np.unique(class_ids):
+            idx = np.flatnonzero(class_ids == cls_id)
+            keep[idx[greedy_nms(xyxy[idx], scores[idx], float(self.detector.class_iou[cls_id]))]] = True
+        return self.detector._to_defects((xyxy[keep], scores[keep], class_ids[keep]), camera_name)
+
+    def cascade_stats(self) -> dict:
+        return {
+            "frames": self.frames,
+            "frames_skipped": self.frames_skipped,
+            "tile_pass_rate": self.tiles_flagged / self.tiles_total if self.tiles_total else 0.0,
+        }
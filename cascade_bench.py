@@ -0,0 +1,134 @@
+"""
+캐스케이드 임계값 보정 및 벤치마크.
+
+    python cascade_bench.py calibrate [--recall 0.99] [--write]
+        neu_tile_data/val 의 결함 타일 점수로 재현율 목표를 만족하는 게이트 임계값을 계산합니다.
+    python cascade_bench.py bench [--clean data/captures]
+        NEU-DET val + 정상(clean) 캡처에서 검출기 단독 대비 캐스케이드의
+        프레임당 평균 시간과 재현율 손실을 측정합니다.
+"""
+import argparse
+import glob
+import os
+import time
+
+import cv2
+import numpy as np
+
+import config
+from cascade import CascadeDetector, TileGate, read_yolo_boxes, calibrate_threshold
+from detector import DefectDetector
+
+
+def _iou(a, b) -> float:
+    inter_w = min(a[2], b[2]) - max(a[0], b[0])
+    inter_h = min(a[3], b[3]) - max(a[1], b[1])
+    if inter_w <= 0 or inter_h <= 0:
+        return 0.0
+    inter = inter_w * inter_h
+    return inter / ((a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter)
+
+
+def _matched(gt_boxes, defects, iou_threshold: float = 0.5) -> int:
+    """클래스 구분 없이 IoU 기준으로 검출된 GT 박스 수."""
+    det_boxes = [(x, y, x + w, y + h) for x, y, w, h in (d.bbox for d in defects)]
+    return sum(1 for gt in gt_boxes if any(_iou(gt, det) >= iou_threshold for det in det_boxes))
+
+
+def calibrate(args, app_config: dict):
+    cascade_config = app_config.get('cascade', {})
+    gate = TileGate(cascade_config['classifier_path'], int(cascade_config.get('tile_size', 64)))
+
+    def _scores(cls_name):
+        paths = sorted(glob.glob(os.path.join(args.tiles, 'val', cls_name, '*.png')))
+        scores = []
+        for i in range(0, len(paths), 256):
+            scores.append(gate.score_tiles([cv2.imread(p) for p in paths[i:i + 256]]))
+        return np.concatenate(scores) if scores else np.zeros(0)
+
+    defect_scores = _scores('defect')
+    clean_scores = _scores('clean')
+    threshold = calibrate_threshold(defect_scores, args.recall)
+    print(f"defect tiles: {len(defect_scores)}, clean tiles: {len(clean_scores)}")
+    print(f"threshold for recall >= {args.recall}: {threshold:.4f}")
+    if len(defect_scores):
+        print(f"  tile recall: {(defect_scores >= threshold).mean():.4f}")
+    if len(clean_scores):
+        print(f"  clean tiles passed to detector: {(clean_scores >= threshold).mean():.4f}")
+
+    if args.write:
+        cascade_config['threshold'] = round(threshold, 4)
+        cascade_config['recall_target'] = args.recall
+        app_config['cascade'] = cascade_config
+        config.save_config(app_config)
+        print(f"saved to {config.CONFIG_FILE}")
+
+
+def bench(args, app_config: dict):
+    detector = DefectDetector(app_config)
+    cascade = CascadeDetector(detector, app_config.get('cascade', {}))
+
+    frames = []  # (image, gt_boxes or None)
+    for img_path in sorted(glob.glob(os.path.join(args.data, 'images', 'val', '*')))[:args.limit]:
+        img = cv2.imread(img_path)
+        if img is None:
+            continue
+        file_id = os.path.splitext(os.path.basename(img_path))[0]
+        h, w = img.shape[:2]
+        frames.append((img, read_yolo_boxes(os.path.join(args.data, 'labels', 'val', file_id + '.txt'), w, h)))
+    for img_path in sorted(glob.glob(os.path.join(args.clean, '*.png')) + glob.glob(os.path.join(args.clean, '*.jpg'))):
+        img = cv2.imread(img_path)
+        if img is not None:
+            frames.append((img, None))
+
+    totals = {"detector": 0.0, "cascade": 0.0}
+    found = {"detector": 0, "cascade": 0}
+    gt_total = 0
+    for img, gt_boxes in frames:
+        for name, pipeline in (("detector", detector), ("cascade", cascade)):
+            start = time.perf_counter()
+            defects = pipeline.detect(img, "FRONT")
+            totals[name] += time.perf_counter() - start
+            if gt_boxes:
+                found[name] += _matched(gt_boxes, defects)
+        if gt_boxes:
+            gt_total += len(gt_boxes)
+
+    n = max(len(frames), 1)
+    recall = {name: found[name] / gt_total if gt_total else 0.0 for name in found}
+    stats = cascade.cascade_stats()
+    print(f"frames: {len(frames)} (labelled GT boxes: {gt_total})")
+    print(f"{'pipeline':<10} {'ms/frame':>9} {'recall@0.5':>11}")
+    for name in ("detector", "cascade"):
+        print(f"{name:<10} {totals[name] / n * 1000:>9.1f} {recall[name]:>11.4f}")
+    print(f"recall loss: {recall['detector'] - recall['cascade']:.4f}")
+    print(f"frames skipped by gate: {stats['frames_skipped']}/{stats['frames']}, "
+          f"tile pass rate: {stats['tile_pass_rate']:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="캐스케이드 보정/벤치마크")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_cal = sub.add_parser("calibrate")
+    p_cal.add_argument("--tiles", default="./neu_tile_data")
+    p_cal.add_argument("--recall", type=float, default=None, help="타일 재현율 목표 (기본: config recall_target)")
+    p_cal.add_argument("--write", action="store_true")
+
+    p_bench = sub.add_parser("bench")
+    p_bench.add_argument("--data", default="./neu_yolo_data")
+    p_bench.add_argument("--clean", default=str(config.CAPTURE_DIR), help="결함 없는 캡처 폴더")
+    p_bench.add_argument("--limit", type=int, default=None, help="사용할 val 이미지 수")
+
+    args = parser.parse_args()
+    app_config = config.load_config()
+    if args.command == "calibrate":
+        if args.recall is None:
+            args.recall = float(app_config.get('cascade', {}).get('recall_target', 0.99))
+        calibrate(args, app_config)
+    else:
+        bench(args, app_config)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+코일 결함 맵 리뷰 도구.
+
+    python coil_review.py --list
+    python coil_review.py COIL_ID --from-m 120 --to-m 125 [--across 0 800] [--camera FRONT]
+    python coil_review.py COIL_ID --from-m 120 --to-m 125 --export data/results/coil_120m.png
+
+필요한 구간만 메모리 맵에서 읽으므로 긴 코일도 전체를 메모리에 올리지 않습니다.
+"""
+import argparse
+from pathlib import Path
+
+import cv2
+
+import config
+from overlay_renderer import STATUS_COLORS
+from sheet_map import CoilMap
+
+
+def export_region(coil: CoilMap, camera: str, along0: float, along1: float, out_path: str, defects) -> bool:
+    """모자이크 구간에 결함 박스를 그려 이미지로 저장합니다."""
+    region = coil.mosaic_region(camera, along0, along1)
+    if region.size == 0:
+        return False
+    canvas = cv2.cvtColor(region, cv2.COLOR_GRAY2BGR)  # 구간 뷰만 복사
+    scale = coil.scale
+    for d in defects:
+        if d.camera != camera:
+            continue
+        x1, y1 = int(d.across_mm * scale), int((d.along_mm - along0) * scale)
+        x2, y2 = int((d.across_mm + d.width_mm) * scale) + 1, int((d.along_mm - along0 + d.length_mm) * scale) + 1
+        cv2.rectangle(canvas, (x1, y1), (x2, y2), STATUS_COLORS.get(d.status, (0, 255, 255)), 1)
+    Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+    return cv2.imwrite(out_path, canvas)
+
+
+def main():
+    app_config = config.load_config()
+    default_root = app_config.get('sheet_map', {}).get('root', str(config.DATA_DIR / "coils"))
+
+    parser = argparse.ArgumentParser(description="코일 결함 맵 조회")
+    parser.add_argument("coil_id", nargs="?")
+    parser.add_argument("--root", default=default_root)
+    parser.add_argument("--list", action="store_true", help="기록된 코일 목록")
+    parser.add_argument("--from-m", type=float, default=0.0, help="길이 방향 시작 위치(m)")
+    parser.add_argument("--to-m", type=float, default=None, help="길이 방향 끝 위치(m, 기본: 코일 끝)")
+    parser.add_argument("--across", type=float, nargs=2, metavar=("MIN_MM", "MAX_MM"))
+    parser.add_argument("--camera", choices=CoilMap.CAMERAS)
+    parser.add_argument("--all", action="store_true", help="추적 ID 중복 관측도 모두 표시")
+    parser.add_argument("--export", help="모자이크 구간 이미지 저장 경로 (--camera 기본 FRONT)")
+    args = parser.parse_args()
+
+    if args.list or not args.coil_id:
+        for meta in sorted(Path(args.root).glob("*/meta.json")):
+            coil = CoilMap.open(args.root, meta.parent.name)
+            print(f"{coil.coil_id}: {coil.length_mm() / 1000:.1f} m, {len(coil.index.defects)} observations")
+            coil.close()
+        return
+
+    coil = CoilMap.open(args.root, args.coil_id)
+    along0 = args.from_m * 1000
+    along1 = args.to_m * 1000 if args.to_m is not None else coil.length_mm()
+    across0, across1 = args.across if args.across else (float("-inf"), float("inf"))
+    defects = coil.query(along0, along1, across0, across1, args.camera, unique=not args.all)
+
+    print(f"{'camera':<6} {'type':<6} {'status':<8} {'along m':>9} {'across mm':>10} {'len mm':>7} {'score':>6} {'track':>6}")
+    for d in defects:
+        print(f"{d.camera:<6} {d.defect_type:<6} {d.status:<8} {d.along_mm / 1000:>9.3f} {d.across_mm:>10.1f} "
+              f"{d.length_mm:>7.1f} {d.score:>6.2f} {d.track_id if d.track_id is not None else '-':>6}")
+    print(f"{len(defects)} defects in [{along0 / 1000:.3f}, {along1 / 1000:.3f}) m")
+
+    if args.export:
+        camera = args.camera or "FRONT"
+        if export_region(coil, camera, along0, along1, args.export, defects):
+            print(f"saved: {args.export}")
+        else:
+            print("no mosaic data in this region")
+    coil.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -25,10 +25,44 @@ NUT_SIZE_MIN = 10.0       # 너트 최소 크기
 def load_config() -> dict:
     """config.json 파일에서 설정을 불러옵니다."""
     default_config = {
-        "front": {"type": "USB", "address": 0, "pixels_per_mm": 10.0},
-        "back": {"type": "USB", "address": 1, "pixels_per_mm": 10.0},
+        "front": {"type": "USB", "address": 0, "pixels_per_mm": 10.0,
+                  "capture": {"width": 1280, "height": 720, "fps": 30, "fourcc": "MJPG", "buffer_size": 1}},
+        "back": {"type": "USB", "address": 1, "pixels_per_mm": 10.0,
+                 "capture": {"width": 1280, "height": 720, "fps": 30, "fourcc": "MJPG", "buffer_size": 1}},
         "save_path": str(CAPTURE_DIR),
-        "model_path": "yolov8n.pt"
+        "model_path": "yolov8n.pt",
+        "grayscale": False,
+        "confidence_threshold": 0.5,
+        "iou_threshold": 0.7,
+        "max_det": 100,
+        "direct_input": False,
+        "class_thresholds": {},
+        "inference_process": False,
+        "inference_server": "",
+        "resources": {"enabled": False, "ui": {"cores": ""}, "capture": {"cores": ""},
+                      "inference": {"cores": "", "threads": 0, "interop_threads": 1}, "opencv_threads": 2},
+        "cascade": {"enabled": False, "classifier_path": "runs/classify/tile_gate/weights/best.pt",
+                    "tile_size": 64, "threshold": 0.1, "recall_target": 0.99, "mode": "frame"},
+        "result_cache": {"enabled": False, "tolerance": 2, "max_entries": 32, "ttl_seconds": 10.0},
+        "tta": {"enabled": False, "band": 0.15, "scales": [1.0, 1.5], "flips": ["h", "v"], "context": 0.5,
+                "crop_size": 320, "match_iou": 0.3, "max_rois": 8},
+        "spc": {"window": 50, "ewma_alpha": 0.2, "compression": 100,
+                "spec_limits": {"crack": {"usl": CRACK_LIMIT_OK}, "hole": {"usl": HOLE_LIMIT_NG}},
+                "shifts": {"A": "06:00-14:00", "B": "14:00-22:00", "C": "22:00-06:00"}, "keep_shifts": 21},
+        "crop_store": {"enabled": False, "root": str(DATA_DIR / "crops"), "context": 0.5, "min_crop": 64,
+                       "crop_quality": 95, "thumb_width": 320, "thumb_quality": 40, "queue_below": 0.6},
+        "monitor": {"enabled": False, "host": "0.0.0.0", "port": 8090, "width": 640, "quality": 70, "max_fps": 10,
+                    "write_timeout": 2.0, "send_buffer": 262144},
+        "soak": {"max_rss_mb_per_hour": 20.0, "max_traced_mb_per_hour": 5.0, "max_objects_per_hour": 5000,
+                 "max_handles_per_hour": 1.0, "max_widgets_per_hour": 1.0, "max_log_rows_per_hour": 1.0,
+                 "max_latency_ms_per_hour": 5.0, "max_rss_step_mb": 256.0, "max_traced_step_mb": 16.0,
+                 "max_errors": 0},
+        "quality_gate": {"enabled": False, "min_sharpness": 15.0, "max_clip_low": 0.2, "max_clip_high": 0.05,
+                         "max_specular": 0.02, "max_recaptures": 2, "sample_width": 320},
+        "tracking": {"enabled": False, "conveyor_speed_mm_s": 0.0, "direction": [0, 1],
+                     "iou_threshold": 0.3, "max_center_dist_mm": 5.0, "max_age": 2, "max_gap_seconds": 2.0},
+        "sheet_map": {"enabled": False, "root": str(DATA_DIR / "coils"), "mosaic_px_per_mm": 0.5,
+                      "strip_width_mm": 1600, "along_axis": "y", "index_cell_mm": 500, "frame_pitch_mm": None}
     }
 
     if CONFIG_FILE.exists():
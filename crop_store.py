@@ -0,0 +1,293 @@
+"""
+결함 크롭 저장소와 능동 학습(active learning) 수집.
+
+전체 프레임 PNG 대신 결함 ROI 크롭(주변 여백 포함)과 프레임 전체의 저화질 썸네일만 저장합니다.
+파일 이름은 인코딩된 내용의 SHA-1 이므로 같은 크롭은 한 번만 저장됩니다 (내용 주소 저장소).
+
+    root/objects/ab/ab12....jpg   크롭 / 썸네일
+    root/index.jsonl              크롭 레코드 (카메라, 유형, 모델 클래스, 점수, 프레임/크롭 좌표, 크롭 안 박스들)
+    root/queue.jsonl              라벨링 대기열 이벤트 (낮은 신뢰도 자동 등록, 작업자 오검출/검수 요청, 라벨 지정)
+    root/exported.txt             neu_yolo_data로 내보낸 레코드 id
+
+라벨링 대기열의 크롭은 convert.py 출력과 같은 형식(images/<split>/*.jpg, labels/<split>/*.txt,
+클래스 번호는 convert.CLASSES 순서)으로 바로 내보내 증분 파인튜닝에 사용합니다.
+작업자가 오검출로 표시한 크롭은 그 결함 박스만 빼고 내보냅니다 (크롭 안의 다른 결함 박스는 유지,
+다른 박스가 없으면 빈 라벨 파일 = 배경 이미지).
+
+사용 예:
+    python crop_store.py stats
+    python crop_store.py queue
+    python crop_store.py label <id> scratches          (또는 background)
+    python crop_store.py export --out neu_yolo_data --split train
+
+config.json 예:
+    "crop_store": {"enabled": true, "root": "data/crops", "context": 0.5, "min_crop": 64,
+                   "crop_quality": 95, "thumb_width": 320, "thumb_quality": 40, "queue_below": 0.6}
+"""
+import argparse
+import hashlib
+import json
+import shutil
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from convert import CLASSES, convert_box
+
+BACKGROUND = "background"   # 오검출(정상) 라벨 -> 해당 결함 박스를 라벨에서 제외
+
+
+def _read_jsonl(path: Path) -> list[dict]:
+    if not path.exists():
+        return []
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class CropStore:
+    def __init__(self, root, store_config: dict | None = None):
+        store_config = store_config or {}
+        self.root = Path(root)
+        self.objects = self.root / "objects"
+        self.objects.mkdir(parents=True, exist_ok=True)
+        self.context = float(store_config.get('context', 0.5))
+        self.min_crop = int(store_config.get('min_crop', 64))
+        self.crop_quality = int(store_config.get('crop_quality', 95))
+        self.thumb_width = int(store_config.get('thumb_width', 320))
+        self.thumb_quality = int(store_config.get('thumb_quality', 40))
+        self.queue_below = float(store_config.get('queue_below', 0.6))
+        self._seen_tracks = OrderedDict()   # (카메라, track_id) -> None, 추적당 한 번만 저장
+        self.frames = 0
+        self.frame_bytes = 0                # 같은 프레임을 원본으로 저장했다면 필요한 바이트 (비교용)
+        self.stored_bytes = 0
+        self.last_records = []              # 가장 최근 add() 의 레코드 (작업자 표시용)
+
+    def _put(self, image: np.ndarray, quality: int) -> str:
+        """JPEG로 인코딩하여 내용 해시 이름으로 저장하고 해시를 반환합니다 (이미 있으면 쓰지 않음)."""
+        data = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])[1].tobytes()
+        digest = hashlib.sha1(data).hexdigest()
+        path = self.objects / digest[:2] / f"{digest}.jpg"
+        if not path.exists():
+            path.parent.mkdir(exist_ok=True)
+            path.write_bytes(data)
+            self.stored_bytes += len(data)
+        return digest
+
+    def object_path(self, digest: str) -> Path:
+        return self.objects / digest[:2] / f"{digest}.jpg"
+
+    def _crop_window(self, bbox: tuple, height: int, width: int) -> tuple[int, int, int, int]:
+        """결함 박스 (x, y, w, h) 주변으로 context 비율만큼 넓힌 창 (x0, y0, x1, y1)."""
+        x, y, w, h = bbox
+        pad_x = max(w * self.context, (self.min_crop - w) / 2, 0)
+        pad_y = max(h * self.context, (self.min_crop - h) / 2, 0)
+        x0, y0 = max(0, int(x - pad_x)), max(0, int(y - pad_y))
+        x1, y1 = min(width, int(x + w + pad_x)), min(height, int(y + h + pad_y))
+        return x0, y0, x1, y1
+
+    def add(self, camera: str, image: np.ndarray, defects, timestamp: datetime | None = None) -> list[dict]:
+        """
+        한 프레임의 결함 크롭을 저장하고 레코드를 반환합니다.
+        track_id가 있는 결함은 추적당 처음 한 번만 저장하며, 저장할 결함이 없으면 썸네일도 만들지 않습니다.
+        """
+        self.frames += 1
+        self.frame_bytes += image.nbytes
+        new = []
+        for d in defects:
+            if d.camera != camera:
+                continue
+            if d.track_id is not None:
+                key = (camera, d.track_id)
+                if key in self._seen_tracks:
+                    continue
+                self._seen_tracks[key] = None
+                while len(self._seen_tracks) > 4096:
+                    self._seen_tracks.popitem(last=False)
+            new.append(d)
+        self.last_records = []
+        if not new:
+            return []
+
+        timestamp = timestamp or datetime.now()
+        height, width = image.shape[:2]
+        scale = min(1.0, self.thumb_width / width)
+        thumb = cv2.resize(image, (max(1, int(width * scale)), max(1, int(height * scale))),
+                           interpolation=cv2.INTER_AREA)
+        thumb_id = self._put(thumb, self.thumb_quality)
+
+        records = []
+        for d in new:
+            x0, y0, x1, y1 = self._crop_window(d.bbox, height, width)
+            crop_id = self._put(image[y0:y1, x0:x1], self.crop_quality)
+            # 크롭 안에 걸친 같은 프레임의 다른 결함도 라벨에 포함 (빠진 라벨은 학습에 해로움)
+            boxes = []
+            for other in defects:
+                if other.camera != camera:
+                    continue
+                ox, oy, ow, oh = other.bbox
+                bx0, by0 = max(ox, x0) - x0, max(oy, y0) - y0
+                bx1, by1 = min(ox + ow, x1) - x0, min(oy + oh, y1) - y0
+                if bx1 > bx0 and by1 > by0:
+                    boxes.append({"label": other.label or other.defect_type, "xyxy": [bx0, by0, bx1, by1]})
+            records.append({
+                "id": crop_id,
+                "time": timestamp.isoformat(timespec='seconds'),
+                "camera": camera,
+                "defect_type": d.defect_type,
+                "label": d.label or d.defect_type,
+                "score": round(float(d.score), 4),
+                "status": d.status,
+                "track_id": d.track_id,
+                "bbox": list(d.bbox),
+                "window": [x0, y0, x1, y1],
+                "frame_size": [width, height],
+                "boxes": boxes,
+                "thumb": thumb_id,
+            })
+        with open(self.root / "index.jsonl", 'a', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        low = [r["id"] for r in records if r["score"] < self.queue_below]
+        if low:
+            self.enqueue(low, "low_conf")
+        self.last_records = records
+        return records
+
+    def enqueue(self, record_ids, reason: str, label: str | None = None):
+        """
+        라벨링 대기열에 등록합니다. reason: "low_conf" / "operator" / "label".
+        label=None 이면 예측 라벨을 초안으로 쓰고, BACKGROUND 이면 이 크롭을 만든 결함 박스를 빼고 내보냅니다.
+        """
+        now = datetime.now().isoformat(timespec='seconds')
+        with open(self.root / "queue.jsonl", 'a', encoding='utf-8') as f:
+            for record_id in record_ids:
+                f.write(json.dumps({"id": record_id, "reason": reason, "label": label, "time": now}) + "\n")
+
+    def records(self) -> dict:
+        return {r["id"]: r for r in _read_jsonl(self.root / "index.jsonl")}
+
+    def queue(self) -> dict:
+        """id -> 최종 대기열 상태 (이벤트 순서대로 덮어씀, 라벨은 지정된 마지막 값 유지)."""
+        state = {}
+        for event in _read_jsonl(self.root / "queue.jsonl"):
+            entry = state.setdefault(event["id"], {"reasons": [], "label": None})
+            if event["reason"] not in entry["reasons"]:
+                entry["reasons"].append(event["reason"])
+            if event.get("label") is not None:
+                entry["label"] = event["label"]
+        return state
+
+    def exported(self) -> set[str]:
+        path = self.root / "exported.txt"
+        return set(path.read_text().split()) if path.exists() else set()
+
+    def export(self, out_root: str = './neu_yolo_data', split: str = 'train') -> int:
+        """
+        대기열 중 아직 내보내지 않은 크롭을 convert.py 출력 형식으로 씁니다. 내보낸 수를 반환합니다.
+        작업자가 라벨을 지정한 크롭은 해당 박스의 클래스를 그 라벨로 바꾸고, 모델 클래스에 없는 라벨은 건너뜁니다.
+        """
+        out_root = Path(out_root)
+        (out_root / 'images' / split).mkdir(parents=True, exist_ok=True)
+        (out_root / 'labels' / split).mkdir(parents=True, exist_ok=True)
+        records = self.records()
+        done = self.exported()
+        written = []
+        for record_id, entry in self.queue().items():
+            record = records.get(record_id)
+            if record is None or record_id in done:
+                continue
+            x0, y0, x1, y1 = record["window"]
+            lines = []
+            unknown = False
+            for box in record["boxes"]:
+                label = box["label"]
+                # 작업자 라벨은 이 크롭을 만든 결함(박스 좌표가 같은 것)에만 적용
+                if entry["label"] is not None and self._is_source_box(box, record):
+                    label = entry["label"]
+                if label == BACKGROUND:
+                    continue  # 오검출로 표시된 결함 박스만 제외
+                if label not in CLASSES:
+                    unknown = True
+                    continue
+                bx0, by0, bx1, by1 = box["xyxy"]
+                cx, cy, w, h = convert_box((x1 - x0, y1 - y0), (bx0, bx1, by0, by1))
+                lines.append(f"{CLASSES.index(label)} {cx:.6f} {cy:.6f} {w:.6f} {h:.6f}")
+            if not lines and (unknown or entry["label"] != BACKGROUND):
+                continue  # 모델 클래스가 아닌 결함만 남으면 내보내지 않음 (배경으로 잘못 학습되지 않도록)
+
+            name = f"harvest_{record_id[:16]}"
+            shutil.copyfile(self.object_path(record_id), out_root / 'images' / split / f"{name}.jpg")
+            with open(out_root / 'labels' / split / f"{name}.txt", 'w') as f:
+                f.write('\n'.join(lines))
+            written.append(record_id)
+
+        if written:
+            with open(self.root / "exported.txt", 'a') as f:
+                f.write("\n".join(written) + "\n")
+        return len(written)
+
+    @staticmethod
+    def _is_source_box(box: dict, record: dict) -> bool:
+        x, y, w, h = record["bbox"]
+        x0, y0 = record["window"][:2]
+        return box["xyxy"] == [max(x, x0) - x0, max(y, y0) - y0, x + w - x0, y + h - y0]
+
+    def stats(self) -> dict:
+        """저장 용량 요약. 이 프로세스에서 본 프레임 수가 있으면 원본 프레임 대비 비율도 계산합니다."""
+        total = sum(p.stat().st_size for p in self.objects.rglob("*.jpg"))
+        return {
+            "objects_bytes": total,
+            "records": len(self.records()),
+            "queued": len(self.queue()),
+            "exported": len(self.exported()),
+            "frames": self.frames,
+            "ratio_vs_raw": self.stored_bytes / self.frame_bytes if self.frame_bytes else None,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="결함 크롭 저장소 / 라벨링 대기열")
+    parser.add_argument("command", choices=["stats", "queue", "label", "export"])
+    parser.add_argument("args", nargs="*", help="label: <id 앞부분> <클래스|background>")
+    parser.add_argument("--root", help="저장소 경로 (기본: config.json crop_store.root)")
+    parser.add_argument("--out", default="./neu_yolo_data", help="export 대상 (convert.py 출력 폴더)")
+    parser.add_argument("--split", default="train", choices=["train", "val"])
+    args = parser.parse_args()
+
+    import config
+    store_config = config.load_config().get('crop_store', {})
+    store = CropStore(args.root or store_config.get('root', str(config.DATA_DIR / "crops")), store_config)
+
+    if args.command == "stats":
+        stats = store.stats()
+        print(f"records {stats['records']}, queued {stats['queued']}, exported {stats['exported']}, "
+              f"objects {stats['objects_bytes'] / 1e6:.1f} MB")
+    elif args.command == "queue":
+        records = store.records()
+        done = store.exported()
+        for record_id, entry in store.queue().items():
+            r = records.get(record_id, {})
+            print(f"{record_id[:12]} {r.get('time', '-'):<19} {r.get('camera', '-'):<5} {r.get('label', '-'):<16} "
+                  f"{r.get('score', 0):.2f} {','.join(entry['reasons']):<16} {entry['label'] or '-':<16} "
+                  f"{'exported' if record_id in done else ''}")
+    elif args.command == "label":
+        if len(args.args) != 2:
+            parser.error("label <id> <class|background>")
+        prefix, label = args.args
+        if label != BACKGROUND and label not in CLASSES:
+            parser.error(f"label must be one of {CLASSES + [BACKGROUND]}")
+        matches = [i for i in store.records() if i.startswith(prefix)]
+        if len(matches) != 1:
+            parser.error(f"id prefix matches {len(matches)} records")
+        store.enqueue(matches, "label", label)
+        print(f"{matches[0][:12]} -> {label}")
+    else:
+        count = store.export(args.out, args.split)
+        print(f"exported {count} crops to {Path(args.out) / 'images' / args.split}")
+
+
+if __name__ == "__main__":
+    main()
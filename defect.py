@@ -11,4 +11,6 @@ class Defect:
     width_mm: float | None   # 향후 사용을 위해 남겨둠
     diameter_mm: float | None
     area_mm2: float | None
-    score: float             # 신뢰도(0~1)
\ No newline at end of file
+    score: float             # 신뢰도(0~1)
+    track_id: int | None = None  # 연속 프레임 추적 ID (DefectTracker)
+    label: str | None = None     # 모델 클래스 이름 (학습 데이터 내보내기용, 예: "scratches")
@@ -0,0 +1,172 @@
+"""
+연속 프레임 간 결함 추적.
+
+시트가 천천히 이동하면 같은 결함이 여러 프레임에서 반복 검출됩니다. DefectTracker는
+컨베이어 속도로 이전 위치를 보정(예측)한 뒤 IoU/중심 거리로 박스를 연결하여 물리적 결함마다
+고정된 track_id를 부여하고, 추적이 끝날 때 가장 신뢰도가 높은 측정값으로 한 번만 내보냅니다.
+
+config.json 예:
+    "tracking": {"enabled": true, "conveyor_speed_mm_s": 50.0, "direction": [0, 1],
+                 "iou_threshold": 0.3, "max_center_dist_mm": 5.0, "max_age": 2, "max_gap_seconds": 2.0}
+"""
+import time
+from bisect import bisect_left, bisect_right
+from dataclasses import replace
+
+from defect import Defect
+
+
+class Track:
+    """하나의 물리적 결함. 예측 위치(x1, y1, x2, y2)와 지금까지의 최고 측정값을 보관합니다."""
+    __slots__ = ('track_id', 'defect_type', 'x1', 'y1', 'x2', 'y2', 'best', 'hits', 'misses', 'last_seen')
+
+    def __init__(self, track_id: int, defect: Defect, now: float):
+        self.track_id = track_id
+        self.defect_type = defect.defect_type
+        self.hits = 0
+        self.misses = 0
+        self.best = None
+        self.observe(defect, now)
+
+    def observe(self, defect: Defect, now: float):
+        x, y, w, h = defect.bbox
+        self.x1, self.y1, self.x2, self.y2 = x, y, x + w, y + h
+        self.hits += 1
+        self.misses = 0
+        self.last_seen = now
+        if self.best is None or defect.score > self.best.score:
+            self.best = defect
+
+
+def _iou(ax1, ay1, ax2, ay2, bx1, by1, bx2, by2) -> float:
+    inter_w = min(ax2, bx2) - max(ax1, bx1)
+    inter_h = min(ay2, by2) - max(ay1, by1)
+    if inter_w <= 0 or inter_h <= 0:
+        return 0.0
+    inter = inter_w * inter_h
+    return inter / ((ax2 - ax1) * (ay2 - ay1) + (bx2 - bx1) * (by2 - by1) - inter)
+
+
+class DefectTracker:
+    """
+    카메라별 결함 추적기.
+    update()는 현재 프레임 결함에 track_id를 붙여 돌려주고, 끝난 추적은 finished 로 한 번만 내보냅니다.
+    프레임당 비용은 O(n log n): 예측 박스를 x1 기준으로 정렬해 두고 검출마다 이분 탐색으로
+    겹칠 수 있는 후보만 비교한 뒤, 후보 쌍을 점수순으로 정렬해 탐욕적으로 매칭합니다.
+    """
+    def __init__(self, tracking_config: dict, camera_configs: dict | None = None):
+        self.conveyor_speed = float(tracking_config.get('conveyor_speed_mm_s', 0.0))
+        dx, dy = tracking_config.get('direction', [0, 1])
+        norm = (dx * dx + dy * dy) ** 0.5 or 1.0
+        self.direction = (dx / norm, dy / norm)
+        self.iou_threshold = float(tracking_config.get('iou_threshold', 0.3))
+        self.max_center_dist_mm = float(tracking_config.get('max_center_dist_mm', 5.0))
+        self.max_age = int(tracking_config.get('max_age', 2))
+        self.max_gap = float(tracking_config.get('max_gap_seconds', 2.0))
+        self.camera_configs = camera_configs or {}
+        self._tracks = {}       # camera -> list[Track]
+        self._last_time = {}    # camera -> 마지막 update 시각
+        self._next_id = 1
+
+    def _pixels_per_mm(self, camera_name: str) -> float:
+        return float(self.camera_configs.get(camera_name.lower(), {}).get('pixels_per_mm', 10.0))
+
+    def update(self, camera_name: str, defects: list[Defect],
+               timestamp: float | None = None) -> tuple[list[Defect], list[Defect]]:
+        """
+        (track_id가 붙은 현재 프레임 결함, 이번에 끝난 추적의 최고 측정값 목록)을 반환합니다.
+        """
+        now = time.monotonic() if timestamp is None else timestamp
+        tracks = self._tracks.setdefault(camera_name, [])
+        last = self._last_time.get(camera_name)
+        self._last_time[camera_name] = now
+        ppm = self._pixels_per_mm(camera_name)
+        finished = []
+
+        # 오래 끊긴 스트림이면 이전 추적은 모두 종료 (정지 후 재개 시 다른 시트로 간주)
+        if last is not None and now - last > self.max_gap:
+            finished.extend(replace(t.best, track_id=t.track_id) for t in tracks)
+            tracks.clear()
+
+        # 컨베이어 이동량만큼 예측 위치 이동
+        if tracks and last is not None and self.conveyor_speed:
+            shift = self.conveyor_speed * (now - last) * ppm
+            sx, sy = shift * self.direction[0], shift * self.direction[1]
+            for t in tracks:
+                t.x1 += sx
+                t.x2 += sx
+                t.y1 += sy
+                t.y2 += sy
+
+        matches = self._associate(tracks, defects, self.max_center_dist_mm * ppm)
+
+        output = []
+        for i, defect in enumerate(defects):
+            track = matches[i]
+            if track is None:
+                track = Track(self._next_id, defect, now)
+                self._next_id += 1
+                tracks.append(track)
+            else:
+                track.observe(defect, now)
+            output.append(replace(defect, track_id=track.track_id))
+
+        # 이번 프레임에 매칭되지 않은 추적은 나이를 먹고, max_age를 넘으면 종료
+        alive = []
+        for t in tracks:
+            if t.last_seen != now:
+                t.misses += 1
+            if t.misses > self.max_age:
+                finished.append(replace(t.best, track_id=t.track_id))
+            else:
+                alive.append(t)
+        tracks[:] = alive
+        return output, finished
+
+    def _associate(self, tracks: list[Track], defects: list[Defect], max_dist: float) -> list[Track | None]:
+        """검출 i에 매칭된 Track(없으면 None) 목록."""
+        matches = [None] * len(defects)
+        if not tracks or not defects:
+            return matches
+
+        tracks.sort(key=lambda t: t.x1)
+        starts = [t.x1 for t in tracks]
+        max_w = max(t.x2 - t.x1 for t in tracks)
+        max_dist_sq = max_dist * max_dist
+
+        pairs = []  # (-iou, 중심거리^2, 검출 index, track index)
+        for i, d in enumerate(defects):
+            x, y, w, h = d.bbox
+            bx1, by1, bx2, by2 = x, y, x + w, y + h
+            cx, cy = x + w / 2, y + h / 2
+            # x1이 [bx1 - max_w - max_dist, bx2 + max_dist] 밖인 추적은 겹치지도 가깝지도 않음
+            lo = bisect_left(starts, bx1 - max_w - max_dist)
+            hi = bisect_right(starts, bx2 + max_dist)
+            for j in range(lo, hi):
+                t = tracks[j]
+                if t.defect_type != d.defect_type:
+                    continue
+                iou = _iou(bx1, by1, bx2, by2, t.x1, t.y1, t.x2, t.y2)
+                ddx = cx - (t.x1 + t.x2) / 2
+                ddy = cy - (t.y1 + t.y2) / 2
+                dist_sq = ddx * ddx + ddy * ddy
+                if iou >= self.iou_threshold or dist_sq <= max_dist_sq:
+                    pairs.append((-iou, dist_sq, i, j))
+
+        pairs.sort()
+        used = set()
+        for _neg_iou, _dist_sq, i, j in pairs:
+            if matches[i] is None and j not in used:
+                matches[i] = tracks[j]
+                used.add(j)
+        return matches
+
+    def flush(self, camera_name: str | None = None) -> list[Defect]:
+        """진행 중인 추적을 모두 종료하고 최고 측정값을 반환합니다 (시트/코일 교체, 종료 시)."""
+        cameras = [camera_name] if camera_name else list(self._tracks)
+        finished = []
+        for cam in cameras:
+            finished.extend(replace(t.best, track_id=t.track_id) for t in self._tracks.get(cam, []))
+            self._tracks[cam] = []
+            self._last_time.pop(cam, None)
+        return finished
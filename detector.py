@@ -1,6 +1,9 @@
-import torch
+import json
+import threading
+import http.client
+from urllib.parse import urlparse
+import cv2
 import numpy as np
-from ultralytics import YOLO
 from defect import Defect
 import measurement
 import config
@@ -11,14 +14,40 @@ class DefectDetector:
     이미지에서 결함을 검출하는 클래스.
     YOLO 모델을 사용하여 실제 결함을 검출합니다.
     """
-    def __init__(self, config_data: dict):
+    def __init__(self, config_data: dict, load_model: bool = True):
         self.config = config_data
         self.model = None
         self.device = 'cpu'
+        self.input_channels = 3
+        self._letterbox = None  # direct_input 전처리 버퍼 (load_model에서 설정)
+        self._net = None
+        self._tta = None        # 경계 점수 박스 2차 추론 (config 'tta', load_model에서 설정)
         self.confidence_threshold = self.config.get('confidence_threshold', 0.5)
-        
-        self.confidence_threshold = self.config.get('confidence_threshold', 0.5)
-        
+
+        # load_model=False 이면 호출 측에서 load_model()을 (백그라운드 스레드 등에서) 따로 호출
+        if load_model:
+            self.load_model()
+
+    @property
+    def is_ready(self) -> bool:
+        """모델 로딩이 끝났는지 여부"""
+        return self.model is not None
+
+    def close(self):
+        """RemoteDetector와 인터페이스를 맞추기 위한 자원 정리 (프로세스 내 추론은 정리할 것 없음)"""
+        pass
+
+    def load_model(self):
+        """
+        YOLO 모델을 로드합니다.
+        torch/ultralytics는 import 자체가 수 초 걸리므로 이 시점에 지연 import 합니다.
+        """
+        import torch
+        from ultralytics import YOLO
+
+        import resource_budget
+        resource_budget.apply_torch()
+
         # 모델 파일 경로 설정 (사용자 설정 값 우선)
         # config에 'model_path'가 없으면 기본 'yolov8n.pt'
         model_name_or_path = self.config.get('model_path', 'yolov8n.pt')
@@ -42,15 +71,227 @@ class DefectDetector:
                     print(f"Model file not found locally. Attempting to load by name: {model_name_or_path}")
                     self.model = YOLO(model_name_or_path)
             
+            self._build_thresholds()
+            self.input_channels = self._model_channels()
+            tta_config = self.config.get('tta', {})
+            if tta_config.get('enabled', False):
+                from tta import BorderlineTTA
+                self._tta = BorderlineTTA(self, tta_config)
+
             # GPU 사용 가능 여부 확인
             if torch.cuda.is_available():
                 self.device = 'cuda'
                 print("CUDA available: Using GPU for inference.")
             else:
                 print("CUDA not available: Using CPU for inference.")
+            self._setup_direct_input(torch)
         except Exception as e:
             print(f"Error loading YOLO model: {e}")
 
+    def _build_thresholds(self):
+        """
+        config.json의 클래스별 임계값으로 추론 파라미터를 구성합니다.
+
+        "class_thresholds": {"crazing": {"conf": 0.6}, "scratches": {"conf": 0.3, "iou": 0.5}}
+        "iou_threshold": 0.7, "max_det": 100, "enabled_classes": ["crazing", ...] (생략 시 전체)
+        "imgsz": 640 (추론 입력 크기, pareto_sweep.py 결과로 고름)
+        "tta": {"enabled": true, "band": 0.15} 이면 임계값 - band 아래 박스까지 받아 2차 추론으로 판정
+
+        모델 NMS에는 가장 느슨한 conf/iou와 사용할 classes/max_det를 넘겨
+        버려질 박스가 애초에 만들어지지 않도록 하고, 클래스별 기준은 남은 소수의 박스에만 적용합니다.
+        """
+        names = self.model.names
+        if isinstance(names, (list, tuple)):
+            names = dict(enumerate(names))
+        self.class_names = {int(k): str(v) for k, v in names.items()}
+        num_classes = max(self.class_names) + 1 if self.class_names else 0
+
+        per_class = {k.lower(): v for k, v in self.config.get('class_thresholds', {}).items()}
+        default_iou = self.config.get('iou_threshold', 0.7)
+        self.class_conf = np.full(num_classes, self.confidence_threshold, dtype=np.float32)
+        self.class_iou = np.full(num_classes, default_iou, dtype=np.float32)
+        for cls_id, name in self.class_names.items():
+            override = per_class.get(name.lower(), {})
+            self.class_conf[cls_id] = override.get('conf', self.confidence_threshold)
+            self.class_iou[cls_id] = override.get('iou', default_iou)
+
+        enabled = self.config.get('enabled_classes')
+        enabled = {n.lower() for n in enabled} if enabled else None
+        classes = [cls_id for cls_id, name in sorted(self.class_names.items())
+                   if (enabled is None or name.lower() in enabled) and self.class_conf[cls_id] <= 1.0]
+
+        min_conf = float(self.class_conf[classes].min()) if classes else self.confidence_threshold
+        tta_config = self.config.get('tta', {})
+        if tta_config.get('enabled', False):
+            min_conf = max(0.001, min_conf - float(tta_config.get('band', 0.15)))
+        self.inference_params = {
+            'conf': min_conf,
+            'iou': float(self.class_iou[classes].max()) if classes else default_iou,
+            'classes': classes if len(classes) < len(self.class_names) else None,
+            'max_det': int(self.config.get('max_det', 100)),
+        }
+        if self.config.get('imgsz'):
+            self.inference_params['imgsz'] = int(self.config['imgsz'])  # 생략 시 ultralytics 기본(640)
+        # 모델 NMS 기준보다 IoU가 엄격한 클래스는 추론 후 해당 클래스만 추가로 NMS
+        self._strict_iou_classes = [c for c in classes if self.class_iou[c] < self.inference_params['iou']]
+        print(f"Inference params: {self.inference_params}")
+
+    def _model_channels(self) -> int:
+        """모델 입력 채널 수 (1 = 흑백 학습 모델). config 'model_channels' 우선, 확인할 수 없으면(내보낸 모델) 3."""
+        if self.config.get('model_channels'):
+            return int(self.config['model_channels'])
+        try:
+            return int(next(self.model.model.parameters()).shape[1])
+        except Exception:
+            return 3
+
+    def _model_input(self, image: np.ndarray) -> np.ndarray:
+        """
+        흑백(2차원) 프레임을 모델 입력 채널에 맞춥니다.
+        1채널 모델이면 (H, W, 1) 뷰만 만들고, 3채널 모델일 때만 여기서 한 번 복제합니다.
+        """
+        if image.ndim == 3:
+            if self.input_channels == 1 and image.shape[2] == 3:
+                return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)[:, :, None]
+            return image
+        if self.input_channels == 1:
+            return image[:, :, None]
+        return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+
+    def _predict(self, image: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """모델을 실행하고 클래스별 임계값을 통과한 (xyxy, score, class_id) 배열을 반환합니다."""
+        return self._predict_batch([image])[0]
+
+    def _predict_batch(self, images: list[np.ndarray], imgsz: int | None = None,
+                       refine: bool = True) -> list[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        여러 프레임을 한 번의 모델 호출(배치)로 추론합니다.
+        imgsz를 주면 그 입력 크기로 추론하고 (캐스케이드 타일 크롭처럼 작은 입력을 640으로 키우지 않도록),
+        refine=False 이면 TTA 2차 추론을 건너뜁니다.
+        """
+        if self._letterbox is not None and imgsz is None:
+            predictions = self._predict_direct(images)
+        else:
+            params = self.inference_params if imgsz is None else {**self.inference_params, 'imgsz': int(imgsz)}
+            model_images = [self._model_input(img) for img in images]
+            results = self.model(model_images, verbose=False, device=self.device, **params)
+            predictions = [self._box_arrays(result.boxes) for result in results]
+        if self._tta is not None and refine:
+            predictions = self._tta.refine(images, predictions)  # 경계 점수 박스가 있는 프레임만 2차 추론
+        return [self._filter_arrays(*pred) for pred in predictions]
+
+    def input_size(self) -> int:
+        """전체 프레임 추론의 입력 크기 (config 'imgsz' > 모델 학습 설정 > 640)."""
+        overrides = getattr(self.model, 'overrides', None) or {}
+        return int(self.config.get('imgsz') or overrides.get('imgsz') or 640)
+
+    def _setup_direct_input(self, torch):
+        """
+        config 'direct_input': true 이면 전처리를 ultralytics 대신 LetterboxBuffer로 하고
+        PyTorch 모델(.pt)을 직접 호출합니다. 내보낸 모델(onnx 등)은 기존 경로를 사용합니다.
+        """
+        self._letterbox = None
+        self._net = None
+        net = getattr(self.model, 'model', None)
+        if not self.config.get('direct_input', False) or not isinstance(net, torch.nn.Module):
+            return
+        from preprocess import LetterboxBuffer
+
+        net = net.fuse(verbose=False) if hasattr(net, 'fuse') else net
+        self._net = net.to(self.device).eval()
+        stride = int(max(getattr(net, 'stride', [32])))
+        imgsz = self.input_size()
+        self._letterbox = LetterboxBuffer(imgsz, stride, self.device, channels=self.input_channels)
+        print(f"Direct input path: imgsz={imgsz}, stride={stride}")
+
+    def _predict_direct(self, images: list[np.ndarray]) -> list[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """재사용 버퍼로 letterbox -> 모델 직접 호출 -> NMS -> letterbox 파라미터로 원본 좌표 복원 (임계값 적용 전)."""
+        import torch
+        try:
+            from ultralytics.utils.nms import non_max_suppression  # ultralytics >= 8.3.x
+        except ImportError:
+            from ultralytics.utils.ops import non_max_suppression
+
+        if len({img.shape for img in images}) > 1:
+            # 크기가 다른 프레임이 섞이면 프레임별로 처리 (버퍼는 크기별로 재할당되지 않도록 보통 같은 크기)
+            return [self._predict_direct([img])[0] for img in images]
+
+        params = self.inference_params
+        with torch.no_grad():
+            x = self._letterbox(images)
+            preds = self._net(x)
+            dets = non_max_suppression(preds, params['conf'], params['iou'], classes=params['classes'],
+                                       max_det=params['max_det'])
+        outputs = []
+        for i, (det, img) in enumerate(zip(dets, images)):
+            det = det.float().cpu().numpy()
+            xyxy = self._letterbox.scale_boxes(det[:, :4].copy(), i, img.shape)
+            outputs.append((xyxy, det[:, 4], det[:, 5].astype(np.int64)))
+        return outputs
+
+    def _box_arrays(self, boxes) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """ultralytics Boxes를 (xyxy, score, class_id) 배열로 가져옵니다."""
+        # 박스 단위가 아니라 배열 단위로 한 번에 CPU로 가져옴
+        xyxy = boxes.xyxy.cpu().numpy()
+        scores = boxes.conf.cpu().numpy()
+        class_ids = boxes.cls.cpu().numpy().astype(np.int64)
+        return xyxy, scores, class_ids
+
+    def _filter_arrays(self, xyxy: np.ndarray, scores: np.ndarray,
+                       class_ids: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """클래스별 conf/IoU 기준을 적용합니다."""
+        keep = scores >= self.class_conf[class_ids]
+        xyxy, scores, class_ids = xyxy[keep], scores[keep], class_ids[keep]
+
+        if self._strict_iou_classes and len(scores) > 1:
+            keep = np.ones(len(scores), dtype=bool)
+            for cls_id in self._strict_iou_classes:
+                idx = np.flatnonzero(class_ids == cls_id)
+                if len(idx) > 1:
+                    kept = greedy_nms(xyxy[idx], scores[idx], float(self.class_iou[cls_id]))
+                    keep[idx] = False
+                    keep[idx[kept]] = True
+            xyxy, scores, class_ids = xyxy[keep], scores[keep], class_ids[keep]
+
+        return xyxy, scores, class_ids
+
+    def _make_defect(self, camera_name: str, label: str, bbox: tuple, conf: float, pixels_per_mm: float) -> Defect:
+        """클래스 이름을 결함 유형으로 매핑하고, 유형별 측정 및 판정을 수행합니다."""
+        label = label.lower()
+
+        # 결함 유형 매핑
+        if 'scratch' in label or 'crack' in label:
+            defect_type = 'crack'
+        elif 'hole' in label:
+            defect_type = 'hole'
+        elif 'nut' in label:
+            defect_type = 'nut'
+        else:
+            defect_type = label # 기타
+
+        # 유형별 측정 및 판정 로직
+        if defect_type == "crack":
+            length_mm = measurement.measure_scratch(bbox, pixels_per_mm)
+            if length_mm <= config.CRACK_LIMIT_OK:
+                status = "OK"
+            elif length_mm < config.CRACK_LIMIT_WARNING:
+                status = "WARNING" # Rework
+            else:
+                status = "NG"
+            return Defect(camera_name, defect_type, status, bbox, length_mm, None, None, None, conf, label=label)
+
+        if defect_type == "hole":
+            diameter_mm, area_mm2 = measurement.measure_hole(bbox, pixels_per_mm)
+            status = "NG" if diameter_mm >= config.HOLE_LIMIT_NG else "OK"
+            return Defect(camera_name, defect_type, status, bbox, None, None, diameter_mm, area_mm2, conf, label=label)
+
+        if defect_type == "nut":
+            # 너트가 검출되면 OK로 간주
+            return Defect(camera_name, defect_type, "OK", bbox, None, None, None, None, conf, label=label)
+
+        # 기타 검출된 객체
+        return Defect(camera_name, defect_type, "WARNING", bbox, None, None, None, None, conf, label=label)
+
     def detect(self, image: np.ndarray, camera_name: str) -> list[Defect]:
         """
         이미지에서 결함을 검출하고, 각 결함의 크기를 계산하여 리스트로 반환합니다.
@@ -58,73 +299,153 @@ class DefectDetector:
         if self.model is None or image is None:
             return []
 
+        # YOLO 추론 (클래스별 임계값은 추론 파라미터 및 _predict 에서 적용)
+        return self._to_defects(self._predict(image), camera_name)
+
+    def detect_batch(self, images: list[np.ndarray], camera_names: list[str],
+                     pixels_per_mm: list[float] | None = None) -> list[list[Defect]]:
+        """
+        여러 프레임(여러 카메라/스테이션)을 한 번에 추론하여 프레임별 결함 리스트를 반환합니다.
+        pixels_per_mm를 주면 config 대신 해당 값으로 측정합니다 (추론 서버에서 스테이션별 보정값 사용).
+        """
+        if self.model is None or not images:
+            return [[] for _ in images]
+        predictions = self._predict_batch(images)
+        if pixels_per_mm is None:
+            pixels_per_mm = [None] * len(images)
+        return [self._to_defects(pred, name, ppm) for pred, name, ppm in zip(predictions, camera_names, pixels_per_mm)]
+
+    def _to_defects(self, prediction, camera_name: str, pixels_per_mm: float | None = None) -> list[Defect]:
+        """(xyxy, score, class_id) 배열을 측정/판정이 끝난 Defect 리스트로 변환합니다."""
+        if pixels_per_mm is None:
+            pixels_per_mm = self.config[camera_name.lower()]['pixels_per_mm']
+        xyxy, scores, class_ids = prediction
+
         defects = []
-        pixels_per_mm = self.config[camera_name.lower()]['pixels_per_mm']
-
-        # YOLO 추론
-        results = self.model(image, verbose=False, device=self.device)
-
-        for result in results:
-            for box in result.boxes:
-                # Bounding Box
-                x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                w, h = x2 - x1, y2 - y1
-                bbox = (int(x1), int(y1), int(w), int(h))
-                
-                # Class & Confidence
-                cls_id = int(box.cls[0])
-                conf = float(box.conf[0])
-
-                # 신뢰도 임계값(Confidence Threshold) 필터링
-                if conf < self.confidence_threshold:
-                    continue
-
-                label = result.names[cls_id].lower()
-
-                # 결함 유형 매핑
-                if 'scratch' in label or 'crack' in label:
-                    defect_type = 'crack'
-                elif 'hole' in label:
-                    defect_type = 'hole'
-                elif 'nut' in label:
-                    defect_type = 'nut'
-                else:
-                    defect_type = label # 기타
+        for (x1, y1, x2, y2), conf, cls_id in zip(xyxy, scores, class_ids):
+            bbox = (int(x1), int(y1), int(x2 - x1), int(y2 - y1))
+            label = self.class_names.get(int(cls_id), str(cls_id))
+            defects.append(self._make_defect(camera_name, label, bbox, float(conf), pixels_per_mm))
+        return defects
 
-                # 초기화
-                status = "OK"
-                length_mm = None
-                diameter_mm = None
-                area_mm2 = None
-
-                # 유형별 측정 및 판정 로직
-                if defect_type == "crack":
-                    length_mm = measurement.measure_scratch(bbox, pixels_per_mm)
-                    if length_mm <= config.CRACK_LIMIT_OK:
-                        status = "OK"
-                    elif length_mm < config.CRACK_LIMIT_WARNING:
-                        status = "WARNING" # Rework
-                    else:
-                        status = "NG"
-                    
-                    defects.append(Defect(camera_name, defect_type, status, bbox, length_mm, None, None, None, conf))
-
-                elif defect_type == "hole":
-                    diameter_mm, area_mm2 = measurement.measure_hole(bbox, pixels_per_mm)
-                    if diameter_mm >= config.HOLE_LIMIT_NG:
-                        status = "NG"
-                    else:
-                        status = "OK"
-                    
-                    defects.append(Defect(camera_name, defect_type, status, bbox, None, None, diameter_mm, area_mm2, conf))
-                
-                elif defect_type == "nut":
-                    # 너트가 검출되면 OK로 간주
-                    status = "OK"
-                    defects.append(Defect(camera_name, defect_type, status, bbox, None, None, None, None, conf))
-                
-                else:
-                    # 기타 검출된 객체
-                    defects.append(Defect(camera_name, defect_type, "WARNING", bbox, None, None, None, None, conf))
-        
-        return defects
\ No newline at end of file
+
+def greedy_nms(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float) -> np.ndarray:
+    """점수 순 greedy NMS. 유지할 박스의 인덱스를 반환합니다."""
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    areas = np.maximum(x2 - x1, 0) * np.maximum(y2 - y1, 0)
+    order = scores.argsort()[::-1]
+    kept = []
+    while order.size > 0:
+        i = order[0]
+        kept.append(i)
+        xx1 = np.maximum(x1[i], x1[order[1:]])
+        yy1 = np.maximum(y1[i], y1[order[1:]])
+        xx2 = np.minimum(x2[i], x2[order[1:]])
+        yy2 = np.minimum(y2[i], y2[order[1:]])
+        inter = np.maximum(xx2 - xx1, 0) * np.maximum(yy2 - yy1, 0)
+        iou = inter / (areas[i] + areas[order[1:]] - inter + 1e-9)
+        order = order[1:][iou <= iou_threshold]
+    return np.array(kept, dtype=np.int64)
+
+
+class InferenceClient:
+    """
+    로컬 추론 서버(inference_server.py)에 요청하는 얇은 클라이언트.
+    DefectDetector와 같은 detect() 인터페이스를 제공하므로 스테이션마다 모델을 로드할 필요가 없습니다.
+    """
+    def __init__(self, config_data: dict, load_model: bool = True, timeout: float = 30.0):
+        self.config = config_data
+        url = urlparse(config_data['inference_server'])
+        self.host = url.hostname or '127.0.0.1'
+        self.port = url.port or 8765
+        self.timeout = timeout
+        self._local = threading.local()  # 스레드별 keep-alive 연결
+        self._ready = False
+        if load_model:
+            self.load_model()
+
+    @property
+    def is_ready(self) -> bool:
+        return self._ready
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def _request(self, method: str, path: str, body=None, headers=None):
+        """요청을 보내고 (status, JSON) 을 반환합니다. 끊긴 keep-alive 연결은 한 번 다시 연결합니다."""
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request(method, path, body=body, headers=headers or {})
+                response = conn.getresponse()
+                return response.status, json.loads(response.read())
+            except (http.client.HTTPException, ConnectionError):
+                conn.close()
+                self._local.conn = None
+                if attempt == 1:
+                    raise
+
+    def load_model(self):
+        """서버 상태를 확인합니다 (모델은 서버에서 한 번만 로드됨)."""
+        try:
+            status, health = self._request("GET", "/health")
+            self._ready = status == 200 and health.get('ready', False)
+        except OSError as e:
+            print(f"Inference server not reachable at {self.host}:{self.port}: {e}")
+            self._ready = False
+
+    def detect(self, image: np.ndarray, camera_name: str) -> list[Defect]:
+        if image is None:
+            return []
+        image = np.ascontiguousarray(image)
+        headers = {
+            "Content-Type": "application/octet-stream",
+            "X-Shape": ",".join(str(v) for v in image.shape),
+            "X-Dtype": image.dtype.str,
+            "X-Camera": camera_name,
+            "X-Pixels-Per-Mm": str(self.config[camera_name.lower()]['pixels_per_mm']),
+        }
+        status, payload = self._request("POST", "/detect", body=memoryview(image).cast('B'), headers=headers)
+        if status != 200:
+            raise RuntimeError(f"inference server error {status}: {payload.get('error')}")
+        return [Defect(**{**d, 'bbox': tuple(d['bbox'])}) for d in payload]
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def create_detector(config_data: dict, load_model: bool = True):
+    """
+    설정에 맞는 검출기를 생성합니다.
+    "inference_server": "http://host:port" 이면 공유 추론 서버 클라이언트(InferenceClient),
+    "inference_process": true 이면 별도 프로세스에서 추론하는 RemoteDetector를 사용하고,
+    "cascade" 가 켜져 있으면 타일 분류기 게이트(CascadeDetector),
+    "result_cache" 가 켜져 있으면 결과 캐시(CachedDetector)로 감쌉니다.
+    """
+    if config_data.get('inference_server'):
+        detector = InferenceClient(config_data, load_model=load_model)
+    elif config_data.get('inference_process', False):
+        from inference_worker import RemoteDetector
+        detector = RemoteDetector(config_data, load_model=load_model)
+    else:
+        detector = DefectDetector(config_data, load_model=load_model)
+
+    # "cascade": {"enabled": true, ...} 이면 타일 분류기가 결함 의심 프레임만 검출기로 넘김
+    cascade_config = config_data.get('cascade', {})
+    if cascade_config.get('enabled', False):
+        from cascade import CascadeDetector
+        detector = CascadeDetector(detector, cascade_config, load_model=load_model)
+
+    # "result_cache": {"enabled": true, ...} 이면 거의 같은 프레임의 재추론을 건너뜀
+    cache_config = config_data.get('result_cache', {})
+    if cache_config.get('enabled', False):
+        from result_cache import CachedDetector
+        detector = CachedDetector(detector, cache_config)
+    return detector
@@ -0,0 +1,233 @@
+"""
+지식 증류(knowledge distillation)로 라인 PC(CPU)용 소형 학생 모델을 학습합니다.
+
+교사(기본 runs/detect/train4/weights/best.pt)와 학생(yolov8n/s)을 같은 배치에 통과시켜
+기본 검출 손실에 다음 두 항을 더합니다.
+    - logit: 검출 헤드 출력 증류. 클래스 로짓은 온도 T의 sigmoid 소프트 타깃(BCE),
+             박스 분포(DFL) 로짓은 softmax KL. 헤드 출력 형태는 모델 크기와 무관하게 같습니다.
+             (ultralytics 8.4의 {"boxes", "scores"} 딕셔너리 출력과 이전 버전의 레벨별 텐서 목록 모두 지원)
+    - feature: 넥(neck) 특징의 공간 attention 맵(채널 제곱 평균, 정규화) MSE.
+               채널 수가 달라도 비교할 수 있어 별도 어댑터 층이 필요 없습니다.
+
+사용 예는 train.py --distill 참고.
+"""
+import glob
+import os
+import statistics
+import time
+
+import cv2
+
+DEFAULT_TEACHER = 'runs/detect/train4/weights/best.pt'
+
+
+def _unwrap(model):
+    """DP/DDP 래퍼 제거 (ultralytics 8.4: unwrap_model, 이전: de_parallel)."""
+    try:
+        from ultralytics.utils.torch_utils import unwrap_model
+    except ImportError:
+        from ultralytics.utils.torch_utils import de_parallel as unwrap_model
+    return unwrap_model(model)
+
+
+class DistillationLoss:
+    """v8DetectionLoss + 증류 손실. 학습(grad 활성) 중에만 교사를 실행합니다."""
+    def __init__(self, base_loss, teacher, student_head, teacher_head,
+                 logit_weight: float = 1.0, feature_weight: float = 1.0, temperature: float = 2.0):
+        self.base_loss = base_loss
+        self.teacher = teacher
+        self.logit_weight = logit_weight
+        self.feature_weight = feature_weight
+        self.temperature = temperature
+        self.reg_channels = student_head.reg_max * 4
+        self.reg_max = student_head.reg_max
+        self.last_kd = 0.0  # 로그용
+        self._features = {}
+        student_head.register_forward_pre_hook(self._hook('student'))
+        teacher_head.register_forward_pre_hook(self._hook('teacher'))
+
+    def _hook(self, key):
+        def _store(module, args):
+            self._features[key] = args[0]  # Detect 헤드 입력 = 넥 특징 리스트 (P3, P4, P5)
+        return _store
+
+    def __call__(self, preds, batch):
+        import torch
+
+        loss, loss_items = self.base_loss(preds, batch)
+        if not torch.is_grad_enabled() or (self.logit_weight <= 0 and self.feature_weight <= 0):
+            return loss, loss_items
+
+        student_out = preds[1] if isinstance(preds, tuple) else preds
+        with torch.no_grad():
+            teacher_preds = self.teacher(batch['img'])
+        teacher_out = teacher_preds[1] if isinstance(teacher_preds, tuple) else teacher_preds
+
+        kd = loss.new_zeros(())
+        if self.logit_weight > 0:
+            kd = kd + self.logit_weight * self._logit_loss(student_out, teacher_out)
+        if self.feature_weight > 0:
+            kd = kd + self.feature_weight * self._feature_loss(self._features['student'], self._features['teacher'])
+        self.last_kd = float(kd.detach())
+        # 기본 손실은 배치 크기를 곱한 (box, cls, dfl) 벡터이고 학습기가 합산하므로 같은 척도로 나눠 더함
+        return loss + kd * batch['img'].shape[0] / loss.numel(), loss_items
+
+    def _head_logits(self, out):
+        """
+        헤드 학습 출력을 (박스 DFL 로짓 (B, 4*reg_max, A), 클래스 로짓 (B, nc, A)) 로 맞춥니다.
+        8.4: {"boxes", "scores", "feats"} (end-to-end 헤드는 {"one2many": ...}), 이전: 레벨별 (B, C, H, W) 목록.
+        """
+        import torch
+
+        if isinstance(out, dict):
+            out = out.get("one2many", out)
+            return out["boxes"], out["scores"]
+        flat = torch.cat([level.flatten(2) for level in out], dim=2)
+        return flat[:, :self.reg_channels], flat[:, self.reg_channels:]
+
+    def _logit_loss(self, student_out, teacher_out):
+        import torch.nn.functional as F
+
+        t = self.temperature
+        s_box, s_cls = (x.float() for x in self._head_logits(student_out))
+        t_box, t_cls = (x.float() for x in self._head_logits(teacher_out))
+        cls_loss = F.binary_cross_entropy_with_logits(s_cls / t, (t_cls / t).sigmoid()) * t * t
+
+        b, _, anchors = s_box.shape
+        s_box = s_box.view(b, 4, self.reg_max, anchors)
+        t_box = t_box.view(b, 4, self.reg_max, anchors)
+        box_loss = F.kl_div(F.log_softmax(s_box / t, dim=2), F.softmax(t_box / t, dim=2),
+                            reduction='batchmean') / (4 * anchors) * t * t
+        return cls_loss + box_loss
+
+    @staticmethod
+    def _feature_loss(student_feats, teacher_feats):
+        import torch.nn.functional as F
+
+        total = 0.0
+        for s, te in zip(student_feats, teacher_feats):
+            s_att = F.normalize(s.float().pow(2).mean(1).flatten(1), dim=1)
+            t_att = F.normalize(te.float().pow(2).mean(1).flatten(1), dim=1)
+            total = total + (s_att - t_att).pow(2).sum(1).mean()
+        return total / len(student_feats)
+
+
+def make_trainer_class():
+    """ultralytics import를 지연하기 위해 클래스를 함수 안에서 정의합니다."""
+    from ultralytics import YOLO
+    from ultralytics.models.yolo.detect import DetectionTrainer
+
+    class DistillationTrainer(DetectionTrainer):
+        """학습 모델(EMA 아님)에만 증류 손실을 붙이고, 체크포인트 저장 시에는 떼어냅니다."""
+        distill_args = {}
+
+        def _setup_train(self, *args):
+            super()._setup_train(*args)  # 8.4: 인자 없음, 이전 버전: world_size
+            args = self.distill_args
+            teacher = YOLO(args.get('teacher', DEFAULT_TEACHER)).model.to(self.device).float().eval()
+            for p in teacher.parameters():
+                p.requires_grad_(False)
+            student = _unwrap(self.model)
+            if teacher.yaml.get('nc') != student.yaml.get('nc'):
+                raise ValueError(f"teacher nc={teacher.yaml.get('nc')} != student nc={student.yaml.get('nc')}")
+            student.criterion = DistillationLoss(
+                student.init_criterion(), teacher, student.model[-1], teacher.model[-1],
+                logit_weight=float(args.get('logit_weight', 1.0)),
+                feature_weight=float(args.get('feature_weight', 1.0)),
+                temperature=float(args.get('temperature', 2.0)))
+
+        def save_model(self):
+            # 증류 손실(교사 포함)이 체크포인트에 직렬화되지 않도록 잠시 제거
+            student = _unwrap(self.model)
+            criterion = getattr(student, 'criterion', None)
+            student.criterion = None
+            try:
+                super().save_model()
+            finally:
+                student.criterion = criterion
+
+    return DistillationTrainer
+
+
+def _print_kd(trainer):
+    criterion = getattr(_unwrap(trainer.model), 'criterion', None)
+    if isinstance(criterion, DistillationLoss):
+        print(f"epoch {trainer.epoch + 1}: last distillation loss {criterion.last_kd:.4f}")
+
+
+def distill(student: str, teacher: str, data: str, epochs: int, imgsz: int, batch: int, device,
+            logit_weight: float = 1.0, feature_weight: float = 1.0, temperature: float = 2.0,
+            name: str = 'distill', **overrides) -> str:
+    """학생 모델을 증류 학습하고 best.pt 경로를 반환합니다. (단일 장치만 지원: DDP는 학습기를 새 프로세스로 띄움)"""
+    trainer_cls = make_trainer_class()
+    args = dict(model=student, data=data, epochs=epochs, imgsz=imgsz, batch=batch, device=device,
+                project='runs/distill', name=name, exist_ok=True)
+    args.update(overrides)
+    trainer = trainer_cls(overrides=args)
+    trainer.distill_args = {'teacher': teacher, 'logit_weight': logit_weight,
+                            'feature_weight': feature_weight, 'temperature': temperature}
+    trainer.add_callback('on_train_epoch_end', _print_kd)
+    trainer.train()
+    return str(trainer.best if os.path.exists(trainer.best) else trainer.last)
+
+
+def cpu_benchmark(model_path: str, images: list, runs: int = 3, imgsz: int | None = None) -> dict:
+    """
+    DefectDetector로 CPU 검출 지연(중앙값/p95, ms)과 처리량(frame/s)을 측정합니다
+    (앱과 같은 전/후처리 포함).
+    """
+    import config
+    from detector import DefectDetector
+
+    app_config = config.load_config()
+    app_config['model_path'] = model_path
+    if imgsz:
+        app_config['imgsz'] = imgsz
+    detector = DefectDetector(app_config)
+    detector.device = 'cpu'
+    if not detector.is_ready or not images:
+        return {"cpu_ms": float('nan'), "cpu_p95_ms": float('nan'), "cpu_fps": 0.0}
+    detector.detect(images[0], "FRONT")  # 워밍업
+    times = []
+    for _ in range(runs):
+        for img in images:
+            start = time.perf_counter()
+            detector.detect(img, "FRONT")
+            times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return {
+        "cpu_ms": statistics.median(times),
+        "cpu_p95_ms": times[min(len(times) - 1, int(len(times) * 0.95))],
+        "cpu_fps": 1000 * len(times) / sum(times),
+    }
+
+
+def load_val_images(val_images: str = './neu_yolo_data/images/val', count: int = 20) -> list:
+    paths = sorted(glob.glob(os.path.join(val_images, '*')))[:count]
+    return [img for img in (cv2.imread(p) for p in paths) if img is not None]
+
+
+def compare_models(models: dict, data: str, imgsz: int, val_images: str = './neu_yolo_data/images/val',
+                   latency_images: int = 20, device=None) -> list[dict]:
+    """{이름: 가중치} 모델들의 mAP50-95/mAP50과 CPU 지연을 비교한 행 목록."""
+    from ultralytics import YOLO
+
+    images = load_val_images(val_images, latency_images)
+    rows = []
+    for name, weights in models.items():
+        metrics = YOLO(weights).val(data=data, imgsz=imgsz, device=device, plots=False, verbose=False)
+        rows.append({
+            "model": name,
+            "weights": weights,
+            "mAP50-95": float(metrics.box.map),
+            "mAP50": float(metrics.box.map50),
+            "cpu_ms": cpu_benchmark(weights, images, imgsz=imgsz)["cpu_ms"],
+        })
+    return rows
+
+
+def format_table(rows: list[dict]) -> str:
+    lines = ["| model | mAP50-95 | mAP50 | CPU ms/frame | weights |", "|---|---|---|---|---|"]
+    for r in rows:
+        lines.append(f"| {r['model']} | {r['mAP50-95']:.4f} | {r['mAP50']:.4f} | {r['cpu_ms']:.1f} | {r['weights']} |")
+    return "\n".join(lines)
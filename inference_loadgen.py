@@ -0,0 +1,133 @@
+"""
+추론 서버 부하 생성기.
+
+여러 스테이션(각각 FRONT/BACK 카메라)을 스레드로 시뮬레이션하여 동시성 단계별
+처리량(req/s)과 지연 시간(p50/p95/p99)을 측정합니다.
+
+사용 예:
+    python inference_server.py &
+    python inference_loadgen.py --concurrency 1 2 4 8 16 --duration 10
+    python inference_loadgen.py --images data/captures --csv data/results/loadgen.csv
+"""
+import argparse
+import csv
+import threading
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+import config
+from detector import InferenceClient
+
+ERROR_BACKOFF_S = (0.05, 1.0)    # 연속 오류 시 대기 시간 (처음, 최대) - 서버가 죽었을 때 CPU를 태우지 않도록
+MAX_CONSECUTIVE_ERRORS = 20      # 이만큼 연속 실패하면 해당 스테이션 중단
+
+
+def load_frames(image_dir: str | None, width: int, height: int, count: int = 4) -> list[np.ndarray]:
+    """테스트 프레임을 준비합니다 (폴더 이미지 또는 무작위 노이즈 프레임)."""
+    frames = []
+    if image_dir:
+        for path in sorted(Path(image_dir).glob("*.png"))[:count] + sorted(Path(image_dir).glob("*.jpg"))[:count]:
+            img = cv2.imread(str(path))
+            if img is not None:
+                frames.append(img)
+    if not frames:
+        rng = np.random.default_rng(0)
+        frames = [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(count)]
+    return frames
+
+
+def run_level(server: str, concurrency: int, duration: float, frames: list[np.ndarray]) -> dict:
+    """concurrency 개의 카메라 스트림을 duration 초 동안 닫힌 루프(응답 후 다음 요청)로 실행합니다."""
+    base_config = config.load_config()
+    base_config["inference_server"] = server
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def _station(worker_id: int):
+        client = InferenceClient(base_config, load_model=False)
+        camera = "FRONT" if worker_id % 2 == 0 else "BACK"
+        local = []
+        i = worker_id
+        failures = 0
+        while time.perf_counter() < stop_at:
+            frame = frames[i % len(frames)]
+            i += 1
+            t0 = time.perf_counter()
+            try:
+                client.detect(frame, camera)
+            except Exception as e:
+                with lock:
+                    errors[0] += 1
+                failures += 1
+                if failures >= MAX_CONSECUTIVE_ERRORS:
+                    print(f"station {worker_id}: {failures} consecutive errors, stopping ({e!r})")
+                    break
+                time.sleep(min(ERROR_BACKOFF_S[0] * 2 ** (failures - 1), ERROR_BACKOFF_S[1]))
+                continue
+            failures = 0
+            local.append((time.perf_counter() - t0) * 1000)
+        client.close()
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=_station, args=(i,)) for i in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+
+    def _pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] if latencies else float("nan")
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors[0],
+        "throughput_rps": len(latencies) / elapsed if elapsed > 0 else 0.0,
+        "p50_ms": _pct(0.50),
+        "p95_ms": _pct(0.95),
+        "p99_ms": _pct(0.99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="추론 서버 부하 테스트")
+    parser.add_argument("--server", default="http://127.0.0.1:8765")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16],
+                        help="동시 카메라 스트림 수 (스테이션 수 x 2)")
+    parser.add_argument("--duration", type=float, default=10.0, help="단계별 측정 시간(초)")
+    parser.add_argument("--images", help="테스트 이미지 폴더 (생략 시 무작위 프레임)")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--csv", help="결과 CSV 저장 경로")
+    args = parser.parse_args()
+
+    frames = load_frames(args.images, args.width, args.height)
+    rows = []
+    print(f"{'conc':>5} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'err':>5}")
+    for level in args.concurrency:
+        row = run_level(args.server, level, args.duration, frames)
+        rows.append(row)
+        print(f"{row['concurrency']:>5} {row['throughput_rps']:>8.1f} {row['p50_ms']:>8.1f} "
+              f"{row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} {row['errors']:>5}")
+
+    if args.csv:
+        Path(args.csv).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"saved: {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
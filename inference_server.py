@@ -0,0 +1,158 @@
+"""
+여러 검사 스테이션이 공유하는 로컬 추론 서버.
+
+모델을 한 번만 로드하고, 여러 스테이션/카메라의 요청을 max-wait 기한 안에서 모아
+동적 배치(dynamic batching)로 추론한 뒤 요청별 Defect 리스트(JSON)를 돌려줍니다.
+
+사용 예:
+    python inference_server.py --port 8765 --max-batch 8 --max-wait-ms 10
+    (스테이션 config.json) "inference_server": "http://127.0.0.1:8765"
+
+프로토콜:
+    POST /detect  본문 = 프레임 원시 바이트, 헤더 X-Shape("h,w,c"), X-Dtype, X-Camera, X-Pixels-Per-Mm
+    GET  /health  {"ready": bool, "requests": n, "batches": n, "avg_batch": f}
+"""
+import argparse
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+import config
+import resource_budget
+from detector import DefectDetector
+
+DEFAULT_PORT = 8765
+
+
+class DynamicBatcher:
+    """
+    요청을 큐에 모았다가 max_batch 개가 차거나 첫 요청 후 max_wait 초가 지나면 한 번에 추론합니다.
+    """
+    def __init__(self, detector: DefectDetector, max_batch: int = 8, max_wait: float = 0.01):
+        self.detector = detector
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.requests = 0
+        self.batches = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="dynamic-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, image: np.ndarray, camera_name: str, pixels_per_mm: float) -> Future:
+        future = Future()
+        self._queue.put((image, camera_name, pixels_per_mm, future))
+        return future
+
+    def _collect(self) -> list:
+        """첫 요청을 기다린 뒤, 기한 안에 들어온 요청을 최대 max_batch 개까지 모읍니다."""
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            images, names, scales, futures = zip(*batch)
+            try:
+                results = self.detector.detect_batch(list(images), list(names), list(scales))
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                continue
+            self.requests += len(batch)
+            self.batches += 1
+            for future, defects in zip(futures, results):
+                future.set_result(defects)
+
+
+class InferenceRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive (스테이션별 연결 재사용)
+    batcher: DynamicBatcher = None
+
+    def _send_json(self, status: int, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != "/health":
+            self._send_json(404, {"error": "not found"})
+            return
+        batcher = self.batcher
+        self._send_json(200, {
+            "ready": batcher.detector.is_ready,
+            "requests": batcher.requests,
+            "batches": batcher.batches,
+            "avg_batch": batcher.requests / batcher.batches if batcher.batches else 0.0,
+        })
+
+    def do_POST(self):
+        if self.path != "/detect":
+            self._send_json(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers["Content-Length"])
+            shape = tuple(int(v) for v in self.headers["X-Shape"].split(","))
+            dtype = np.dtype(self.headers.get("X-Dtype", "|u1"))
+            camera_name = self.headers.get("X-Camera", "FRONT")
+            pixels_per_mm = float(self.headers["X-Pixels-Per-Mm"])
+            image = np.frombuffer(self.rfile.read(length), dtype=dtype).reshape(shape)
+        except (KeyError, TypeError, ValueError) as e:
+            self._send_json(400, {"error": f"bad request: {e}"})
+            return
+
+        try:
+            defects = self.batcher.submit(image, camera_name, pixels_per_mm).result()
+        except Exception as e:
+            self._send_json(500, {"error": repr(e)})
+            return
+        self._send_json(200, [asdict(d) for d in defects])
+
+    def log_message(self, format, *args):
+        pass  # 요청마다 출력하지 않음
+
+
+def serve(config_data: dict, host: str, port: int, max_batch: int, max_wait_ms: float):
+    resource_budget.apply_inference_process(config_data)
+    detector = DefectDetector(config_data)
+    InferenceRequestHandler.batcher = DynamicBatcher(detector, max_batch, max_wait_ms / 1000)
+    server = ThreadingHTTPServer((host, port), InferenceRequestHandler)
+    server.daemon_threads = True
+    print(f"Inference server listening on http://{host}:{port} (max_batch={max_batch}, max_wait={max_wait_ms}ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="동적 배치 추론 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--max-batch", type=int, default=8)
+    parser.add_argument("--max-wait-ms", type=float, default=10.0)
+    args = parser.parse_args()
+    serve(config.load_config(), args.host, args.port, args.max_batch, args.max_wait_ms)
+
+
+if __name__ == "__main__":
+    main()
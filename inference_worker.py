@@ -0,0 +1,265 @@
+import itertools
+import queue
+import threading
+import time
+import multiprocessing as mp
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from defect import Defect
+
+DEFAULT_SLOTS = 4
+STARTUP_TIMEOUT = 300.0   # 모델 로딩(최초 torch import 포함) 대기 시간
+INFERENCE_TIMEOUT = 30.0
+
+
+def _slot_bytes_for(config_data: dict) -> int:
+    """카메라 캡처 해상도(BGR 3채널) 기준으로 슬롯 하나의 크기를 계산합니다."""
+    largest = 0
+    for name in ("front", "back"):
+        capture = config_data.get(name, {}).get('capture', {})
+        largest = max(largest, int(capture.get('width') or 0) * int(capture.get('height') or 0) * 3)
+    return largest or 1920 * 1080 * 3  # 해상도 미설정 시 FHD 기준 (더 큰 프레임이 오면 자동 확장)
+
+
+def _worker_main(config_data: dict, shm_names: list[str], requests, responses):
+    """
+    추론 워커 프로세스 본체.
+    제어 큐로는 (요청 ID, 슬롯 번호, shape, dtype, 카메라) 만 받고, 픽셀은 공유 메모리에서 직접 읽습니다.
+    """
+    import resource_budget
+    resource_budget.apply_inference_process(config_data)  # torch import 전에 코어 고정
+    from detector import DefectDetector
+
+    shms = [shared_memory.SharedMemory(name=name) for name in shm_names]
+    detector = DefectDetector(config_data)
+    responses.put(("ready", detector.is_ready))
+
+    while True:
+        msg = requests.get()
+        if msg is None:
+            break
+        req_id, slot, shape, dtype, camera_name = msg
+        image = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shms[slot].buf)
+        try:
+            defects = detector.detect(image, camera_name)
+            responses.put((req_id, defects, None))
+        except Exception as e:
+            responses.put((req_id, None, repr(e)))
+        finally:
+            del image  # 공유 메모리 버퍼 참조 해제
+
+    for shm in shms:
+        shm.close()
+
+
+class RemoteDetector:
+    """
+    DefectDetector를 별도 프로세스에서 실행하는 클래스 (DefectDetector와 같은 detect() 인터페이스).
+    프레임은 카메라 해상도 크기의 공유 메모리 슬롯으로 전달되어 pickle 되지 않으며,
+    워커가 죽거나 응답이 없으면(INFERENCE_TIMEOUT) 백그라운드 스레드에서 다시 시작합니다.
+    재시작(모델 로딩) 중의 요청은 기다리지 않고 바로 RuntimeError로 실패합니다 (GUI 스레드를 막지 않도록).
+    """
+    def __init__(self, config_data: dict, load_model: bool = True, slots: int = DEFAULT_SLOTS):
+        self.config = config_data
+        self._num_slots = slots
+        self._slot_bytes = _slot_bytes_for(config_data)
+        self._process = None
+        self._shms = []
+        self._free_slots = None
+        self._requests = None
+        self._responses = None
+        self._reader = None
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._ready = False
+        self._ready_event = threading.Event()  # 워커의 "ready" 응답 수신 (모델 로딩 성공 여부와 무관)
+        self._closing = False
+        self._shutdown = False
+        self._start_lock = threading.Lock()    # _start/_stop 직렬화 (백그라운드 재시작 vs close)
+        self._restarter = None
+
+        if load_model:
+            self.load_model()
+
+    @property
+    def is_ready(self) -> bool:
+        return self._ready and self._process is not None and self._process.is_alive()
+
+    def load_model(self):
+        """워커 프로세스를 시작하고 모델 로딩이 끝날 때까지 기다립니다."""
+        with self._start_lock:
+            self._start()
+        self._wait_ready()
+
+    def _wait_ready(self):
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while not self._ready_event.wait(0.5):
+            if self._shutdown:
+                return
+            if time.monotonic() > deadline:
+                print("Inference worker did not become ready in time.")
+                return
+
+    def _start(self):
+        ctx = mp.get_context("spawn")  # torch/Qt 상태를 복제하지 않도록 spawn 사용
+        self._shms = [shared_memory.SharedMemory(create=True, size=self._slot_bytes)
+                      for _ in range(self._num_slots)]
+        self._free_slots = queue.Queue()
+        for i in range(self._num_slots):
+            self._free_slots.put(i)
+        self._requests = ctx.Queue()
+        self._responses = ctx.Queue()
+        self._ready_event.clear()
+        self._process = ctx.Process(target=_worker_main, name="inference-worker", daemon=True,
+                                    args=(self.config, [shm.name for shm in self._shms],
+                                          self._requests, self._responses))
+        self._process.start()
+        print(f"Inference worker started (pid {self._process.pid}, {self._num_slots} x {self._slot_bytes} B slots)")
+
+        self._reader = threading.Thread(target=self._read_responses, name="inference-results", daemon=True,
+                                        args=(self._process, self._responses, self._free_slots))
+        self._reader.start()
+
+    def _read_responses(self, process, responses, free_slots):
+        """워커 응답을 받아 Future를 완료시키고 슬롯을 반환합니다. 워커가 죽으면 대기 중인 요청을 실패 처리합니다."""
+        while not self._closing:
+            try:
+                msg = responses.get(timeout=0.5)
+            except queue.Empty:
+                if not process.is_alive():
+                    break
+                continue
+            if msg[0] == "ready":
+                self._ready = bool(msg[1])
+                self._ready_event.set()
+                continue
+            req_id, defects, error = msg
+            with self._lock:
+                future, slot = self._pending.pop(req_id, (None, None))
+            if slot is not None:
+                free_slots.put(slot)
+            if future is None:
+                continue
+            if error is None:
+                future.set_result(defects)
+            else:
+                future.set_exception(RuntimeError(f"inference worker error: {error}"))
+
+        if not self._closing:
+            print(f"Inference worker exited unexpectedly (exit code {process.exitcode}).")
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for future, _slot in pending.values():
+            future.set_exception(RuntimeError("inference worker crashed"))
+
+    def _stop(self):
+        """워커 프로세스와 공유 메모리를 정리합니다."""
+        self._closing = True
+        if self._process is not None:
+            if self._process.is_alive():
+                self._requests.put(None)
+                self._process.join(timeout=5)
+            if self._process.is_alive():
+                self._process.terminate()
+                self._process.join(timeout=5)
+        if self._reader is not None:
+            self._reader.join(timeout=2)
+        for shm in self._shms:
+            shm.close()
+            shm.unlink()
+        self._process = None
+        self._reader = None
+        self._shms = []
+        self._ready = False
+        self._closing = False
+
+    def restart(self):
+        """워커를 다시 시작하고 준비될 때까지 기다립니다 (크래시 복구 또는 슬롯 크기 변경 시)."""
+        with self._start_lock:
+            if self._shutdown:
+                return
+            self._stop()
+            self._start()
+        self._wait_ready()
+
+    def _restart_async(self, reason: str):
+        """백그라운드 스레드에서 재시작합니다. 이미 재시작 중이면 아무것도 하지 않습니다."""
+        with self._lock:
+            if self._shutdown or (self._restarter is not None and self._restarter.is_alive()):
+                return
+            print(f"{reason}: restarting inference worker in background.")
+            self._ready = False
+            self._restarter = threading.Thread(target=self.restart, name="inference-restart", daemon=True)
+            self._restarter.start()
+
+    @property
+    def _restarting(self) -> bool:
+        return self._restarter is not None and self._restarter.is_alive()
+
+    def submit(self, image: np.ndarray, camera_name: str) -> Future:
+        """
+        프레임을 빈 슬롯에 복사하고 추론을 요청합니다. 결과는 Future로 반환됩니다.
+        워커가 시작 중/재시작 중이거나 빈 슬롯이 없으면 기다리지 않고 RuntimeError를 던집니다.
+        """
+        if self._restarting:
+            raise RuntimeError("inference worker is restarting")
+        if image.nbytes > self._slot_bytes:
+            self._slot_bytes = image.nbytes
+            self._restart_async(f"Frame ({image.nbytes} B) larger than slot")
+            raise RuntimeError("inference worker is resizing slots")
+        if self._process is None or not self._process.is_alive():
+            self._restart_async("Inference worker is not running")
+            raise RuntimeError("inference worker is not running")
+        if not self._ready_event.is_set():
+            raise RuntimeError("inference worker is still loading the model")
+
+        try:
+            slot = self._free_slots.get(timeout=INFERENCE_TIMEOUT)
+        except queue.Empty:
+            # 모든 슬롯이 응답 없는 요청에 묶여 있음 = 워커가 멈춤
+            self._restart_async("No free inference slot")
+            raise RuntimeError("inference worker is not responding") from None
+        view = np.ndarray(image.shape, dtype=image.dtype, buffer=self._shms[slot].buf)
+        np.copyto(view, image)
+        del view
+
+        future = Future()
+        req_id = next(self._ids)
+        with self._lock:
+            self._pending[req_id] = (future, slot)
+        self._requests.put((req_id, slot, image.shape, image.dtype.str, camera_name))
+        return future
+
+    def detect(self, image: np.ndarray, camera_name: str) -> list[Defect]:
+        if image is None:
+            return []
+        future = self.submit(image, camera_name)
+        try:
+            return future.result(timeout=self.config.get('inference_timeout', INFERENCE_TIMEOUT))
+        except FutureTimeoutError:
+            self._abandon(future)
+            self._restart_async("Inference worker timed out")
+            raise RuntimeError("inference worker timed out") from None
+
+    def _abandon(self, future: Future):
+        """시간 초과된 요청의 슬롯을 돌려줍니다. 늦게 도착한 응답은 _read_responses 에서 버려집니다."""
+        with self._lock:
+            for req_id, (pending, slot) in self._pending.items():
+                if pending is future:
+                    del self._pending[req_id]
+                    self._free_slots.put(slot)
+                    break
+
+    def close(self):
+        with self._lock:
+            self._shutdown = True
+            restarter = self._restarter
+        self._ready_event.set()  # 재시작 스레드의 준비 대기를 깨움
+        if restarter is not None:
+            restarter.join(timeout=10)
+        with self._start_lock:
+            self._stop()
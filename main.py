@@ -1,10 +1,7 @@
 import sys
 import os
-import cv2
-import numpy as np
 import config
 from PyQt5.QtWidgets import QApplication
-from main_window import MainWindow
 
 def setup_environment():
     """프로그램 실행에 필요한 폴더와 샘플 파일을 생성합니다."""
@@ -18,6 +15,26 @@ def setup_environment():
     front_sample_path = config.SAMPLE_IMAGE_DIR / "sample_front.png"
     back_sample_path = config.SAMPLE_IMAGE_DIR / "sample_back.png"
 
+    if front_sample_path.exists() and back_sample_path.exists():
+        return
+
+    # 샘플 생성이 필요할 때만 OpenCV/Numpy를 불러옴
+    import cv2
+    import numpy as np
+
+    # NEU-DET이 있으면 결함이 들어간 합성 강판 프레임을 샘플로 사용
+    neu_root = config.BASE_DIR / "NEU-DET"
+    if neu_root.exists():
+        from synthetic_frames import SyntheticFrameGenerator, load_patches
+
+        patches = load_patches(str(neu_root), splits=('validation',))
+        if patches:
+            generator = SyntheticFrameGenerator(patches, 640, 480, min_defects=1, texture_bank=1)
+            for index, path in enumerate((front_sample_path, back_sample_path)):
+                if not path.exists():
+                    cv2.imwrite(str(path), generator.frame(index)[0])
+            return
+
     if not front_sample_path.exists():
         dummy_image = np.zeros((480, 640, 3), dtype=np.uint8)
         cv2.putText(dummy_image, "Sample Front Image", (150, 240), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
@@ -30,6 +47,10 @@ def setup_environment():
 
 if __name__ == "__main__":
     setup_environment()
+
+    # 역할별 코어/스레드 예산 (config.json "resources") - Qt/OpenCV 스레드 생성 전에 적용
+    import resource_budget
+    resource_budget.apply_ui_process(config.load_config())
     
     # Fix for Qt platform plugin "windows" not found error
     import PyQt5
@@ -44,6 +65,9 @@ if __name__ == "__main__":
     print(f"Setting QT_QPA_PLATFORM_PLUGIN_PATH to: {plugin_path}")
 
     app = QApplication(sys.argv)
-    main_win = MainWindow()
+
+    # 무거운 모듈(torch/ultralytics/matplotlib)은 MainWindow 내부에서 지연 로딩됨
+    from main_window import MainWindow
+    main_win = MainWindow(startup_benchmark="--startup-benchmark" in sys.argv)
     main_win.show()
     sys.exit(app.exec_())
\ No newline at end of file
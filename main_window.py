@@ -1,4 +1,5 @@
 import sys
+import time
 import cv2
 import numpy as np
 import csv
@@ -9,43 +10,79 @@ from pathlib import Path
 from PyQt5.QtWidgets import (QMainWindow, QApplication, QWidget, QVBoxLayout, QHBoxLayout,
                              QPushButton, QLabel, QComboBox, QTableWidget, QTableWidgetItem,
                              QMessageBox, QGridLayout, QGroupBox, QHeaderView, QAction, QFileDialog,
-                             QRadioButton, QButtonGroup, QSplitter, QTabWidget)
+                             QRadioButton, QButtonGroup, QSplitter, QTabWidget, QInputDialog)
 from PyQt5.QtGui import QPixmap, QImage, QFont, QColor
-from PyQt5.QtCore import Qt, QTimer
-
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-import matplotlib.pyplot as plt
+from PyQt5.QtCore import Qt, QTimer, QThread, pyqtSignal
 
 import config
 from camera_manager import CameraManager
-from detector import DefectDetector
+from defect_tracker import DefectTracker
+from detector import create_detector
+from overlay_renderer import OverlayRenderer
+from quality_gate import QualityGate, append_quality_log
+from spc import SPCEngine
+from crop_store import BACKGROUND, CropStore
+from monitor_server import MonitorServer, verdict_event
+from sheet_map import CoilMap, SheetPosition
 from settings_dialog import SettingsDialog
 
+MAX_LOG_ROWS = 500  # 좌측 로그 테이블 최대 행 수 (무인 장시간 운전 대비)
+
+class ModelLoader(QThread):
+    """YOLO 모델(torch/ultralytics import 포함)을 백그라운드에서 로드하는 스레드"""
+    loaded = pyqtSignal(bool)
+
+    def __init__(self, detector, parent=None):
+        super().__init__(parent)
+        self.detector = detector
+
+    def run(self):
+        self.detector.load_model()
+        self.loaded.emit(self.detector.is_ready)
+
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, startup_benchmark: bool = False):
         super().__init__()
+        self.startup_benchmark = startup_benchmark
         self.app_config = config.load_config()
-        self.camera_manager = CameraManager()
-        self.detector = DefectDetector(self.app_config)
+        self.camera_manager = CameraManager(grayscale=self.app_config.get('grayscale', False))
+        self.detector = create_detector(self.app_config, load_model=False)
+        self.model_loader = None
+        self.overlay_renderer = OverlayRenderer()
+        self.tracker = self._create_tracker()
+        self.quality_gate = self._create_quality_gate()
+        self.crop_store = self._create_crop_store()
+        self.coil_map, self.sheet_position = self._create_coil_map()
+        self.monitor = self._create_monitor()
 
         self.img_front = None
         self.img_back = None
         self.defects = []
+        self.inspection_id = None   # 검사마다 부여 (quality_log.csv 와 report.csv 연결)
+        self.frame_quality = {}     # 카메라 -> 검사에 사용한 프레임의 품질 점수
         self.env_data = {"temp": 0, "humid": 0, "dust": 0}
-        self.history_cracks = [] # 트렌드 차트용 데이터
+        self.spc = SPCEngine(self.app_config.get('spc', {}))  # 트렌드/관리한계/공정능력 (스트리밍 집계)
         self.defect_counts = {"crack": 0, "hole": 0, "nut": 0} # 파이 차트용
 
-        # Matplotlib 한글 폰트 설정 (Windows 기준)
-        plt.rcParams['font.family'] = 'Malgun Gothic'
+        # 대시보드 차트(matplotlib)는 탭을 처음 열 때 생성 (시작 시간 단축)
+        self.figure = None
+        self.canvas = None
 
         self.preview_timer = QTimer(self)
         self.preview_timer.timeout.connect(self._update_previews)
 
+        self._first_frame_shown = False
+        self._model_load_done = False
         self._init_ui()
-        
-        # FR-AutoConnect: 3초 후 카메라 자동 연결 시도
-        QTimer.singleShot(3000, self._connect_cameras)
+
+        # 창을 먼저 띄운 뒤 모델은 백그라운드에서 로드
+        self._start_model_loading()
+
+        if self.startup_benchmark:
+            QTimer.singleShot(0, self._benchmark_first_frame)
+        else:
+            # FR-AutoConnect: 3초 후 카메라 자동 연결 시도
+            QTimer.singleShot(3000, self._connect_cameras)
 
     def _init_ui(self):
         self.setWindowTitle("SteelAI-Dual Inspector")
@@ -143,6 +180,7 @@ class MainWindow(QMainWindow):
 
         tabs = QTabWidget()
         right_layout.addWidget(tabs)
+        self.tabs = tabs
 
         # Tab 1: 검사 (Inspection)
         tab_inspection = QWidget()
@@ -169,6 +207,18 @@ class MainWindow(QMainWindow):
         self.inspect_btn.setStyleSheet("font-weight: bold; font-size: 20px; background-color: #2196F3; color: white;")
         
         btn_layout.addWidget(self.inspect_btn)
+
+        # 작업자 판정 수정: 현재 검사의 결함 크롭을 라벨링 대기열에 등록 (crop_store 사용 시)
+        review_layout = QHBoxLayout()
+        self.review_btn = QPushButton("검수 요청")
+        self.review_btn.clicked.connect(lambda: self._queue_current_crops(None))
+        self.false_positive_btn = QPushButton("오검출 표시")
+        self.false_positive_btn.clicked.connect(lambda: self._queue_current_crops(BACKGROUND))
+        for btn in (self.review_btn, self.false_positive_btn):
+            btn.setMinimumHeight(40)
+            btn.setEnabled(self.crop_store is not None)
+            review_layout.addWidget(btn)
+        btn_layout.addLayout(review_layout)
         inspect_layout.addWidget(btn_group)
         
         # 1-3. 시스템 제어 (System Control) - New location for Connect, Capture, Resume
@@ -202,25 +252,79 @@ class MainWindow(QMainWindow):
         dash_layout = QVBoxLayout(tab_dashboard)
 
         chart_group = QGroupBox("분석 차트")
-        chart_layout = QVBoxLayout(chart_group)
+        self.chart_layout = QVBoxLayout(chart_group)
+        dash_layout.addWidget(chart_group)
         
+        self.dashboard_tab_index = tabs.addTab(tab_dashboard, "대시보드")
+        tabs.currentChanged.connect(self._on_tab_changed)
+
+        content_layout.addWidget(right_panel)
+
+        self.showFullScreen() # Kiosk Mode (Full Screen) - Moved here to ensure widgets exist
+
+    def _init_charts(self):
+        """matplotlib을 지연 import 하여 대시보드 차트를 생성합니다."""
+        import matplotlib
+        from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+        from matplotlib.figure import Figure
+
+        # Matplotlib 한글 폰트 설정 (Windows 기준)
+        matplotlib.rcParams['font.family'] = 'Malgun Gothic'
+
         self.figure = Figure(figsize=(4, 6), dpi=100)
         self.canvas = FigureCanvas(self.figure)
         self.ax1 = self.figure.add_subplot(211) # Trend
         self.ax2 = self.figure.add_subplot(212) # Pie
         self.figure.tight_layout()
-        
-        chart_layout.addWidget(self.canvas)
-        dash_layout.addWidget(chart_group)
-        
-        tabs.addTab(tab_dashboard, "대시보드")
+        self.chart_layout.addWidget(self.canvas)
+
+    def _on_tab_changed(self, index):
+        if index == self.dashboard_tab_index:
+            if self.canvas is None:
+                self._init_charts()
+            self._update_charts()
+
+    def _start_model_loading(self):
+        """모델 로딩 상태를 표시하고 백그라운드 로딩을 시작합니다."""
+        self._model_load_done = False
+        self.inspect_btn.setEnabled(False)
+        self.lbl_final_result.setText("MODEL\nLOADING...")
+        self.lbl_final_result.setStyleSheet("color: gray; border: 2px solid gray;")
 
-        content_layout.addWidget(right_panel)
+        self.model_loader = ModelLoader(self.detector, self)
+        self.model_loader.loaded.connect(self._on_model_loaded)
+        self.model_loader.start()
+
+    def _on_model_loaded(self, ok):
+        if self.sender() is not self.model_loader:
+            return  # 설정 변경으로 교체된 이전 로딩 결과는 무시
+        self._model_load_done = True
+        self.inspect_btn.setEnabled(True)
+        self.lbl_final_result.setText("READY")
+        if ok:
+            self.statusBar().showMessage("AI 모델 로딩 완료", 3000)
+        else:
+            self.statusBar().showMessage("AI 모델 로딩 실패 - 설정에서 모델 경로를 확인하세요.")
+        if self.startup_benchmark:
+            self._report_startup("model_ready")
+            self._finish_startup_benchmark()
+
+    def _report_startup(self, event):
+        """시작 시간 벤치마크용 마커 출력 (startup_bench.py가 파싱)"""
+        print(f"STARTUP {event} {time.time():.6f}", flush=True)
+
+    def _benchmark_first_frame(self):
+        """벤치마크 모드: 메시지 창 없이 카메라(없으면 샘플 이미지)로 첫 프레임을 표시합니다."""
+        self._report_startup("window_shown")
+        if self.camera_manager.open(self.app_config['front'], self.app_config['back']):
+            self.preview_timer.start(30)
+        else:
+            img = self._read_sample(config.SAMPLE_IMAGE_DIR / "sample_front.png")
+            self._display_image(img, self.front_view)
 
-        # 초기 차트 그리기
-        self._update_charts()
-        
-        self.showFullScreen() # Kiosk Mode (Full Screen) - Moved here to ensure widgets exist
+    def _finish_startup_benchmark(self):
+        if self._first_frame_shown and self._model_load_done:
+            QTimer.singleShot(0, self.close)
 
     def _exit_program(self):
         """프로그램 종료 시 확인 대화상자를 띄웁니다."""
@@ -242,7 +346,29 @@ class MainWindow(QMainWindow):
         if dlg.exec_():
             self.app_config = dlg.get_settings()
             config.save_config(self.app_config)
-            self.detector = DefectDetector(self.app_config) # 설정 변경 시 디텍터(픽셀값 등) 업데이트
+            self.camera_manager.grayscale = self.app_config.get('grayscale', False)
+            # 설정 변경 시 디텍터(픽셀값 등) 업데이트 - 모델은 백그라운드에서 다시 로드
+            if self.model_loader is not None and self.model_loader.isRunning():
+                self.model_loader.wait()
+            self.detector.close()
+            self.detector = create_detector(self.app_config, load_model=False)
+            self._record_defects(self.tracker.flush() if self.tracker else [])
+            self.tracker = self._create_tracker()
+            self.quality_gate = self._create_quality_gate()
+            self.crop_store = self._create_crop_store()
+            for btn in (self.review_btn, self.false_positive_btn):
+                btn.setEnabled(self.crop_store is not None)
+            # 모니터(포트/해상도)와 코일 맵(축척/위치원)도 새 설정으로 다시 생성 - 코일 맵은 새 코일로 기록
+            if self.monitor is not None:
+                self.monitor.close()
+            self.monitor = self._create_monitor()
+            if self.coil_map is not None:
+                self.coil_map.close()
+            self.coil_map, self.sheet_position = self._create_coil_map()
+            if self.app_config.get('sheet_map', {}).get('enabled', False) and self.coil_map is None:
+                QMessageBox.warning(self, "코일 맵", "길이 방향 위치를 알 수 없어 코일 맵을 끕니다.\n"
+                                    "컨베이어 속도(tracking) 또는 frame_pitch_mm(sheet_map)을 설정하세요.")
+            self._start_model_loading()
             QMessageBox.information(self, "설정 저장", "설정이 저장되었습니다. 카메라를 재연결해주세요.")
 
     def _connect_cameras(self):
@@ -268,6 +394,9 @@ class MainWindow(QMainWindow):
             self._display_image(img_f, self.front_view)
         if img_b is not None:
             self._display_image(img_b, self.back_view)
+        if self.monitor is not None:
+            self.monitor.publish_frame("front", img_f)
+            self.monitor.publish_frame("back", img_b)
         
         # 환경 정보도 주기적으로 업데이트 (실제로는 센서 주기 따름)
         self._update_environment()
@@ -284,8 +413,8 @@ class MainWindow(QMainWindow):
             if not front_path.exists() or not back_path.exists():
                  QMessageBox.critical(self, "오류", f"샘플 이미지를 찾을 수 없습니다: {front_path}")
                  return
-            img_f = cv2.imread(str(front_path))
-            img_b = cv2.imread(str(back_path))
+            img_f = self._read_sample(front_path)
+            img_b = self._read_sample(back_path)
 
         self.img_front = img_f
         self.img_back = img_b
@@ -328,19 +457,38 @@ class MainWindow(QMainWindow):
         # FR-02: 자동 촬영 (Auto Capture)
         img_f, img_b = self.camera_manager.capture_both()
 
+        from_camera = img_f is not None and img_b is not None
+        self.inspection_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
+        self.frame_quality = {}
+
         # SR-03: 오류 처리 (카메라 캡처 실패)
         if img_f is None or img_b is None:
             # 테스트를 위해 샘플 이미지 로드 (Fallback)
             front_path = config.SAMPLE_IMAGE_DIR / "sample_front.png"
             back_path = config.SAMPLE_IMAGE_DIR / "sample_back.png"
             if front_path.exists() and back_path.exists():
-                img_f = cv2.imread(str(front_path))
-                img_b = cv2.imread(str(back_path))
+                img_f = self._read_sample(front_path)
+                img_b = self._read_sample(back_path)
             else:
                 self.lbl_final_result.setText("ERROR")
                 QMessageBox.critical(self, "오류", "카메라 캡처 실패")
                 return
 
+        # 품질 게이트: 흐림/노출/반사광 프레임은 추론하지 않고 카메라에서 다시 촬영 (횟수 제한)
+        if self.quality_gate is not None:
+            img_f, img_b, accepted, reasons, self.frame_quality = self._gate_frames(img_f, img_b, from_camera)
+            if not accepted:
+                self.img_front, self.img_back = img_f, img_b
+                self._display_image(self.img_front, self.front_view)
+                self._display_image(self.img_back, self.back_view)
+                self.lbl_final_result.setText("RECAPTURE")
+                self.lbl_final_result.setStyleSheet("color: white; background-color: #FF9800; border: 2px solid #FF9800;")
+                self.statusBar().showMessage(f"프레임 품질 불량으로 검사하지 않음: {reasons}", 5000)
+                self._update_log("RECAPTURE", None)
+                if self.monitor is not None:
+                    self.monitor.publish_event({**verdict_event("RECAPTURE", []), "reasons": reasons})
+                return
+
         self.img_front = img_f
         self.img_back = img_b
 
@@ -348,12 +496,33 @@ class MainWindow(QMainWindow):
         try:
             front_defects = self.detector.detect(self.img_front, "FRONT")
             back_defects = self.detector.detect(self.img_back, "BACK")
-            self.defects = front_defects + back_defects
         except Exception as e:
             self.lbl_final_result.setText("AI ERROR")
             QMessageBox.critical(self, "오류", f"AI 분석 실패: {e}")
             return
 
+        self.spc.record_inspection()
+
+        # 연속 프레임에서 같은 결함이 중복 집계되지 않도록 추적 후, 끝난 추적만 통계에 반영
+        if self.tracker is not None:
+            front_defects, finished_front = self.tracker.update("FRONT", front_defects)
+            back_defects, finished_back = self.tracker.update("BACK", back_defects)
+            self._record_defects(finished_front + finished_back)
+        else:
+            self._record_defects(front_defects + back_defects)
+        self.defects = front_defects + back_defects
+
+        # 결함 크롭 저장 (전체 프레임 대신 ROI + 썸네일, 낮은 신뢰도는 라벨링 대기열로)
+        if self.crop_store is not None:
+            self._current_crops = (self.crop_store.add("FRONT", self.img_front, front_defects)
+                                   + self.crop_store.add("BACK", self.img_back, back_defects))
+
+        # 코일 결함 맵: 두 면 모두 같은 길이 방향 위치로 기록
+        if self.coil_map is not None:
+            along_mm = self.sheet_position.next()
+            self.coil_map.add_frame("FRONT", self.img_front, front_defects, along_mm)
+            self.coil_map.add_frame("BACK", self.img_back, back_defects, along_mm)
+
         # FR-07: 최종 판정 논리 (PASS / NG)
         # 하나라도 NG 또는 WARNING(Rework) 상태의 결함이 있으면 NG로 판정
         final_status = "PASS"
@@ -363,15 +532,124 @@ class MainWindow(QMainWindow):
         # FR-05, FR-06: 결과 시각화 (Overlay)
         self._draw_overlays()
 
+        # 결과 캐시 사용 시 적중률/절약 시간 표시
+        if hasattr(self.detector, 'stats'):
+            stats = self.detector.stats()
+            self.statusBar().showMessage(
+                f"결과 캐시 적중률 {stats['hit_rate'] * 100:.0f}% (절약 {stats['saved_seconds']:.1f}초)", 5000)
+
         # FR-08: 최종 판정 출력
         self._update_result_label(final_status)
+        if self.monitor is not None:
+            self.monitor.publish_event(verdict_event(final_status, self.defects))
         self._update_log(final_status, self.defects[0] if self.defects else None)
         self._update_charts()
 
+    def _read_sample(self, path):
+        """샘플 이미지를 현재 모드(흑백/컬러)에 맞는 채널 수로 읽습니다."""
+        flag = cv2.IMREAD_GRAYSCALE if self.camera_manager.grayscale else cv2.IMREAD_COLOR
+        return cv2.imread(str(path), flag)
+
+    def _create_quality_gate(self):
+        gate_config = self.app_config.get('quality_gate', {})
+        return QualityGate(gate_config) if gate_config.get('enabled', False) else None
+
+    def _gate_frames(self, img_f, img_b, can_recapture: bool):
+        """
+        두 프레임의 품질을 검사하고, 불합격이면 카메라에서 최대 max_recaptures 번 다시 촬영합니다.
+        (front, back, 합격 여부, 카메라별 불합격 사유, 카메라별 마지막 시도의 품질 점수)를 반환하며,
+        시도마다 품질 점수를 검사 ID와 함께 CSV에 기록합니다.
+        """
+        log_path = config.RESULT_DIR / "quality_log.csv"
+        attempts = self.quality_gate.max_recaptures + 1 if can_recapture else 1
+        reasons, quality = {}, {}
+        for attempt in range(attempts):
+            if attempt > 0:
+                new_f, new_b = self.camera_manager.capture_both()
+                if new_f is None or new_b is None:
+                    break
+                img_f, img_b = new_f, new_b
+            reasons = {}
+            for camera, img in (("FRONT", img_f), ("BACK", img_b)):
+                ok, quality[camera], failed = self.quality_gate.check(img)
+                append_quality_log(log_path, self.inspection_id, camera, attempt, ok, quality[camera], failed)
+                if not ok:
+                    reasons[camera] = failed
+            if not reasons:
+                return img_f, img_b, True, reasons, quality
+            print(f"Quality gate: attempt {attempt + 1}/{attempts} rejected {reasons}")
+        return img_f, img_b, False, reasons, quality
+
+    def _create_tracker(self):
+        tracking_config = self.app_config.get('tracking', {})
+        if not tracking_config.get('enabled', False):
+            return None
+        return DefectTracker(tracking_config, self.app_config)
+
+    def _create_monitor(self):
+        monitor_config = self.app_config.get('monitor', {})
+        if not monitor_config.get('enabled', False):
+            return None
+        try:
+            return MonitorServer(monitor_config)
+        except OSError as e:
+            print(f"Monitor server not started: {e}")  # 포트 사용 중 등 - 검사는 계속
+            return None
+
+    def _create_crop_store(self):
+        self._current_crops = []
+        store_config = self.app_config.get('crop_store', {})
+        if not store_config.get('enabled', False):
+            return None
+        return CropStore(store_config.get('root', str(config.DATA_DIR / "crops")), store_config)
+
+    def _queue_current_crops(self, label):
+        """
+        현재 검사에서 저장한 크롭을 작업자 검수(label=None) 또는 오검출(BACKGROUND)로 대기열에 등록합니다.
+        오검출은 결함 하나에 대한 판정이므로, 크롭이 여러 개면 작업자가 해당 결함을 고릅니다.
+        """
+        if not self._current_crops:
+            QMessageBox.information(self, "정보", "현재 검사에서 저장된 결함 크롭이 없습니다.")
+            return
+        records = self._current_crops
+        if label == BACKGROUND and len(records) > 1:
+            items = [f"{i + 1}. {r['camera']} {r['label']} {r['score']:.2f} @ ({r['bbox'][0]}, {r['bbox'][1]})"
+                     for i, r in enumerate(records)]
+            item, ok = QInputDialog.getItem(self, "오검출 표시", "오검출인 결함을 선택하세요:", items, 0, False)
+            if not ok:
+                return
+            records = [records[items.index(item)]]
+        self.crop_store.enqueue([r["id"] for r in records], "operator", label)
+        self.statusBar().showMessage(f"크롭 {len(records)}개를 라벨링 대기열에 등록했습니다.", 5000)
+
+    def _create_coil_map(self):
+        map_config = self.app_config.get('sheet_map', {})
+        if not map_config.get('enabled', False):
+            return None, None
+        position = SheetPosition(self.app_config.get('tracking', {}).get('conveyor_speed_mm_s', 0.0),
+                                 map_config.get('frame_pitch_mm'))
+        if not position.has_estimate:
+            # 엔코더 입력이 없으므로 속도/간격이 없으면 모든 프레임이 0 mm에 겹침 - 맵을 만들지 않음
+            print("WARNING: sheet_map disabled - set tracking.conveyor_speed_mm_s or sheet_map.frame_pitch_mm.")
+            return None, None
+        coil_id = datetime.now().strftime("coil_%Y%m%d_%H%M%S")
+        coil_map = CoilMap(map_config.get('root', str(config.DATA_DIR / "coils")), coil_id,
+                           map_config, self.app_config)
+        return coil_map, position
+
+    def _record_defects(self, defects):
+        """결함 통계(파이 차트 개수, SPC 집계)에 반영합니다. 물리적 결함당 한 번만 호출됩니다."""
+        for d in defects:
+            self.defect_counts[d.defect_type] = self.defect_counts.get(d.defect_type, 0) + 1
+        self.spc.add_defects(defects)
+
     def _update_log(self, status, defect):
         """좌측 로그 테이블 업데이트"""
         row = self.log_table.rowCount()
         self.log_table.insertRow(row)
+        if row >= MAX_LOG_ROWS:
+            self.log_table.removeRow(0)  # 무인 장시간 운전에서 행이 끝없이 늘지 않도록 오래된 행부터 삭제
+            row -= 1
         
         time_str = datetime.now().strftime("%H:%M:%S")
         part_id = f"P-{random.randint(1000, 9999)}" # 임시 ID
@@ -401,12 +679,23 @@ class MainWindow(QMainWindow):
 
     def _update_charts(self):
         """Matplotlib 차트 업데이트"""
+        if self.canvas is None:
+            return  # 대시보드 탭을 열 때 최신 데이터로 그려짐
         self.ax1.clear()
         self.ax2.clear()
 
-        # Trend Chart
-        self.ax1.set_title("Crack Length Trend (Recent 20)")
-        self.ax1.plot(self.history_cracks, marker='o', linestyle='-')
+        # Trend Chart: 최근 window 크랙 길이 + I-MR 관리한계 (SPC 집계를 조회만 함)
+        trend = self.spc.trend("crack")
+        summary = self.spc.summary("crack")
+        title = f"Crack Length (Recent {self.spc.window})"
+        self.ax1.plot(trend, marker='o', linestyle='-')
+        if summary is not None and summary["count"] > 1:
+            for key, style in (("mean", '-'), ("ucl", '--'), ("lcl", '--')):
+                if summary[key] == summary[key]:  # nan 제외
+                    self.ax1.axhline(summary[key], color='gray', linestyle=style, linewidth=1)
+            if summary["cpk"] == summary["cpk"]:
+                title += f"  Cpk {summary['cpk']:.2f}"
+        self.ax1.set_title(title)
         self.ax1.set_ylabel("Length (mm)")
         self.ax1.grid(True)
 
@@ -420,38 +709,16 @@ class MainWindow(QMainWindow):
         self.canvas.draw()
 
     def _draw_overlays(self):
-        overlay_front = self.img_front.copy()
-        overlay_back = self.img_back.copy()
-
-        for defect in self.defects:
-            img_to_draw = overlay_front if defect.camera == "FRONT" else overlay_back
-            x, y, w, h = defect.bbox
-            
-            # 색상 결정 (BGR)
-            if defect.status == "OK":
-                color = (0, 255, 0) # Green
-            elif defect.status == "WARNING":
-                color = (0, 165, 255) # Orange (OpenCV BGR: Orange is roughly 0, 165, 255)
-            else:
-                color = (0, 0, 255) # Red
-
-            cv2.rectangle(img_to_draw, (x, y), (x + w, y + h), color, 2)
-
-            # 결함 정보 텍스트 추가
-            label_text = defect.defect_type.upper()
-            if defect.defect_type == "crack":
-                label_text += f" {defect.length_mm:.1f}mm"
-            elif defect.defect_type == "hole":
-                label_text += f" D:{defect.diameter_mm:.1f}mm"
-            elif defect.defect_type == "nut":
-                label_text = "NUT MISSING"
-                cv2.line(img_to_draw, (x, y), (x+w, y+h), color, 2) # X 표시
-                cv2.line(img_to_draw, (x+w, y), (x, y+h), color, 2)
-            
-            cv2.putText(img_to_draw, label_text, (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
-
+        # 표시 해상도의 미리 할당된 캔버스에 그림 (원본 프레임 전체 복사 없음)
+        size_front = (self.front_view.width(), self.front_view.height())
+        size_back = (self.back_view.width(), self.back_view.height())
+        overlay_front = self.overlay_renderer.render("FRONT", self.img_front, self.defects, size_front)
         self._display_image(overlay_front, self.front_view)
+        overlay_back = self.overlay_renderer.render("BACK", self.img_back, self.defects, size_back)
         self._display_image(overlay_back, self.back_view)
+        if self.monitor is not None:
+            self.monitor.publish_frame("front", overlay_front)
+            self.monitor.publish_frame("back", overlay_back)
 
     def _save_results(self):
         if not self.defects:
@@ -480,20 +747,26 @@ class MainWindow(QMainWindow):
             with open(csv_path, 'w', newline='', encoding='utf-8-sig') as f:
                 writer = csv.writer(f)
                 # 헤더에 환경 정보 추가
-                header = ["Camera", "Type", "Status", "Value(mm)", "Temp", "Humid", "Dust"]
+                # 검사 ID와 해당 카메라 프레임의 품질 점수 (quality_log.csv 와 같은 ID)
+                header = ["Inspection", "Camera", "Type", "Status", "Value(mm)", "Temp", "Humid", "Dust",
+                          "Sharpness", "ClipLow", "ClipHigh", "Specular"]
                 writer.writerow(header)
 
                 for defect in self.defects:
                     val = ""
                     if defect.length_mm: val = f"{defect.length_mm:.2f}"
                     elif defect.diameter_mm: val = f"{defect.diameter_mm:.2f}"
+                    quality = self.frame_quality.get(defect.camera)
                     
                     writer.writerow([
+                        self.inspection_id,
                         defect.camera,
                         defect.defect_type,
                         defect.status,
                         val,
-                        self.env_data['temp'], self.env_data['humid'], self.env_data['dust']
+                        self.env_data['temp'], self.env_data['humid'], self.env_data['dust'],
+                        *([f"{quality['sharpness']:.1f}", f"{quality['clip_low']:.4f}",
+                           f"{quality['clip_high']:.4f}", f"{quality['specular']:.4f}"] if quality else [""] * 4)
                     ])
             QMessageBox.information(self, "성공", f"결과가 다음 위치에 저장되었습니다:\n{result_folder}")
         except Exception as e:
@@ -519,17 +792,41 @@ class MainWindow(QMainWindow):
             label.setText(f"{label.objectName()} 비어 있음")
             return
 
-        h, w, ch = img.shape
-        bytes_per_line = ch * w
-        rgb_image = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        q_img = QImage(rgb_image.data, w, h, bytes_per_line, QImage.Format_RGB888)
+        if img.ndim == 2:
+            # 흑백 프레임은 변환 없이 8비트 그레이 이미지로 표시
+            img = np.ascontiguousarray(img)
+            h, w = img.shape
+            q_img = QImage(img.data, w, h, img.strides[0], QImage.Format_Grayscale8)
+        else:
+            h, w, ch = img.shape
+            bytes_per_line = ch * w
+            rgb_image = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+            q_img = QImage(rgb_image.data, w, h, bytes_per_line, QImage.Format_RGB888)
         
         pixmap = QPixmap.fromImage(q_img)
         label.setProperty("original_pixmap", pixmap) # 원본 저장
         label.setPixmap(pixmap.scaled(label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation))
 
+        if not self._first_frame_shown:
+            self._first_frame_shown = True
+            if self.startup_benchmark:
+                self._report_startup("first_frame")
+                self._finish_startup_benchmark()
+
 
     def closeEvent(self, event):
         """애플리케이션 종료 시 카메라 자원 해제"""
+        if self.model_loader is not None and self.model_loader.isRunning():
+            self.model_loader.wait()  # 로딩 중인 스레드가 정리된 뒤 종료
+        self.detector.close()
+        if self.tracker is not None:
+            # 진행 중인 추적(마지막 프레임들의 결함)도 통계에 반영한 뒤 종료
+            finished = self.tracker.flush()
+            self._record_defects(finished)
+            print(f"Tracker flushed: {len(finished)} defects")
+        if self.coil_map is not None:
+            self.coil_map.close()
+        if self.monitor is not None:
+            self.monitor.close()
         self.camera_manager.close()
         event.accept()
\ No newline at end of file
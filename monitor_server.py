@@ -0,0 +1,425 @@
+"""
+원격 모니터링용 내장 HTTP 서버 (MJPEG / WebSocket 프리뷰 + 판정 이벤트 JSON).
+
+UI 스레드는 publish_frame()으로 프레임 참조를 넘기기만 하고(시청자가 없거나 max_fps를 넘으면 즉시 반환),
+인코더 스레드 하나가 스트림별 최신 프레임을 설정 해상도/품질로 한 번만 JPEG 인코딩하여
+모든 클라이언트가 같은 바이트를 공유합니다. 클라이언트는 항상 최신 프레임만 받으므로 대기열이 쌓이지 않고,
+송신 버퍼가 write_timeout 동안 비워지지 않는 느린 클라이언트는 연결을 끊습니다.
+
+경로:
+    GET /                       스트림과 이벤트를 보여주는 간단한 페이지
+    GET /stream/<name>.mjpg     MJPEG (name: front, back)
+    GET /snapshot/<name>.jpg    최신 프레임 한 장
+    GET /events                 판정 이벤트 (Server-Sent Events, JSON)
+    GET /events.json            최근 이벤트 목록
+    GET /ws?stream=front        WebSocket: 바이너리 메시지 = JPEG, 텍스트 메시지 = 판정 이벤트 JSON
+    GET /health                 클라이언트 수, 인코딩/드롭 통계
+
+config.json 예:
+    "monitor": {"enabled": true, "host": "0.0.0.0", "port": 8090, "width": 640, "quality": 70,
+                "max_fps": 10, "write_timeout": 2.0, "send_buffer": 262144}
+
+로컬 점검 (빠른 클라이언트 + 느린 클라이언트 + 이벤트 구독자):
+    python monitor_server.py --duration 5
+"""
+import argparse
+import base64
+import hashlib
+import json
+import socket
+import struct
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import numpy as np
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC11B65"
+BOUNDARY = b"frame"
+
+INDEX_HTML = """<!doctype html>
+<html><head><meta charset="utf-8"><title>SteelAI-Dual Monitor</title>
+<style>body{font-family:sans-serif;background:#222;color:#eee}img{width:48%;margin:1%}
+#log{font-family:monospace;white-space:pre;height:30vh;overflow:auto}</style></head>
+<body><div><img src="/stream/front.mjpg"><img src="/stream/back.mjpg"></div><div id="log"></div>
+<script>
+const log = document.getElementById("log");
+new EventSource("/events").onmessage = (e) => {
+  const v = JSON.parse(e.data);
+  log.textContent = `${v.time} ${v.status} ${(v.defects || []).map(d => d.camera + ":" + d.type).join(" ")}\\n`
+                    + log.textContent.slice(0, 20000);
+};
+</script></body></html>
+"""
+
+
+class FrameHub:
+    """스트림별 최신 인코딩 프레임과 최근 이벤트를 보관하고, 대기 중인 클라이언트 스레드를 깨웁니다."""
+    def __init__(self, width: int = 640, quality: int = 70, max_fps: float = 10.0):
+        self.width = int(width)
+        self.quality = int(quality)
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+        self._cond = threading.Condition()
+        self._pending = {}          # 스트림 -> 인코딩 대기 프레임 (최신 것만)
+        self._frames = {}           # 스트림 -> (seq, JPEG 바이트)
+        self._seq = 0
+        self._events = deque(maxlen=200)   # (seq, JSON 바이트)
+        self._event_seq = 0
+        self._last_publish = {}
+        self._closed = False
+        self.clients = 0
+        self.dropped_clients = 0
+        self.encoded = 0
+        self.skipped = 0            # 인코더가 처리하기 전에 새 프레임으로 대체된 프레임 수
+        self._thread = threading.Thread(target=self._encode_loop, name="monitor-encoder", daemon=True)
+        self._thread.start()
+
+    def publish_frame(self, name: str, image: np.ndarray) -> bool:
+        """
+        UI 스레드에서 호출합니다. 시청자가 없거나 max_fps 간격 전이면 아무 일도 하지 않습니다.
+        오버레이 캔버스는 재사용되므로 한 번 복사해 두고, 축소/인코딩은 인코더 스레드에서 합니다.
+        """
+        if image is None or not self.clients:
+            return False
+        now = time.perf_counter()
+        if now - self._last_publish.get(name, 0.0) < self.min_interval:
+            return False
+        self._last_publish[name] = now
+        frame = image.copy()
+        with self._cond:
+            if name in self._pending:
+                self.skipped += 1
+            self._pending[name] = frame
+            self._cond.notify_all()
+        return True
+
+    def publish_event(self, event: dict):
+        data = json.dumps(event, ensure_ascii=False).encode('utf-8')
+        with self._cond:
+            self._event_seq += 1
+            self._events.append((self._event_seq, data))
+            self._cond.notify_all()
+
+    def _encode_loop(self):
+        params = [cv2.IMWRITE_JPEG_QUALITY, self.quality]
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if self._closed:
+                    return
+                name, image = self._pending.popitem()
+            h, w = image.shape[:2]
+            if w > self.width:
+                image = cv2.resize(image, (self.width, max(1, h * self.width // w)), interpolation=cv2.INTER_AREA)
+            ok, data = cv2.imencode(".jpg", image, params)
+            if not ok:
+                continue
+            with self._cond:
+                self._seq += 1
+                self._frames[name] = (self._seq, data.tobytes())
+                self.encoded += 1
+                self._cond.notify_all()
+
+    def wait(self, name: str | None, frame_seq: int, event_seq: int | None, timeout: float = 1.0):
+        """
+        name 스트림에 frame_seq 이후 프레임이 생기거나 event_seq 이후 이벤트가 생길 때까지 기다립니다.
+        (프레임 또는 None, 새 이벤트 목록)을 반환하며, 시간이 지나면 (None, []).
+        """
+        def _ready():
+            if self._closed:
+                return True
+            if name is not None and self._frames.get(name, (0, None))[0] > frame_seq:
+                return True
+            return event_seq is not None and self._event_seq > event_seq
+
+        with self._cond:
+            self._cond.wait_for(_ready, timeout)
+            frame = self._frames.get(name) if name is not None else None
+            if frame is not None and frame[0] <= frame_seq:
+                frame = None
+            events = [e for e in self._events if e[0] > event_seq] if event_seq is not None else []
+        return frame, events
+
+    def latest(self, name: str):
+        with self._cond:
+            return self._frames.get(name)
+
+    def recent_events(self) -> list[bytes]:
+        with self._cond:
+            return [data for _seq, data in self._events]
+
+    @property
+    def event_seq(self) -> int:
+        return self._event_seq
+
+    @contextmanager
+    def viewer(self):
+        with self._cond:
+            self.clients += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.clients -= 1
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def stats(self) -> dict:
+        return {"clients": self.clients, "encoded": self.encoded, "skipped": self.skipped,
+                "dropped_clients": self.dropped_clients, "events": self._event_seq}
+
+
+def ws_frame(opcode: int, payload: bytes) -> bytes:
+    """서버 -> 클라이언트 WebSocket 프레임 (FIN, 마스크 없음). opcode 1 = 텍스트, 2 = 바이너리."""
+    n = len(payload)
+    if n < 126:
+        header = struct.pack("!BB", 0x80 | opcode, n)
+    elif n < 65536:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, n)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, n)
+    return header + payload
+
+
+class MonitorRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # WebSocket 업그레이드에 필요
+    hub: FrameHub = None
+    write_timeout = 2.0
+    send_buffer = 262144
+
+    def do_GET(self):
+        path, _, query = self.path.partition('?')
+        params = dict(p.partition('=')[::2] for p in query.split('&') if p)
+        if path in ("/", "/index.html"):
+            self._send(200, "text/html; charset=utf-8", INDEX_HTML.encode('utf-8'))
+        elif path.startswith("/stream/") and path.endswith(".mjpg"):
+            self._stream_mjpeg(path[len("/stream/"):-len(".mjpg")])
+        elif path.startswith("/snapshot/") and path.endswith(".jpg"):
+            frame = self.hub.latest(path[len("/snapshot/"):-len(".jpg")])
+            if frame is None:
+                self._send(404, "application/json", b'{"error": "no frame"}')
+            else:
+                self._send(200, "image/jpeg", frame[1])
+        elif path == "/events":
+            self._stream_events()
+        elif path == "/events.json":
+            self._send(200, "application/json", b"[" + b",".join(self.hub.recent_events()) + b"]")
+        elif path == "/ws":
+            self._websocket(params.get("stream", "front"))
+        elif path == "/health":
+            self._send(200, "application/json", json.dumps(self.hub.stats()).encode())
+        else:
+            self._send(404, "application/json", b'{"error": "not found"}')
+
+    def _send(self, status: int, content_type: str, body: bytes):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _prepare_stream(self):
+        """작은 송신 버퍼 + 쓰기 제한 시간: 받지 못하는 클라이언트는 버퍼가 차면 곧 끊깁니다."""
+        self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.send_buffer)
+        self.connection.settimeout(self.write_timeout)
+        self.close_connection = True  # 스트림은 길이를 모르므로 끝나면 연결을 닫음
+
+    def _serve_stream(self, name: str | None, events: bool, write_frame, write_events, heartbeat):
+        """최신 프레임/이벤트를 기다렸다가 쓰는 공통 루프. 쓰기 시간 초과는 느린 클라이언트로 보고 끊습니다."""
+        frame_seq = 0
+        event_seq = self.hub.event_seq if events else None
+        with self.hub.viewer():
+            try:
+                while not self.hub.closed:
+                    frame, new_events = self.hub.wait(name, frame_seq, event_seq)
+                    if frame is not None:
+                        frame_seq = frame[0]
+                        write_frame(frame[1])
+                    if new_events:
+                        event_seq = new_events[-1][0]
+                        write_events([data for _seq, data in new_events])
+                    if frame is None and not new_events:
+                        heartbeat()  # 끊긴 클라이언트를 찾아냄
+            except socket.timeout:
+                self.hub.dropped_clients += 1
+            except (ConnectionError, OSError):
+                pass
+
+    def _stream_mjpeg(self, name: str):
+        self.send_response(200)
+        self.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={BOUNDARY.decode()}")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self._prepare_stream()
+
+        def _write(data):
+            self.wfile.write(b"--" + BOUNDARY + b"\r\nContent-Type: image/jpeg\r\nContent-Length: "
+                             + str(len(data)).encode() + b"\r\n\r\n" + data + b"\r\n")
+
+        self._serve_stream(name, False, _write, None, lambda: None)
+
+    def _stream_events(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self._prepare_stream()
+
+        def _write(events):
+            self.wfile.write(b"".join(b"data: " + data + b"\n\n" for data in events))
+
+        self._serve_stream(None, True, None, _write, lambda: self.wfile.write(b": keepalive\n\n"))
+
+    def _websocket(self, name: str):
+        key = self.headers.get("Sec-WebSocket-Key")
+        if not key or "websocket" not in self.headers.get("Upgrade", "").lower():
+            self._send(400, "application/json", b'{"error": "websocket upgrade required"}')
+            return
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+        self.send_response(101, "Switching Protocols")
+        self.send_header("Upgrade", "websocket")
+        self.send_header("Connection", "Upgrade")
+        self.send_header("Sec-WebSocket-Accept", accept)
+        self.end_headers()
+        self._prepare_stream()
+
+        def _write_events(events):
+            self.wfile.write(b"".join(ws_frame(1, data) for data in events))
+
+        self._serve_stream(name, True, lambda data: self.wfile.write(ws_frame(2, data)), _write_events,
+                           lambda: self.wfile.write(ws_frame(9, b"")))  # ping
+
+    def log_message(self, format, *args):
+        pass  # 요청마다 출력하지 않음
+
+
+class MonitorServer:
+    """FrameHub + 백그라운드 HTTP 서버. MainWindow는 publish_frame / publish_event만 호출합니다."""
+    def __init__(self, monitor_config: dict):
+        self.hub = FrameHub(monitor_config.get('width', 640), monitor_config.get('quality', 70),
+                            monitor_config.get('max_fps', 10))
+        handler = type("Handler", (MonitorRequestHandler,), {
+            "hub": self.hub,
+            "write_timeout": float(monitor_config.get('write_timeout', 2.0)),
+            "send_buffer": int(monitor_config.get('send_buffer', 262144)),
+        })
+        self.server = ThreadingHTTPServer((monitor_config.get('host', '0.0.0.0'), int(monitor_config.get('port', 8090))),
+                                          handler)
+        self.server.daemon_threads = True
+        self.address = self.server.server_address
+        self._thread = threading.Thread(target=self.server.serve_forever, name="monitor-http", daemon=True)
+        self._thread.start()
+        print(f"Monitor server listening on http://{self.address[0]}:{self.address[1]}/")
+
+    def publish_frame(self, name: str, image: np.ndarray) -> bool:
+        return self.hub.publish_frame(name, image)
+
+    def publish_event(self, event: dict):
+        self.hub.publish_event(event)
+
+    def close(self):
+        self.hub.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def verdict_event(status: str, defects) -> dict:
+    """MainWindow 판정을 이벤트 JSON으로 바꿉니다."""
+    return {
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "status": status,
+        "defects": [{"camera": d.camera, "type": d.defect_type, "status": d.status, "score": round(d.score, 3),
+                     "length_mm": d.length_mm, "diameter_mm": d.diameter_mm, "track_id": d.track_id}
+                    for d in defects],
+    }
+
+
+def _read_client(host: str, port: int, path: str, stop: threading.Event, result: dict, rcvbuf: int | None = None):
+    """점검용 로컬 클라이언트. rcvbuf를 주면 연결만 하고 읽지 않는 느린 클라이언트가 됩니다."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    if rcvbuf:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+    sock.connect((host, port))
+    sock.sendall(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode())
+    sock.settimeout(0.5)
+    try:
+        while not stop.is_set():
+            if rcvbuf:
+                time.sleep(0.1)  # 읽지 않음
+                continue
+            try:
+                chunk = sock.recv(1 << 16)
+            except socket.timeout:
+                continue
+            if not chunk:
+                break
+            result["parts"] = result.get("parts", 0) + chunk.count(b"--" + BOUNDARY) + chunk.count(b"data: ")
+    finally:
+        sock.close()
+
+
+def selftest(duration: float, monitor_config: dict):
+    """로컬 클라이언트로 fan-out, 느린 클라이언트 끊기, publish 비용을 확인합니다."""
+    monitor_config = dict(monitor_config, host="127.0.0.1", port=0)
+    server = MonitorServer(monitor_config)
+    host, port = server.address
+    stop = threading.Event()
+    fast = [{} for _ in range(3)]
+    slow, events = {}, {}
+    threads = [threading.Thread(target=_read_client, args=(host, port, "/stream/front.mjpg", stop, r)) for r in fast]
+    threads.append(threading.Thread(target=_read_client, args=(host, port, "/stream/front.mjpg", stop, slow, 4096)))
+    threads.append(threading.Thread(target=_read_client, args=(host, port, "/events", stop, events)))
+    for t in threads:
+        t.start()
+    time.sleep(0.3)
+
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 256, (720, 1280, 3), dtype=np.uint8)
+    publish_us = []
+    frames = 0
+    stop_at = time.perf_counter() + duration
+    while time.perf_counter() < stop_at:
+        frame = np.roll(base, frames * 4, axis=1)
+        t0 = time.perf_counter()
+        server.publish_frame("front", frame)
+        publish_us.append((time.perf_counter() - t0) * 1e6)
+        if frames % 30 == 0:
+            server.publish_event({"time": time.strftime("%H:%M:%S"), "status": "PASS", "defects": []})
+        frames += 1
+        time.sleep(1 / 30)
+
+    stop.set()
+    for t in threads:
+        t.join(timeout=3)
+    stats = server.hub.stats()
+    server.close()
+    publish_us = np.array(publish_us)
+    print(f"published {frames} frames @30fps, encoded {stats['encoded']} "
+          f"(max_fps {monitor_config.get('max_fps', 10)}), skipped before encode {stats['skipped']}")
+    print(f"publish_frame cost: p50 {np.percentile(publish_us, 50):.0f} us, p99 {np.percentile(publish_us, 99):.0f} us")
+    print(f"fast clients received: {[r.get('parts', 0) for r in fast]} frames")
+    print(f"event subscriber received: {events.get('parts', 0)} events")
+    print(f"slow clients dropped: {stats['dropped_clients']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="원격 모니터링 서버 로컬 점검 (fan-out, 느린 클라이언트 끊기, 비용)")
+    parser.add_argument("--duration", type=float, default=5.0)
+    args = parser.parse_args()
+
+    import config
+    selftest(args.duration, config.load_config().get('monitor', {}))
+
+
+if __name__ == "__main__":
+    main()
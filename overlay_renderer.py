@@ -0,0 +1,111 @@
+from functools import lru_cache
+
+import cv2
+import numpy as np
+
+# 판정 상태별 색상 (BGR)
+STATUS_COLORS = {
+    "OK": (0, 255, 0),        # Green
+    "WARNING": (0, 165, 255), # Orange
+    "NG": (0, 0, 255),        # Red
+}
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+FONT_SCALE = 0.6
+LINE_THICKNESS = 2
+
+
+@lru_cache(maxsize=512)
+def _text_size(text: str, scale: float, thickness: int) -> tuple[int, int]:
+    """라벨 문자열의 픽셀 크기 (같은 문자열은 다시 계산하지 않음)."""
+    (w, h), _baseline = cv2.getTextSize(text, FONT, scale, thickness)
+    return w, h
+
+
+def defect_label(defect) -> str:
+    """결함 종류/측정값에 따른 오버레이 라벨 문자열."""
+    label_text = defect.defect_type.upper()
+    if defect.defect_type == "crack":
+        label_text += f" {defect.length_mm:.1f}mm"
+    elif defect.defect_type == "hole":
+        label_text += f" D:{defect.diameter_mm:.1f}mm"
+    elif defect.defect_type == "nut":
+        label_text = "NUT MISSING"
+    return label_text
+
+
+class OverlayRenderer:
+    """
+    검사 결과 오버레이를 화면 표시 해상도에서 그리는 클래스.
+    카메라별로 미리 할당한 캔버스를 재사용하므로 원본 프레임 전체를 복사하지 않고,
+    흑백 프레임은 축소 후 캔버스에 옮길 때만 컬러로 바꿉니다.
+    박스/선은 색상별로 cv2.polylines 한 번에 그립니다.
+    """
+    def __init__(self):
+        self._bases = {}     # camera -> (원본 프레임, 축소된 프레임 버퍼)
+        self._canvases = {}  # camera -> 오버레이를 그릴 캔버스 버퍼
+
+    @staticmethod
+    def _display_shape(frame: np.ndarray, display_size: tuple[int, int]) -> tuple[int, int, float]:
+        """표시 영역에 비율을 유지하며 들어가는 크기(w, h)와 배율을 계산합니다. 확대는 하지 않습니다."""
+        h, w = frame.shape[:2]
+        disp_w, disp_h = display_size
+        scale = min(disp_w / w, disp_h / h, 1.0) if disp_w > 0 and disp_h > 0 else 1.0
+        return max(1, int(w * scale)), max(1, int(h * scale)), scale
+
+    def _buffer(self, store: dict, camera: str, shape: tuple) -> np.ndarray:
+        buf = store.get(camera)
+        if buf is None or buf.shape != shape:
+            buf = np.empty(shape, dtype=np.uint8)  # 해상도가 바뀔 때만 재할당
+            store[camera] = buf
+        return buf
+
+    def render(self, camera: str, frame: np.ndarray, defects: list, display_size: tuple[int, int]) -> np.ndarray:
+        """
+        frame을 표시 해상도로 축소한 캔버스에 해당 카메라의 결함을 그려 반환합니다.
+        반환된 배열은 다음 render 호출 시 덮어쓰이므로 화면 표시 직후에만 사용해야 합니다.
+        """
+        out_w, out_h, scale = self._display_shape(frame, display_size)
+        shape = (out_h, out_w) + frame.shape[2:]
+        canvas_shape = (out_h, out_w, 3)  # 흑백(2차원) 프레임도 결함 색상은 컬러 캔버스에 그림
+
+        cached = self._bases.get(camera)
+        if cached is None or cached[0] is not frame or cached[1].shape != shape:
+            base = cached[1] if cached is not None and cached[1].shape == shape else np.empty(shape, dtype=np.uint8)
+            cv2.resize(frame, (out_w, out_h), dst=base, interpolation=cv2.INTER_AREA)
+            self._bases[camera] = (frame, base)  # 같은 프레임을 다시 그릴 때는 축소 생략
+        base = self._bases[camera][1]
+
+        canvas = self._buffer(self._canvases, camera, canvas_shape)
+        if base.ndim == 2:
+            cv2.cvtColor(base, cv2.COLOR_GRAY2BGR, dst=canvas)  # 축소된 표시 해상도에서만 컬러화
+        else:
+            np.copyto(canvas, base)
+
+        # 색상별로 박스/선을 모아서 한 번에 그림
+        boxes = {}
+        crosses = {}
+        labels = []
+        for defect in defects:
+            if defect.camera != camera:
+                continue
+            color = STATUS_COLORS.get(defect.status, STATUS_COLORS["NG"])
+            x, y, w, h = (int(round(v * scale)) for v in defect.bbox)
+            boxes.setdefault(color, []).append(
+                np.array([[x, y], [x + w, y], [x + w, y + h], [x, y + h]], dtype=np.int32))
+            if defect.defect_type == "nut":
+                crosses.setdefault(color, []).extend([
+                    np.array([[x, y], [x + w, y + h]], dtype=np.int32),
+                    np.array([[x + w, y], [x, y + h]], dtype=np.int32)])  # X 표시
+            labels.append((defect_label(defect), x, y, color))
+
+        for color, polys in boxes.items():
+            cv2.polylines(canvas, polys, True, color, LINE_THICKNESS)
+        for color, segments in crosses.items():
+            cv2.polylines(canvas, segments, False, color, LINE_THICKNESS)
+
+        for text, x, y, color in labels:
+            _w, text_h = _text_size(text, FONT_SCALE, LINE_THICKNESS)
+            text_y = y - 10 if y - 10 - text_h >= 0 else y + text_h + 10  # 화면 위로 잘리면 박스 안쪽에 표시
+            cv2.putText(canvas, text, (x, text_y), FONT, FONT_SCALE, color, LINE_THICKNESS)
+
+        return canvas
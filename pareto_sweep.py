@@ -0,0 +1,163 @@
+"""
+모델 크기 x 입력 해상도 지연-정확도 Pareto 스윕.
+
+격자의 각 점마다 학습(또는 기존 가중치 재사용/파인튜닝) 후 val mAP와 DefectDetector 기준
+CPU 지연/처리량을 측정하고, Pareto front(더 빠르면서 더 정확한 점이 없는 점)를 표시한
+CSV/JSON 보고서와 그래프를 저장합니다. 결과는 점마다 results.json에 기록되므로
+중단 후 같은 명령으로 다시 실행하면 끝난 점은 건너뜁니다.
+
+사용 예:
+    python pareto_sweep.py --models n s m --imgsz 640 960 1280 --epochs 100
+    python pareto_sweep.py --models runs/detect/train4/weights/best.pt --imgsz 640 960 1280   # 재학습 없이 평가
+    python pareto_sweep.py --models runs/detect/train4/weights/best.pt --finetune --epochs 20
+    python pareto_sweep.py --smoke          # CPU 전용 PC에서 수 분 안에 끝나는 작은 스윕
+"""
+import argparse
+import csv
+import json
+from pathlib import Path
+
+from distill import cpu_benchmark, load_val_images
+
+SIZES = ("n", "s", "m", "l", "x")
+
+
+def point_name(model: str, imgsz: int) -> str:
+    base = f"yolov8{model}" if model in SIZES else Path(model).parent.parent.name or Path(model).stem
+    return f"{base}_{imgsz}"
+
+
+def pareto_front(rows: list[dict], x_key: str = "cpu_ms", y_key: str = "mAP50-95") -> list[dict]:
+    """x(지연)는 작을수록, y(mAP)는 클수록 좋은 점들의 Pareto front (x 오름차순)."""
+    front = []
+    best_y = float("-inf")
+    for row in sorted(rows, key=lambda r: (r[x_key], -r[y_key])):
+        if row[y_key] > best_y:
+            front.append(row)
+            best_y = row[y_key]
+    return front
+
+
+def prepare_weights(model: str, imgsz: int, args, out_dir: Path) -> str:
+    """점의 가중치: 이전 스윕 결과 재사용 > 기존 가중치 그대로 > 학습/파인튜닝."""
+    from ultralytics import YOLO
+
+    name = point_name(model, imgsz)
+    trained = out_dir / name / "weights" / "best.pt"
+    if trained.exists():
+        return str(trained)
+    if model not in SIZES and not args.finetune:
+        return model  # 기존 run 가중치를 학습 없이 해당 해상도로 평가
+
+    overrides = dict(fraction=args.fraction, workers=0, plots=False) if args.smoke else {}
+    YOLO(f"yolov8{model}.pt" if model in SIZES else model).train(
+        data=args.data, epochs=args.epochs, imgsz=imgsz, batch=args.batch, device=args.device,
+        project=str(out_dir), name=name, exist_ok=True, **overrides)
+    return str(trained if trained.exists() else out_dir / name / "weights" / "last.pt")
+
+
+def evaluate_point(model: str, imgsz: int, args, out_dir: Path, images: list) -> dict:
+    from ultralytics import YOLO
+
+    weights = prepare_weights(model, imgsz, args, out_dir)
+    metrics = YOLO(weights).val(data=args.data, imgsz=imgsz, device=args.device, plots=False, verbose=False)
+    row = {
+        "point": point_name(model, imgsz),
+        "model": model,
+        "imgsz": imgsz,
+        "weights": weights,
+        "mAP50-95": float(metrics.box.map),
+        "mAP50": float(metrics.box.map50),
+    }
+    row.update(cpu_benchmark(weights, images, runs=args.runs, imgsz=imgsz))
+    return row
+
+
+def write_report(rows: list[dict], out_dir: Path):
+    front = {r["point"] for r in pareto_front(rows)}
+    for r in rows:
+        r["pareto"] = r["point"] in front
+    rows = sorted(rows, key=lambda r: r["cpu_ms"])
+
+    with open(out_dir / "pareto.json", "w", encoding="utf-8") as f:
+        json.dump(rows, f, indent=4)
+    with open(out_dir / "pareto.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(8, 5))
+    ax.scatter([r["cpu_ms"] for r in rows], [r["mAP50-95"] for r in rows], color="gray")
+    front_rows = [r for r in rows if r["pareto"]]
+    ax.plot([r["cpu_ms"] for r in front_rows], [r["mAP50-95"] for r in front_rows], "o-", color="tab:red",
+            label="Pareto front")
+    for r in rows:
+        ax.annotate(r["point"], (r["cpu_ms"], r["mAP50-95"]), textcoords="offset points", xytext=(4, 4), fontsize=8)
+    ax.set_xlabel("CPU latency (ms/frame, DefectDetector)")
+    ax.set_ylabel("val mAP50-95")
+    ax.grid(True)
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(out_dir / "pareto.png", dpi=120)
+    plt.close(fig)
+
+    print(f"{'point':<28} {'mAP50-95':>9} {'mAP50':>7} {'ms':>8} {'fps':>7} {'pareto':>7}")
+    for r in rows:
+        print(f"{r['point']:<28} {r['mAP50-95']:>9.4f} {r['mAP50']:>7.4f} {r['cpu_ms']:>8.1f} "
+              f"{r['cpu_fps']:>7.1f} {'*' if r['pareto'] else '':>7}")
+    print(f"saved: {out_dir / 'pareto.csv'}, {out_dir / 'pareto.json'}, {out_dir / 'pareto.png'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="모델 크기 x 해상도 Pareto 스윕")
+    parser.add_argument("--models", nargs="+", default=["n", "s", "m"],
+                        help="yolov8 크기(n/s/m/l/x) 또는 기존 가중치 경로")
+    parser.add_argument("--imgsz", type=int, nargs="+", default=[640, 960, 1280])
+    parser.add_argument("--data", default="data.yaml")
+    parser.add_argument("--epochs", type=int, default=100)
+    parser.add_argument("--batch", type=int, default=16)
+    parser.add_argument("--device", default=None, help="학습/검증 장치 (지연은 항상 CPU)")
+    parser.add_argument("--finetune", action="store_true", help="가중치 경로 모델도 해상도별로 파인튜닝")
+    parser.add_argument("--latency-images", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=3, help="지연 측정 반복 횟수")
+    parser.add_argument("--out", default=None, help="결과 폴더 (기본: runs/sweep, 스모크: runs/sweep_smoke)")
+    parser.add_argument("--smoke", action="store_true", help="yolov8n x 160/320, 1 에폭, 데이터 5%%, CPU")
+    parser.add_argument("--fraction", type=float, default=0.05, help="스모크 학습 데이터 비율")
+    args = parser.parse_args()
+
+    if args.smoke:
+        args.models, args.imgsz = ["n"], [160, 320]
+        args.epochs, args.batch, args.device = 1, 4, "cpu"
+        args.latency_images, args.runs = 5, 1
+    out_dir = Path(args.out or ("runs/sweep_smoke" if args.smoke else "runs/sweep")).resolve()
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    results_path = out_dir / "results.json"
+    results = {}
+    if results_path.exists():
+        with open(results_path, encoding="utf-8") as f:
+            results = json.load(f)
+
+    images = load_val_images(count=args.latency_images)
+    for model in args.models:
+        for imgsz in args.imgsz:
+            name = point_name(model, imgsz)
+            if name in results:
+                print(f"skip {name} (done)")
+                continue
+            print(f"=== {name} ===")
+            results[name] = evaluate_point(model, imgsz, args, out_dir, images)
+            with open(results_path, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=4)  # 점마다 저장 (중단 후 재개)
+
+    rows = [results[point_name(m, s)] for m in args.models for s in args.imgsz if point_name(m, s) in results]
+    if rows:
+        write_report(rows, out_dir)
+
+
+if __name__ == "__main__":
+    main()
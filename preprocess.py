@@ -0,0 +1,129 @@
+"""
+DefectDetector 전용 letterbox 전처리.
+
+ultralytics에 ndarray를 넘기면 호출마다 letterbox 사본, 정규화 배열, 새 텐서를 만듭니다.
+LetterboxBuffer는 프레임을 미리 할당한(가능하면 pinned) uint8 버퍼에 바로 축소/패딩하고,
+BGR->RGB 채널 순서 변경 + 0~1 정규화 + HWC->CHW 변환을 채널별 한 번의 연산으로
+재사용하는 float 입력 텐서에 씁니다. 프레임별 letterbox 파라미터(배율, 패딩)를 보관하므로
+모델 좌표의 박스를 원본 프레임 좌표로 정확히 되돌릴 수 있습니다.
+"""
+import math
+
+import cv2
+import numpy as np
+
+PAD_VALUE = 114  # ultralytics LetterBox와 같은 패딩 값
+
+
+def letterbox_geometry(height: int, width: int, imgsz: int, stride: int = 32) -> tuple:
+    """
+    (입력 높이, 입력 너비, 배율, 축소 후 높이, 축소 후 너비, 위 패딩, 왼쪽 패딩).
+    긴 변을 imgsz에 맞추고 짧은 변은 stride 배수까지만 패딩합니다 (ultralytics auto=True와 동일).
+    """
+    ratio = min(imgsz / height, imgsz / width)
+    new_h, new_w = int(round(height * ratio)), int(round(width * ratio))
+    in_h = int(math.ceil(new_h / stride) * stride)
+    in_w = int(math.ceil(new_w / stride) * stride)
+    top = int(round((in_h - new_h) / 2 - 0.1))
+    left = int(round((in_w - new_w) / 2 - 0.1))
+    return in_h, in_w, ratio, new_h, new_w, top, left
+
+
+class LetterboxBuffer:
+    """
+    배치 letterbox 버퍼. 프레임 크기/배치 크기가 바뀔 때만 다시 할당합니다.
+    channels: 모델 입력 채널 수 (3 = RGB, 1 = 흑백 모델)
+    """
+    def __init__(self, imgsz: int = 640, stride: int = 32, device: str = 'cpu', half: bool = False,
+                 channels: int = 3, swap_rb: bool = True):
+        self.imgsz = imgsz
+        self.stride = stride
+        self.device = device
+        self.half = half
+        self.channels = channels
+        self.swap_rb = swap_rb
+        self.allocations = 0   # 버퍼 (재)할당 횟수 (벤치마크 확인용)
+        self._key = None
+        self._staging = None   # (N, H, W, C) uint8 torch 텐서 (CUDA면 pinned)
+        self._staging_np = None
+        self._device_u8 = None
+        self._input = None     # (N, C, H, W) float 입력 텐서
+        self._filled = []      # 슬롯별 현재 letterbox 형태 (패딩 재작성 여부 판단)
+        self.params = []       # 프레임별 (배율, 위 패딩, 왼쪽 패딩)
+
+    def _allocate(self, batch: int, in_h: int, in_w: int, src_channels: int):
+        import torch
+
+        pin = str(self.device).startswith('cuda') and torch.cuda.is_available()
+        self._staging = torch.empty((batch, in_h, in_w, src_channels), dtype=torch.uint8, pin_memory=pin)
+        self._staging_np = self._staging.numpy()  # 같은 메모리를 가리키는 ndarray (cv2가 직접 씀)
+        self._device_u8 = self._staging.to(self.device) if pin else self._staging
+        dtype = torch.float16 if self.half else torch.float32
+        self._input = torch.empty((batch, self.channels, in_h, in_w), dtype=dtype, device=self.device)
+        self._filled = [None] * batch
+        self.allocations += 1
+
+    def __call__(self, images: list[np.ndarray]):
+        """프레임 목록을 letterbox하여 (N, C, H, W) 입력 텐서(재사용 버퍼의 뷰)를 반환합니다."""
+        h, w = images[0].shape[:2]
+        src_channels = 1 if images[0].ndim == 2 else images[0].shape[2]
+        for img in images[1:]:
+            if img.shape[:2] != (h, w) or (1 if img.ndim == 2 else img.shape[2]) != src_channels:
+                raise ValueError("LetterboxBuffer: all frames in a batch must share the same shape")
+
+        in_h, in_w, ratio, new_h, new_w, top, left = letterbox_geometry(h, w, self.imgsz, self.stride)
+        batch = len(images)
+        key = (in_h, in_w, src_channels)
+        if self._key != key or self._staging.shape[0] < batch:
+            keep = self._staging.shape[0] if self._key == key else 0
+            self._allocate(max(batch, keep), in_h, in_w, src_channels)
+            self._key = key
+
+        geometry = (new_h, new_w, top, left)
+        for i, img in enumerate(images):
+            slot = self._staging_np[i]
+            if self._filled[i] != geometry:
+                slot.fill(PAD_VALUE)  # 형태가 바뀔 때만 패딩 영역을 다시 채움
+                self._filled[i] = geometry
+            region = slot[top:top + new_h, left:left + new_w]
+            if img.ndim == 2:
+                region = region[:, :, 0]
+            if (new_h, new_w) == (h, w):
+                np.copyto(region, img)
+            else:
+                cv2.resize(img, (new_w, new_h), dst=region, interpolation=cv2.INTER_LINEAR)
+        self.params = [(ratio, top, left)] * batch
+
+        staging = self._staging[:batch]
+        if self._device_u8 is not self._staging:
+            self._device_u8[:batch].copy_(staging, non_blocking=True)
+        src = self._device_u8[:batch]
+        out = self._input[:batch]
+
+        # 채널 순서 변경 + 정규화 + HWC->CHW를 출력 채널별 한 번의 연산으로 (중간 텐서 없음)
+        scale = 1.0 / 255.0
+        for c in range(self.channels):
+            if src_channels == 1:
+                src_c = 0                     # 흑백 프레임 -> 모든 입력 채널에 같은 값
+            elif self.channels == 1:
+                src_c = None
+            else:
+                src_c = (2 - c) if self.swap_rb and src_channels == 3 else c
+            if src_c is None:
+                # 3채널 프레임 -> 1채널 모델: BT.601 휘도 (B, G, R 순서, 드문 경로라 임시 텐서 허용)
+                out[:, 0].copy_(src[..., 0] * (0.114 * scale) + src[..., 1] * (0.587 * scale)
+                                + src[..., 2] * (0.299 * scale))
+            else:
+                out[:, c].copy_(src[..., src_c]).mul_(scale)
+        return out
+
+    def scale_boxes(self, xyxy: np.ndarray, index: int, shape: tuple) -> np.ndarray:
+        """모델 입력 좌표의 박스를 index번 프레임의 원본 좌표로 되돌립니다 (제자리 수정)."""
+        ratio, top, left = self.params[index]
+        xyxy[:, [0, 2]] -= left
+        xyxy[:, [1, 3]] -= top
+        xyxy /= ratio
+        h, w = shape[:2]
+        xyxy[:, [0, 2]] = xyxy[:, [0, 2]].clip(0, w)
+        xyxy[:, [1, 3]] = xyxy[:, [1, 3]].clip(0, h)
+        return xyxy
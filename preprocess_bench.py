@@ -0,0 +1,121 @@
+"""
+전처리 마이크로벤치마크: ultralytics 기본 전처리 vs LetterboxBuffer(재사용 버퍼).
+
+프레임당 시간(ms), numpy/cv2 임시 할당 최대치(tracemalloc), torch CPU 할당량(profiler)을 비교하고,
+--model 을 주면 DefectDetector의 기존 경로와 direct_input 경로의 검출 시간과 박스 차이도 측정합니다.
+
+사용 예:
+    python preprocess_bench.py --frames 200
+    python preprocess_bench.py --model runs/detect/train4/weights/best.pt --images data/captures
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+import config
+from inference_loadgen import load_frames
+from preprocess import LetterboxBuffer
+
+
+def ultralytics_preprocess(images, imgsz: int, stride: int):
+    """ultralytics 예측기와 같은 단계: LetterBox 사본 -> stack -> BGR->RGB/CHW 사본 -> float 텐서 -> /255."""
+    import torch
+    from ultralytics.data.augment import LetterBox
+
+    letterbox = LetterBox((imgsz, imgsz), auto=True, stride=stride)
+    im = np.stack([letterbox(image=img) for img in images])
+    im = np.ascontiguousarray(im[..., ::-1].transpose((0, 3, 1, 2)))
+    return torch.from_numpy(im).float() / 255
+
+
+def measure(fn, images, frames: int) -> dict:
+    from torch.profiler import ProfilerActivity, profile
+
+    fn(images)  # 워밍업 (버퍼 할당은 여기서 끝남)
+    start = time.perf_counter()
+    for _ in range(frames):
+        fn(images)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    peaks = []
+    for _ in range(min(frames, 20)):
+        tracemalloc.reset_peak()
+        before, _peak = tracemalloc.get_traced_memory()
+        fn(images)
+        _current, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - before)
+    tracemalloc.stop()
+
+    runs = min(frames, 20)
+    with profile(activities=[ProfilerActivity.CPU], profile_memory=True) as prof:
+        for _ in range(runs):
+            fn(images)
+    torch_bytes = sum(e.cpu_memory_usage for e in prof.key_averages() if e.cpu_memory_usage > 0)
+
+    n = len(images)
+    return {
+        "ms_per_frame": elapsed / frames / n * 1000,
+        "numpy_peak_kb": float(np.mean(peaks)) / n / 1024,
+        "torch_alloc_kb": torch_bytes / runs / n / 1024,
+    }
+
+
+def compare_detector(model_path: str, images, frames: int):
+    """DefectDetector 기존 경로 vs direct_input 경로: 검출 시간과 박스 좌표 최대 차이."""
+    from detector import DefectDetector
+
+    results = {}
+    for direct in (False, True):
+        app_config = config.load_config()
+        app_config.update({"model_path": model_path, "direct_input": direct})
+        detector = DefectDetector(app_config)
+        detector._predict_batch(images)
+        start = time.perf_counter()
+        for _ in range(frames):
+            preds = detector._predict_batch(images)
+        results[direct] = ((time.perf_counter() - start) / frames / len(images) * 1000, preds)
+
+    max_diff = 0.0
+    for (a, _, _), (b, _, _) in zip(results[False][1], results[True][1]):
+        if len(a) and len(a) == len(b):
+            max_diff = max(max_diff, float(np.abs(np.sort(a, axis=0) - np.sort(b, axis=0)).max()))
+    print(f"detector (ultralytics preprocess): {results[False][0]:.2f} ms/frame")
+    print(f"detector (direct_input):           {results[True][0]:.2f} ms/frame")
+    print(f"max box coordinate difference: {max_diff:.2f} px")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="letterbox 전처리 마이크로벤치마크")
+    parser.add_argument("--images", help="테스트 이미지 폴더 (생략 시 무작위 프레임)")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--batch", type=int, default=1)
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--model", help="지정 시 DefectDetector 전체 경로도 비교")
+    args = parser.parse_args()
+
+    images = load_frames(args.images, args.width, args.height, count=args.batch)[:args.batch]
+    if len({img.shape for img in images}) > 1:
+        images = [images[0]] * args.batch  # 배치는 같은 크기여야 함
+
+    buffer = LetterboxBuffer(args.imgsz, 32)
+    rows = {
+        "ultralytics": measure(lambda imgs: ultralytics_preprocess(imgs, args.imgsz, 32), images, args.frames),
+        "LetterboxBuffer": measure(buffer, images, args.frames),
+    }
+    print(f"frame {images[0].shape}, batch {len(images)}, imgsz {args.imgsz}")
+    print(f"{'preprocess':<16} {'ms/frame':>9} {'numpy peak KB':>14} {'torch alloc KB':>15}")
+    for name, r in rows.items():
+        print(f"{name:<16} {r['ms_per_frame']:>9.3f} {r['numpy_peak_kb']:>14.1f} {r['torch_alloc_kb']:>15.1f}")
+    print(f"LetterboxBuffer allocations: {buffer.allocations} (over {args.frames + 41} calls)")
+
+    if args.model:
+        compare_detector(args.model, images, max(1, args.frames // 10))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+카메라 캡처 프로파일별 실제 FPS / 지연 시간 측정 도구.
+
+사용 예:
+    python probe_camera.py                 # config.json의 front/back 카메라를 프로파일별로 측정
+    python probe_camera.py --index 0 --frames 120
+"""
+import argparse
+import time
+
+import cv2
+
+import camera_discovery
+import config
+from camera_manager import apply_capture_profile
+
+# 측정할 후보 프로파일 (config.json 프로파일은 항상 첫 번째로 측정)
+CANDIDATE_PROFILES = [
+    {"width": 640, "height": 480, "fps": 30, "fourcc": "YUYV", "buffer_size": 1},
+    {"width": 640, "height": 480, "fps": 30, "fourcc": "MJPG", "buffer_size": 1},
+    {"width": 1280, "height": 720, "fps": 30, "fourcc": "YUYV", "buffer_size": 1},
+    {"width": 1280, "height": 720, "fps": 30, "fourcc": "MJPG", "buffer_size": 1},
+    {"width": 1920, "height": 1080, "fps": 30, "fourcc": "MJPG", "buffer_size": 1},
+]
+
+
+def open_capture(index: int):
+    for backend in camera_discovery.platform_backends():
+        cap = cv2.VideoCapture(index, backend)
+        if cap.isOpened():
+            return cap
+        cap.release()
+    return None
+
+
+def measure_profile(index: int, profile: dict, frames: int, warmup: int = 10) -> dict | None:
+    """프로파일을 적용한 뒤 frames 장을 읽어 실제 FPS와 read() 지연 시간을 측정합니다."""
+    cap = open_capture(index)
+    if cap is None:
+        return None
+    try:
+        actual = apply_capture_profile(cap, profile)
+        for _ in range(warmup):
+            cap.read()
+
+        latencies = []
+        failures = 0
+        start = time.perf_counter()
+        for _ in range(frames):
+            t0 = time.perf_counter()
+            ok, _frame = cap.read()
+            latencies.append((time.perf_counter() - t0) * 1000)
+            if not ok:
+                failures += 1
+        elapsed = time.perf_counter() - start
+    finally:
+        cap.release()
+
+    latencies.sort()
+    return {
+        "actual": actual,
+        "delivered_fps": (frames - failures) / elapsed if elapsed > 0 else 0.0,
+        "latency_avg_ms": sum(latencies) / len(latencies),
+        "latency_p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+        "failures": failures,
+    }
+
+
+def _profile_label(profile: dict) -> str:
+    return f"{profile.get('width')}x{profile.get('height')}@{profile.get('fps')} {profile.get('fourcc') or '-'}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="카메라 캡처 프로파일 측정")
+    parser.add_argument("--index", type=int, action="append", help="측정할 카메라 인덱스 (여러 번 지정 가능)")
+    parser.add_argument("--frames", type=int, default=90, help="프로파일당 측정 프레임 수")
+    args = parser.parse_args()
+
+    app_config = config.load_config()
+    targets = []
+    if args.index:
+        targets = [(f"Camera {i}", i, {}) for i in args.index]
+    else:
+        for name in ("front", "back"):
+            cam = app_config.get(name, {})
+            if cam.get('type', 'USB') == 'USB':
+                targets.append((name.upper(), int(cam.get('address', 0)), cam.get('capture', {})))
+
+    for name, index, configured in targets:
+        print(f"\n=== {name} (index {index}) ===")
+        print(f"{'requested':<24} {'accepted':<24} {'fps':>7} {'avg ms':>8} {'p95 ms':>8} {'fail':>5}")
+        profiles = ([configured] if configured else []) + CANDIDATE_PROFILES
+        for profile in profiles:
+            result = measure_profile(index, profile, args.frames)
+            if result is None:
+                print(f"{_profile_label(profile):<24} camera could not be opened")
+                break
+            print(f"{_profile_label(profile):<24} {_profile_label(result['actual']):<24} "
+                  f"{result['delivered_fps']:>7.1f} {result['latency_avg_ms']:>8.1f} "
+                  f"{result['latency_p95_ms']:>8.1f} {result['failures']:>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+import re
+import queue
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import cv2
+
+import resource_budget
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+DEFAULT_REPLAY_FPS = 30.0
+MAX_FRAME_DELAY_S = 1.0   # 녹화 사이 공백(정지, 세션 경계)이 길어도 프레임 간격은 최대 1초
+_TIMESTAMP_PATTERN = re.compile(r'(\d{8}_\d{6})')
+
+
+def parse_speed(speed) -> float | None:
+    """
+    재생 속도 설정값을 해석합니다.
+    'realtime' -> 0.0 (녹화 시각 기준), 'max' -> None (최대 속도), 숫자 -> 고정 FPS
+    """
+    if speed is None:
+        return 0.0
+    text = str(speed).strip().lower()
+    if text in ('', 'realtime', 'real-time'):
+        return 0.0
+    if text in ('max', 'fast', 'asap'):
+        return None
+    fps = float(text)
+    if fps <= 0:
+        raise ValueError(f"재생 FPS는 0보다 커야 합니다: {speed}")
+    return fps
+
+
+def _timestamp_of(path: Path) -> float | None:
+    """파일 이름의 촬영 시각(YYYYmmdd_HHMMSS)을 초 단위로 반환합니다."""
+    match = _TIMESTAMP_PATTERN.search(path.stem)
+    if not match:
+        return None
+    try:
+        return datetime.strptime(match.group(1), "%Y%m%d_%H%M%S").timestamp()
+    except ValueError:
+        return None
+
+
+def list_session_frames(directory: Path, camera_name: str) -> list[Path]:
+    """
+    녹화 폴더에서 해당 카메라의 프레임 파일을 시간 순서로 반환합니다.
+    capture_front_*.png / capture_back_*.png 처럼 파일 이름에 카메라 이름이 단어로 들어간 파일만 사용합니다.
+    해당 카메라 파일이 없으면 빈 목록을 반환합니다 (다른 카메라나 태그 없는 프레임을 대신 재생하지 않음).
+    """
+    tag = camera_name.lower()
+    images = sorted(p for p in directory.iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+    tagged = [p for p in images if tag in re.split(r'[^a-z0-9]+', p.stem.lower())]
+    if not tagged:
+        print(f"Replay: {directory} 에 '{tag}' 카메라 프레임이 없습니다 (예: capture_{tag}_*.png)")
+    return tagged
+
+
+class ReplaySource:
+    """
+    녹화된 세션(이미지 폴더 또는 동영상 파일)을 카메라처럼 재생하는 클래스.
+    cv2.VideoCapture와 같은 isOpened/read/release 인터페이스를 제공하므로
+    CameraManager에서 실제 카메라 대신 그대로 사용할 수 있습니다.
+    프레임은 백그라운드 스레드에서 미리 디코딩(prefetch)되고, 재생 속도 조절도 그 스레드에서 하므로
+    read()를 부르는 쪽(GUI 스레드)은 다음 프레임이 준비될 때까지만 기다립니다.
+    """
+    def __init__(self, path, camera_name: str, speed='realtime', loop: bool = True, prefetch: int = 8,
+                 grayscale: bool = False):
+        self.path = Path(str(path))
+        self.camera_name = camera_name
+        self.fps = parse_speed(speed)
+        self.loop = loop
+        self.grayscale = grayscale  # True 이면 디코딩 스레드에서 1채널로 읽음
+
+        self._files = []
+        self._durations = []
+        self._video = None
+        self._video_fps = DEFAULT_REPLAY_FPS
+
+        if self.path.is_dir():
+            self._files = list_session_frames(self.path, camera_name)
+            self._durations = self._file_durations(self._files)
+        elif self.path.is_file():
+            self._video = cv2.VideoCapture(str(self.path))
+            if self._video.isOpened():
+                video_fps = self._video.get(cv2.CAP_PROP_FPS)
+                if video_fps and video_fps > 0:
+                    self._video_fps = video_fps
+            else:
+                self._video.release()
+                self._video = None
+
+        self._queue = queue.Queue(maxsize=max(1, prefetch))
+        self._stop = threading.Event()
+        self._next_due = None
+        self._thread = None
+        if self.isOpened():
+            self._thread = threading.Thread(target=self._decode_loop, name=f"replay-{camera_name}", daemon=True)
+            self._thread.start()
+
+    @staticmethod
+    def _file_durations(files: list[Path]) -> list[float]:
+        """연속한 파일의 촬영 시각 차이로 각 프레임의 표시 시간을 계산합니다."""
+        default = 1.0 / DEFAULT_REPLAY_FPS
+        stamps = [_timestamp_of(p) for p in files]
+        durations = []
+        for i in range(len(files)):
+            if i + 1 < len(files) and stamps[i] is not None and stamps[i + 1] is not None \
+                    and stamps[i + 1] > stamps[i]:
+                durations.append(stamps[i + 1] - stamps[i])
+            else:
+                durations.append(default)
+        return durations
+
+    def isOpened(self) -> bool:
+        return bool(self._files) or self._video is not None
+
+    def _put(self, item) -> bool:
+        """큐가 빌 때까지 기다리며 넣습니다. 정지 요청 시 False를 반환합니다."""
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _pace(self, duration: float) -> bool:
+        """
+        재생 속도에 맞춰 이 프레임의 표시 시각까지 기다립니다 (디코딩 스레드에서 호출).
+        정지 요청 시 False를 반환합니다.
+        """
+        if self.fps is None:
+            return True
+        interval = min(duration if self.fps == 0.0 else 1.0 / self.fps, MAX_FRAME_DELAY_S)
+        now = time.perf_counter()
+        if self._next_due is None or now - self._next_due > interval:
+            self._next_due = now  # 처음이거나 많이 밀린 경우 몰아서 재생하지 않음
+        delay = self._next_due - now
+        self._next_due += interval
+        return not (delay > 0 and self._stop.wait(delay))
+
+    def _decode_loop(self):
+        """백그라운드에서 프레임을 디코딩하고, 재생 속도에 맞춰 큐에 채웁니다."""
+        resource_budget.pin_current_thread("capture")
+        decoded = 0  # 이번 회차에 디코딩한 프레임 수 (0이면 반복해도 소용없으므로 종료)
+        while not self._stop.is_set():
+            if self._video is not None:
+                ok, frame = self._video.read()
+                if ok:
+                    decoded += 1
+                    if self.grayscale and frame.ndim == 3:
+                        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                    if not self._pace(1.0 / self._video_fps) or not self._put(frame):
+                        return
+                    continue
+                if not self.loop or not decoded:
+                    break
+                decoded = 0
+                self._video.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                continue
+
+            decoded = 0
+            for file_path, duration in zip(self._files, self._durations):
+                frame = cv2.imread(str(file_path), cv2.IMREAD_GRAYSCALE if self.grayscale else cv2.IMREAD_COLOR)
+                if frame is None:
+                    print(f"Replay: failed to decode {file_path}")
+                    continue
+                decoded += 1
+                if not self._pace(duration) or not self._put(frame):
+                    return
+            if not self.loop or not decoded:
+                break
+
+        if not decoded:
+            print(f"Replay: no decodable frames in {self.path}, stopping {self.camera_name}")
+        self._put(None)  # 재생 종료 표시
+
+    def read(self):
+        """다음 프레임을 반환합니다. 재생 속도는 디코딩 스레드가 맞추므로 여기서는 큐만 기다립니다."""
+        if not self.isOpened():
+            return False, None
+        try:
+            item = self._queue.get(timeout=MAX_FRAME_DELAY_S + 1.0)
+        except queue.Empty:
+            return False, None
+        if item is None:
+            self._queue.put(None)  # 이후 read()도 종료 상태를 보도록 유지
+            return False, None
+        return True, item
+
+    def release(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        if self._video is not None:
+            self._video.release()
+            self._video = None
+        self._files = []
+        while not self._queue.empty():
+            self._queue.get_nowait()
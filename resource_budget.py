@@ -0,0 +1,147 @@
+"""
+CPU 코어/스레드 예산.
+
+torch, OpenCV, Qt가 각자 스레드 풀을 만들어 코어를 과다 점유하지 않도록 역할별로
+코어 집합과 스레드 수를 config.json에서 지정합니다.
+
+    "resources": {
+        "enabled": true,
+        "ui": {"cores": "0-1"},                       # Qt 메인 스레드 (프리뷰 캡처 포함)
+        "capture": {"cores": "0-1"},                  # 재생/캡처 보조 스레드
+        "inference": {"cores": "2-7", "threads": 6, "interop_threads": 1},
+        "opencv_threads": 2
+    }
+
+코어 고정(os.sched_setaffinity)은 Linux에서 스레드 단위로 적용되며, 이후 생성되는 스레드는
+만든 스레드의 집합을 물려받습니다. 따라서 torch 스레드 풀을 추론 코어에 묶으려면 추론이
+자기 스레드/프로세스에서 torch를 처음 사용해야 합니다: "inference_process": true(워커 프로세스)
+또는 추론 서버에서 완전하게 적용되고, 같은 프로세스 추론에서는 스레드 수만 적용됩니다.
+"""
+import os
+
+ROLES = ("ui", "capture", "inference")
+
+_budget = {}
+
+
+def parse_cores(spec) -> set[int]:
+    """"0-3,6" / [0, 1, 2] / 2 형식의 코어 지정을 집합으로 바꿉니다. 빈 값이면 빈 집합."""
+    if spec is None or spec == "":
+        return set()
+    if isinstance(spec, int):
+        return {spec}
+    if isinstance(spec, (list, tuple, set)):
+        return {int(c) for c in spec}
+    cores = set()
+    for part in str(spec).split(","):
+        part = part.strip()
+        if "-" in part:
+            lo, hi = part.split("-")
+            cores.update(range(int(lo), int(hi) + 1))
+        elif part:
+            cores.add(int(part))
+    return cores
+
+
+def format_cores(cores) -> str:
+    """정렬된 코어 집합을 "0-3,6" 형식으로 씁니다."""
+    cores = sorted(cores)
+    parts = []
+    start = prev = None
+    for c in cores + [None]:
+        if start is not None and (c is None or c != prev + 1):
+            parts.append(f"{start}" if start == prev else f"{start}-{prev}")
+            start = None
+        if c is not None and start is None:
+            start = c
+        prev = c
+    return ",".join(parts)
+
+
+def configure(config_data: dict) -> dict:
+    """설정을 읽어 모듈 전역 예산으로 저장합니다. 비활성화면 빈 dict."""
+    global _budget
+    resources = config_data.get('resources', {})
+    _budget = dict(resources) if resources.get('enabled', False) else {}
+    return _budget
+
+
+def role_cores(role: str) -> set[int]:
+    cores = parse_cores(_budget.get(role, {}).get('cores'))
+    return cores & set(range(os.cpu_count() or 1))  # 없는 코어 번호는 무시
+
+
+def pin_current_thread(role: str, *roles: str) -> bool:
+    """호출한 스레드를 역할(여러 개면 합집합)의 코어에 고정합니다. 지원하지 않는 OS/설정 없음이면 False."""
+    if not _budget or not hasattr(os, 'sched_setaffinity'):
+        return False
+    cores = set()
+    for r in (role,) + roles:
+        cores |= role_cores(r)
+    if not cores:
+        return False
+    try:
+        os.sched_setaffinity(0, cores)  # Linux: pid 0 = 호출한 스레드
+        return True
+    except OSError as e:
+        print(f"Resource budget: cannot pin {role} thread to {format_cores(cores)}: {e}")
+        return False
+
+
+def apply_thread_env(role: str = "inference"):
+    """torch/OpenMP/MKL을 import 하기 전에 스레드 수 환경 변수를 설정합니다 (이미 지정된 값은 유지)."""
+    threads = _budget.get(role, {}).get('threads')
+    if not threads:
+        return
+    for name in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ.setdefault(name, str(int(threads)))
+
+
+def apply_opencv():
+    threads = _budget.get('opencv_threads')
+    if threads is None:
+        return
+    import cv2
+
+    cv2.setNumThreads(int(threads))
+
+
+def apply_torch():
+    """torch intra-op / inter-op 스레드 수를 설정합니다 (torch import 직후, 첫 추론 전에 호출)."""
+    inference = _budget.get('inference', {})
+    if not _budget or not inference:
+        return
+    import torch
+
+    if inference.get('threads'):
+        torch.set_num_threads(int(inference['threads']))
+    if inference.get('interop_threads'):
+        try:
+            torch.set_num_interop_threads(int(inference['interop_threads']))
+        except RuntimeError:
+            pass  # 이미 병렬 작업이 시작된 뒤에는 바꿀 수 없음
+
+
+def apply_ui_process(config_data: dict):
+    """
+    메인(Qt) 프로세스 시작 시 호출. OpenCV 스레드 수와 환경 변수를 적용하고,
+    추론이 별도 프로세스/서버에서 돌 때만 메인 스레드를 UI+캡처 코어에 고정합니다
+    (같은 프로세스 추론이면 torch 스레드가 메인 스레드의 코어 집합을 물려받기 때문).
+    """
+    if not configure(config_data):
+        return
+    apply_thread_env("inference")
+    apply_opencv()
+    if config_data.get('inference_process') or config_data.get('inference_server'):
+        pin_current_thread("ui", "capture")
+    print(f"Resource budget: ui={format_cores(role_cores('ui'))} capture={format_cores(role_cores('capture'))} "
+          f"inference={format_cores(role_cores('inference'))}")
+
+
+def apply_inference_process(config_data: dict):
+    """추론 워커 프로세스/서버 시작 시(torch import 전에) 호출합니다."""
+    if not configure(config_data):
+        return
+    apply_thread_env("inference")
+    pin_current_thread("inference")
+    apply_opencv()
@@ -0,0 +1,132 @@
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from defect import Defect
+
+
+def frame_hash(image: np.ndarray, hash_size: int = 16) -> int:
+    """
+    축소한 흑백 프레임의 가로 방향 밝기 차이로 만든 perceptual hash(dHash, hash_size^2 비트).
+    작은 결함도 구분되도록 기본 16x16(256비트)을 사용합니다.
+    """
+    # 전체 프레임을 변환하지 않도록 먼저 격자 샘플링으로 줄인 뒤 흑백 변환/축소
+    step = max(1, min(image.shape[:2]) // (hash_size * 8))
+    sampled = image[::step, ::step]
+    gray = sampled if sampled.ndim == 2 else cv2.cvtColor(np.ascontiguousarray(sampled), cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = small[:, 1:] > small[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def _file_version(model_path) -> str:
+    path = Path(str(model_path or ''))
+    return f"{path}@{path.stat().st_mtime if path.is_file() else 0}"
+
+
+def detector_cache_key(config_data: dict) -> str:
+    """
+    모델 버전(경로 + 수정 시각)과 결과에 영향을 주는 설정(임계값, 클래스 선택, 캐스케이드 게이트)을 묶은 캐시 키.
+    하나라도 바뀌면 이전 결과를 쓰지 않습니다.
+    """
+    thresholds = (config_data.get('confidence_threshold'), config_data.get('iou_threshold'),
+                  config_data.get('max_det'), config_data.get('imgsz'), config_data.get('direct_input'),
+                  repr(sorted(config_data.get('tta', {}).items())),
+                  repr(sorted(config_data.get('class_thresholds', {}).items())),
+                  repr(config_data.get('enabled_classes')))
+    cascade_config = config_data.get('cascade', {})
+    cascade = 'off'
+    if cascade_config.get('enabled', False):
+        cascade = f"{_file_version(cascade_config.get('classifier_path'))}|{sorted(cascade_config.items())!r}"
+    return f"{_file_version(config_data.get('model_path'))}|{thresholds}|{cascade}"
+
+
+class ResultCache:
+    """
+    카메라별 검출 결과 캐시 (LRU + TTL).
+    해시 간 Hamming 거리가 tolerance 이하이면 같은 장면으로 보고 이전 결과를 반환합니다.
+    """
+    def __init__(self, max_entries: int = 32, tolerance: int = 2, ttl: float = 10.0, hash_size: int = 16):
+        self.max_entries = max_entries
+        self.tolerance = tolerance
+        self.ttl = ttl
+        self.hash_size = hash_size
+        self._entries = {}  # camera -> OrderedDict[(key, hash)] = (timestamp, defects)
+        self.hits = {}
+        self.misses = {}
+
+    def lookup(self, camera: str, key: str, frame_hash_value: int) -> list[Defect] | None:
+        entries = self._entries.setdefault(camera, OrderedDict())
+        now = time.monotonic()
+        found = None
+        for entry_key in list(entries):
+            stored_at, defects = entries[entry_key]
+            if now - stored_at > self.ttl:
+                del entries[entry_key]  # 만료
+                continue
+            if found is None and entry_key[0] == key and \
+                    (entry_key[1] ^ frame_hash_value).bit_count() <= self.tolerance:
+                found = entry_key
+        if found is None:
+            self.misses[camera] = self.misses.get(camera, 0) + 1
+            return None
+        entries.move_to_end(found)  # 최근 사용
+        self.hits[camera] = self.hits.get(camera, 0) + 1
+        return list(entries[found][1])
+
+    def store(self, camera: str, key: str, frame_hash_value: int, defects: list[Defect]):
+        entries = self._entries.setdefault(camera, OrderedDict())
+        entries[(key, frame_hash_value)] = (time.monotonic(), list(defects))
+        entries.move_to_end((key, frame_hash_value))
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)  # 가장 오래 사용하지 않은 항목 제거
+
+    def clear(self):
+        self._entries.clear()
+
+
+class CachedDetector:
+    """
+    검출기(DefectDetector / RemoteDetector / InferenceClient) 앞단의 결과 캐시.
+    컨베이어 정지나 재검사처럼 거의 같은 프레임이 들어오면 추론 없이 이전 결과를 반환합니다.
+    """
+    def __init__(self, detector, cache_config: dict):
+        self.detector = detector
+        self.cache = ResultCache(max_entries=cache_config.get('max_entries', 32),
+                                 tolerance=cache_config.get('tolerance', 2),
+                                 ttl=cache_config.get('ttl_seconds', 10.0),
+                                 hash_size=cache_config.get('hash_size', 16))
+        self.key = detector_cache_key(detector.config)
+        self._inference_seconds = 0.0  # 미스 시 실제 추론 시간 누적 (절약 시간 추정용)
+
+    def __getattr__(self, name):
+        return getattr(self.detector, name)  # is_ready, load_model, close 등은 그대로 위임
+
+    def detect(self, image: np.ndarray, camera_name: str) -> list[Defect]:
+        if image is None:
+            return []
+        h = frame_hash(image, self.cache.hash_size)
+        cached = self.cache.lookup(camera_name, self.key, h)
+        if cached is not None:
+            return cached
+
+        start = time.perf_counter()
+        defects = self.detector.detect(image, camera_name)
+        self._inference_seconds += time.perf_counter() - start
+        self.cache.store(camera_name, self.key, h, defects)
+        return defects
+
+    def stats(self) -> dict:
+        """카메라별 적중/미스 횟수와 절약된 추론 시간(추정)을 반환합니다."""
+        hits = sum(self.cache.hits.values())
+        misses = sum(self.cache.misses.values())
+        avg_inference = self._inference_seconds / misses if misses else 0.0
+        return {
+            "hits": dict(self.cache.hits),
+            "misses": dict(self.cache.misses),
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "saved_seconds": hits * avg_inference,
+        }
@@ -1,14 +1,15 @@
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QGroupBox, QComboBox, 
                              QLineEdit, QDialogButtonBox, QDoubleSpinBox, QFormLayout, QLabel,
-                             QPushButton, QHBoxLayout, QFileDialog)
-from camera_manager import CameraManager
+                             QPushButton, QHBoxLayout, QFileDialog, QSpinBox)
+from camera_manager import CameraManager, DEFAULT_CAPTURE_PROFILE, MONO_FOURCCS
+import camera_discovery
 
 class SettingsDialog(QDialog):
     def __init__(self, current_config, parent=None):
         super().__init__(parent)
         self.config = current_config
         self.setWindowTitle("카메라 및 시스템 설정")
-        self.resize(400, 480) # Height increased
+        self.resize(400, 640) # Height increased (capture profile rows)
         self._init_ui()
 
     def _init_ui(self):
@@ -84,7 +85,7 @@ class SettingsDialog(QDialog):
         form = QFormLayout(group)
         
         type_combo = QComboBox()
-        type_combo.addItems(["USB", "RTSP"])
+        type_combo.addItems(["USB", "RTSP", "REPLAY"])
         type_combo.setCurrentText(cam_config.get('type', 'USB'))
         
         # Address inputs
@@ -96,6 +97,8 @@ class SettingsDialog(QDialog):
         # For USB: QComboBox + Search Button
         address_combo = QComboBox()
         address_combo.setEditable(True) 
+        # 이전 검색 결과가 있으면 다시 검색하지 않고 목록만 채움 (다이얼로그가 즉시 열리도록)
+        address_combo.addItems([str(d['index']) for d in camera_discovery.cached_cameras()])
         current_addr = cam_config.get('address', 0)
         address_combo.setCurrentText(str(current_addr))
             
@@ -113,7 +116,7 @@ class SettingsDialog(QDialog):
             group.repaint() 
             
             try:
-                indices = CameraManager.get_available_cameras()
+                indices = CameraManager.get_available_cameras(refresh=True)
                 address_combo.clear()
                 if indices:
                     address_combo.addItems([str(i) for i in indices])
@@ -126,18 +129,33 @@ class SettingsDialog(QDialog):
 
         search_btn.clicked.connect(_search_cameras)
 
+        # For REPLAY: 재생 속도 (realtime / max / 고정 FPS)
+        speed_combo = QComboBox()
+        speed_combo.setEditable(True)
+        speed_combo.addItems(["realtime", "max", "30"])
+        speed_combo.setCurrentText(str(cam_config.get('replay_speed', 'realtime')))
+        speed_label = QLabel("재생 속도:")
+
         def _update_ui(text):
             if text == "USB":
                 address_label.setText("카메라 번호 (Index):")
                 address_edit.hide()
                 address_combo.show()
                 search_btn.show()
+            elif text == "REPLAY":
+                address_label.setText("녹화 경로 (폴더/동영상):")
+                address_edit.show()
+                address_combo.hide()
+                search_btn.hide()
+                address_edit.setPlaceholderText("예: data/captures 또는 front.mp4")
             else:
                 address_label.setText("RTSP 주소 (URL):")
                 address_edit.show()
                 address_combo.hide()
                 search_btn.hide()
                 address_edit.setPlaceholderText("RTSP 주소 (예: rtsp://...)")
+            speed_label.setVisible(text == "REPLAY")
+            speed_combo.setVisible(text == "REPLAY")
         
         type_combo.currentTextChanged.connect(_update_ui)
         _update_ui(type_combo.currentText())
@@ -146,23 +164,69 @@ class SettingsDialog(QDialog):
         pixels_spin.setRange(0.1, 10000.0)
         pixels_spin.setValue(cam_config.get('pixels_per_mm', 10.0))
         
+        # 캡처 프로파일 (해상도 / FPS / 압축 포맷 / 버퍼)
+        profile = {**DEFAULT_CAPTURE_PROFILE, **cam_config.get('capture', {})}
+
+        resolution_combo = QComboBox()
+        resolution_combo.setEditable(True)
+        resolutions = ["640x480", "1280x720", "1920x1080"]
+        for device in camera_discovery.cached_cameras():
+            if str(device['index']) == str(cam_config.get('address', 0)):
+                resolutions = [f"{w}x{h}" for w, h in device['resolutions']] or resolutions
+        resolution_combo.addItems(resolutions)
+        resolution_combo.setCurrentText(f"{profile['width']}x{profile['height']}")
+
+        fps_spin = QSpinBox()
+        fps_spin.setRange(0, 240)
+        fps_spin.setSpecialValueText("기본값")
+        fps_spin.setValue(int(profile.get('fps') or 0))
+
+        fourcc_combo = QComboBox()
+        fourccs = ["MJPG", "YUYV"] + list(MONO_FOURCCS)
+        if profile.get('fourcc') and profile['fourcc'] not in fourccs:
+            fourccs.append(profile['fourcc'])  # 목록에 없는 포맷도 저장 시 그대로 유지
+        fourcc_combo.addItems(fourccs + ["기본값"])
+        fourcc_combo.setCurrentText(profile.get('fourcc') or "기본값")
+
+        buffer_spin = QSpinBox()
+        buffer_spin.setRange(0, 10)
+        buffer_spin.setSpecialValueText("기본값")
+        buffer_spin.setValue(int(profile.get('buffer_size') or 0))
+
+        def _update_profile_ui(text):
+            for widget in (resolution_combo, fps_spin, fourcc_combo, buffer_spin):
+                widget.setEnabled(text == "USB")
+
+        type_combo.currentTextChanged.connect(_update_profile_ui)
+        _update_profile_ui(type_combo.currentText())
+
         form.addRow("연결 방식:", type_combo)
         form.addRow(address_label, address_layout)
+        form.addRow(speed_label, speed_combo)
         form.addRow("픽셀 보정 (px/mm):", pixels_spin)
+        form.addRow("해상도:", resolution_combo)
+        form.addRow("FPS:", fps_spin)
+        form.addRow("압축 포맷 (FOURCC):", fourcc_combo)
+        form.addRow("버퍼 크기:", buffer_spin)
         
         return {
             'group': group, 
             'type': type_combo, 
             'address_edit': address_edit, 
             'address_combo': address_combo,
-            'pixels': pixels_spin
+            'replay_speed': speed_combo,
+            'pixels': pixels_spin,
+            'resolution': resolution_combo,
+            'fps': fps_spin,
+            'fourcc': fourcc_combo,
+            'buffer_size': buffer_spin
         }
 
     def get_settings(self):
         """사용자가 입력한 설정을 딕셔너리 형태로 반환합니다."""
         new_config = self.config.copy()
         
-        def _extract_data(widgets):
+        def _extract_data(key, widgets):
             ctype = widgets['type'].currentText()
             
             if ctype == "USB":
@@ -171,10 +235,26 @@ class SettingsDialog(QDialog):
             else:
                 address = widgets['address_edit'].text()
                 
-            return {"type": ctype, "address": address, "pixels_per_mm": widgets['pixels'].value()}
+            # 대화상자에서 다루지 않는 키(across_offset_mm, replay_loop 등)는 기존 값을 유지
+            current = self.config.get(key, {})
+            data = {**current, "type": ctype, "address": address, "pixels_per_mm": widgets['pixels'].value()}
+            if ctype == "REPLAY":
+                data["replay_speed"] = widgets['replay_speed'].currentText()
+
+            width, _, height = widgets['resolution'].currentText().lower().partition('x')
+            fourcc = widgets['fourcc'].currentText()
+            data["capture"] = {
+                **current.get("capture", {}),
+                "width": int(width) if width.strip().isdigit() else 0,
+                "height": int(height) if height.strip().isdigit() else 0,
+                "fps": widgets['fps'].value(),
+                "fourcc": fourcc if len(fourcc) == 4 else "",
+                "buffer_size": widgets['buffer_size'].value()
+            }
+            return data
 
-        new_config['front'] = _extract_data(self.front_widgets)
-        new_config['back'] = _extract_data(self.back_widgets)
+        new_config['front'] = _extract_data('front', self.front_widgets)
+        new_config['back'] = _extract_data('back', self.back_widgets)
         new_config['save_path'] = self.general_widgets['save_path'].text()
         new_config['model_path'] = self.model_widgets['model_path'].text()
         return new_config
\ No newline at end of file
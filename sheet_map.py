@@ -0,0 +1,347 @@
+"""
+코일/시트 좌표 결함 맵.
+
+카메라 프레임의 픽셀 좌표(Defect.bbox)를 시트 좌표(길이 방향 along_mm, 폭 방향 across_mm)로 바꾸고,
+축소한 프레임을 코일별/면별(FRONT, BACK) 메모리 맵 파일(strip mosaic)에 이어 붙입니다.
+결함은 길이 방향 격자(cell) 인덱스에 넣어 "이 구간의 결함" 질의를 전체 스캔 없이 처리합니다.
+500 m 코일도 필요한 구간만 디스크에서 읽으므로 모든 프레임을 메모리에 올리지 않습니다.
+
+저장 구조:
+    <root>/<coil_id>/meta.json
+    <root>/<coil_id>/front.u8, back.u8   (행 = 길이 방향, 열 = 폭 방향, 흑백 uint8)
+    <root>/<coil_id>/defects.jsonl
+
+config.json 예:
+    "sheet_map": {"enabled": true, "root": "data/coils", "mosaic_px_per_mm": 0.5,
+                  "strip_width_mm": 1600, "along_axis": "y", "index_cell_mm": 500}
+
+길이 방향 위치원(엔코더, tracking.conveyor_speed_mm_s, sheet_map.frame_pitch_mm) 중 하나는 반드시 필요합니다.
+없으면 모든 프레임이 0 mm에 겹쳐 기록되므로 맵을 만들지 않습니다.
+"""
+import json
+import os
+import time
+from bisect import insort
+from dataclasses import dataclass, asdict
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from defect import Defect
+
+GROW_ROWS = 8192  # 모자이크 파일을 늘릴 때 한 번에 추가하는 행 수
+META_INTERVAL_S = 2.0  # 기록 중 meta.json 갱신 간격 (기록 중/비정상 종료 코일도 열 수 있도록)
+
+
+@dataclass
+class SheetDefect:
+    """시트 좌표로 변환된 결함 (단위 mm, 원점 = 코일 시작점 / 스트립 기준 모서리)"""
+    camera: str
+    defect_type: str
+    status: str
+    along_mm: float
+    across_mm: float
+    length_mm: float      # 길이 방향 크기
+    width_mm: float       # 폭 방향 크기
+    score: float
+    frame_index: int
+    track_id: int | None = None
+
+
+def to_sheet_coords(defect: Defect, frame_along_mm: float, pixels_per_mm: float,
+                    across_offset_mm: float = 0.0, along_axis: str = "y", frame_index: int = 0) -> SheetDefect:
+    """프레임 픽셀 bbox를 시트 좌표로 변환합니다. frame_along_mm은 프레임 첫 행(열)의 길이 방향 위치입니다."""
+    x, y, w, h = defect.bbox
+    if along_axis == "x":
+        x, y, w, h = y, x, h, w
+    return SheetDefect(
+        camera=defect.camera,
+        defect_type=defect.defect_type,
+        status=defect.status,
+        along_mm=frame_along_mm + y / pixels_per_mm,
+        across_mm=across_offset_mm + x / pixels_per_mm,
+        length_mm=h / pixels_per_mm,
+        width_mm=w / pixels_per_mm,
+        score=defect.score,
+        frame_index=frame_index,
+        track_id=defect.track_id,
+    )
+
+
+class StripMosaic:
+    """
+    한 면(FRONT/BACK)의 축소 흑백 모자이크. 필요할 때마다 파일 크기를 늘리는 np.memmap.
+    meta.json의 행 수가 파일보다 뒤처져 있으면(기록 중이거나 비정상 종료된 코일) 파일 끝에서 복구합니다.
+    """
+    def __init__(self, path: Path, width_px: int, rows: int = 0, readonly: bool = False):
+        self.path = path
+        self.width_px = width_px
+        self.rows = rows          # 실제로 기록된 행 수
+        self.readonly = readonly
+        self._capacity = 0
+        self._map = None
+        if not readonly:
+            path.touch(exist_ok=True)
+        file_rows = path.stat().st_size // max(width_px, 1) if path.exists() else 0
+        self._open(max(rows, file_rows) if not readonly else file_rows)
+        if self._capacity > rows:
+            self.rows = self._recover_rows(rows)
+
+    def _recover_rows(self, rows: int) -> int:
+        """rows 이후에 기록된 마지막 행 (0이 아닌 행)을 파일 끝에서부터 찾습니다. 희소 영역은 0으로 읽힘."""
+        for end in range(self._capacity, rows, -GROW_ROWS):
+            start = max(rows, end - GROW_ROWS)
+            written = np.flatnonzero(self._map[start:end].any(axis=1))
+            if written.size:
+                return start + int(written[-1]) + 1
+        return rows
+
+    def _open(self, capacity: int):
+        if self._map is not None:
+            self._map.flush()
+            del self._map
+        self._capacity = capacity
+        if capacity == 0:
+            self._map = None
+            return
+        mode = "r" if self.readonly else "r+"
+        self._map = np.memmap(self.path, dtype=np.uint8, mode=mode, shape=(capacity, self.width_px))
+
+    def _ensure(self, rows: int):
+        if rows <= self._capacity:
+            return
+        capacity = (rows // GROW_ROWS + 1) * GROW_ROWS
+        with open(self.path, "r+b") as f:
+            f.truncate(capacity * self.width_px)  # 희소 파일로 확장 (0 = 미촬영 영역)
+        self._open(capacity)
+
+    def write(self, row: int, col: int, tile: np.ndarray):
+        """tile(흑백)을 (row, col) 위치에 기록합니다. 폭을 벗어나는 부분은 잘라냅니다."""
+        if row < 0 or col >= self.width_px:
+            return
+        tile = tile[:, :max(0, self.width_px - col)]
+        if col < 0:
+            tile = tile[:, -col:]
+            col = 0
+        if tile.size == 0:
+            return
+        self._ensure(row + tile.shape[0])
+        self._map[row:row + tile.shape[0], col:col + tile.shape[1]] = tile
+        self.rows = max(self.rows, row + tile.shape[0])
+
+    def region(self, row0: int, row1: int) -> np.ndarray:
+        """[row0, row1) 구간의 뷰 (디스크에서 해당 페이지만 읽음)."""
+        if self._map is None:
+            return np.zeros((0, self.width_px), dtype=np.uint8)
+        return self._map[max(0, row0):min(row1, self.rows)]
+
+    def close(self):
+        if self._map is not None:
+            if not self.readonly:
+                self._map.flush()
+            del self._map
+            self._map = None
+
+
+class DefectIndex:
+    """길이 방향 격자 인덱스: cell -> 결함 번호 목록 (번호 순 정렬)."""
+    def __init__(self, cell_mm: float = 500.0):
+        self.cell_mm = cell_mm
+        self.defects: list[SheetDefect] = []
+        self._cells: dict[int, list[int]] = {}
+
+    def add(self, defect: SheetDefect):
+        idx = len(self.defects)
+        self.defects.append(defect)
+        first = int(defect.along_mm // self.cell_mm)
+        last = int((defect.along_mm + defect.length_mm) // self.cell_mm)
+        for cell in range(first, last + 1):  # 여러 셀에 걸친 긴 결함은 각 셀에 등록
+            insort(self._cells.setdefault(cell, []), idx)
+
+    def query(self, along0: float, along1: float, across0: float = float("-inf"),
+              across1: float = float("inf"), camera: str | None = None) -> list[SheetDefect]:
+        """영역 [along0, along1) x [across0, across1)과 겹치는 결함."""
+        seen = set()
+        result = []
+        for cell in range(int(along0 // self.cell_mm), int(along1 // self.cell_mm) + 1):
+            for idx in self._cells.get(cell, ()):
+                if idx in seen:
+                    continue
+                seen.add(idx)
+                d = self.defects[idx]
+                if camera is not None and d.camera != camera:
+                    continue
+                if d.along_mm < along1 and d.along_mm + d.length_mm >= along0 and \
+                        d.across_mm < across1 and d.across_mm + d.width_mm >= across0:
+                    result.append(d)
+        result.sort(key=lambda d: d.along_mm)
+        return result
+
+
+class CoilMap:
+    """
+    코일 하나의 결함 맵 + 면별 모자이크.
+    검사 중에는 add_frame()으로 프레임과 결함을 추가하고, 리뷰 시에는 open()으로 읽기 전용으로 엽니다.
+    """
+    CAMERAS = ("FRONT", "BACK")
+
+    def __init__(self, root: str, coil_id: str, map_config: dict, camera_configs: dict | None = None,
+                 readonly: bool = False):
+        self.coil_dir = Path(root) / coil_id
+        self.coil_id = coil_id
+        self.readonly = readonly
+        self.camera_configs = camera_configs or {}
+        meta_path = self.coil_dir / "meta.json"
+        if readonly:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+        else:
+            self.coil_dir.mkdir(parents=True, exist_ok=True)
+            meta = {
+                "coil_id": coil_id,
+                "created": time.time(),
+                "mosaic_px_per_mm": float(map_config.get("mosaic_px_per_mm", 0.5)),
+                "strip_width_mm": float(map_config.get("strip_width_mm", 1600)),
+                "along_axis": map_config.get("along_axis", "y"),
+                "index_cell_mm": float(map_config.get("index_cell_mm", 500)),
+                "rows": {},
+                "frames": 0,
+            }
+            if meta_path.exists():
+                with open(meta_path, encoding="utf-8") as f:
+                    meta.update(json.load(f))  # 이어서 기록
+        self.meta = meta
+        self.scale = meta["mosaic_px_per_mm"]
+        self.along_axis = meta["along_axis"]
+        width_px = int(round(meta["strip_width_mm"] * self.scale))
+        self.mosaics = {cam: StripMosaic(self.coil_dir / f"{cam.lower()}.u8", width_px,
+                                         meta["rows"].get(cam, 0), readonly)
+                        for cam in self.CAMERAS}
+        self.index = DefectIndex(meta["index_cell_mm"])
+        defects_path = self.coil_dir / "defects.jsonl"
+        if defects_path.exists():
+            with open(defects_path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        self.index.add(SheetDefect(**json.loads(line)))
+        self._defects_file = None if readonly else open(defects_path, "a", encoding="utf-8")
+        self._meta_time = 0.0
+        if not readonly:
+            self._write_meta()
+
+    @classmethod
+    def open(cls, root: str, coil_id: str) -> "CoilMap":
+        return cls(root, coil_id, {}, readonly=True)
+
+    def _camera(self, camera_name: str) -> dict:
+        return self.camera_configs.get(camera_name.lower(), {})
+
+    def add_frame(self, camera_name: str, image: np.ndarray, defects: list[Defect],
+                  frame_along_mm: float) -> list[SheetDefect]:
+        """프레임을 모자이크에 붙이고 결함을 시트 좌표로 변환해 인덱스/파일에 기록합니다."""
+        cam = self._camera(camera_name)
+        ppm = float(cam.get("pixels_per_mm", 10.0))
+        across_offset = float(cam.get("across_offset_mm", 0.0))
+        frame_index = self.meta["frames"]
+        self.meta["frames"] += 1
+
+        if image is not None:
+            gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            if self.along_axis == "x":
+                gray = gray.T
+            factor = self.scale / ppm  # 프레임 px -> 모자이크 px
+            size = (max(1, int(round(gray.shape[1] * factor))), max(1, int(round(gray.shape[0] * factor))))
+            tile = cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+            self.mosaics[camera_name].write(int(round(frame_along_mm * self.scale)),
+                                            int(round(across_offset * self.scale)), tile)
+
+        sheet_defects = [to_sheet_coords(d, frame_along_mm, ppm, across_offset, self.along_axis, frame_index)
+                         for d in defects]
+        for d in sheet_defects:
+            self.index.add(d)
+            self._defects_file.write(json.dumps(asdict(d)) + "\n")
+        self._defects_file.flush()
+        if time.monotonic() - self._meta_time >= META_INTERVAL_S:
+            self._write_meta()
+        return sheet_defects
+
+    def _write_meta(self):
+        """행 수/프레임 수를 meta.json에 기록합니다 (임시 파일 후 교체, 읽는 쪽이 반쯤 쓴 파일을 보지 않도록)."""
+        self.meta["rows"] = {cam: m.rows for cam, m in self.mosaics.items()}
+        for m in self.mosaics.values():
+            if m._map is not None:
+                m._map.flush()
+        tmp_path = self.coil_dir / "meta.json.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.meta, f, indent=4)
+        os.replace(tmp_path, self.coil_dir / "meta.json")
+        self._meta_time = time.monotonic()
+
+    def query(self, along0: float, along1: float, across0: float = float("-inf"),
+              across1: float = float("inf"), camera: str | None = None, unique: bool = True) -> list[SheetDefect]:
+        """
+        영역 안의 결함. 매 프레임 관측이 모두 기록되므로 unique=True이면
+        같은 track_id는 신뢰도가 가장 높은 관측 하나만 남깁니다.
+        """
+        defects = self.index.query(along0, along1, across0, across1, camera)
+        if not unique:
+            return defects
+        best = {}
+        result = []
+        for d in defects:
+            if d.track_id is None:
+                result.append(d)
+            elif (d.camera, d.track_id) not in best or d.score > best[(d.camera, d.track_id)].score:
+                best[(d.camera, d.track_id)] = d
+        result.extend(best.values())
+        result.sort(key=lambda d: d.along_mm)
+        return result
+
+    def mosaic_region(self, camera_name: str, along0: float, along1: float) -> np.ndarray:
+        """길이 방향 [along0, along1) mm 구간의 모자이크 (메모리 맵 뷰)."""
+        return self.mosaics[camera_name].region(int(along0 * self.scale), int(np.ceil(along1 * self.scale)))
+
+    def length_mm(self) -> float:
+        return max(m.rows for m in self.mosaics.values()) / self.scale
+
+    def close(self):
+        if not self.readonly:
+            self._write_meta()
+            self._defects_file.close()
+        for m in self.mosaics.values():
+            m.close()
+
+
+class SheetPosition:
+    """
+    프레임의 길이 방향 위치(mm). 엔코더 값이 있으면 그대로 쓰고,
+    없으면 컨베이어 속도 x 경과 시간(또는 프레임 번호 x frame_pitch_mm)으로 추정합니다.
+    """
+    def __init__(self, conveyor_speed_mm_s: float = 0.0, frame_pitch_mm: float | None = None):
+        self.conveyor_speed = conveyor_speed_mm_s or 0.0
+        self.frame_pitch_mm = frame_pitch_mm
+        self._start = None
+        self._frames = 0
+        self._warned = False
+
+    @property
+    def has_estimate(self) -> bool:
+        """엔코더 없이도 위치를 추정할 수 있는지 (컨베이어 속도 또는 프레임 간격 설정)."""
+        return bool(self.frame_pitch_mm) or self.conveyor_speed > 0
+
+    def next(self, encoder_mm: float | None = None, timestamp: float | None = None) -> float:
+        now = time.monotonic() if timestamp is None else timestamp
+        if self._start is None:
+            self._start = now
+        frame_index = self._frames
+        self._frames += 1
+        if encoder_mm is not None:
+            return encoder_mm
+        if not self.has_estimate and not self._warned:
+            self._warned = True
+            print("WARNING: sheet position has no encoder, conveyor speed or frame_pitch_mm - "
+                  "every frame is mapped to 0 mm.")
+        if self.frame_pitch_mm:
+            return frame_index * self.frame_pitch_mm
+        return (now - self._start) * self.conveyor_speed
@@ -0,0 +1,355 @@
+"""
+장시간 무인 운전(soak) 테스트.
+
+오프스크린 Qt(QT_QPA_PLATFORM=offscreen)로 MainWindow 전체를 띄우고, 두 카메라를 녹화 세션 재생(REPLAY)
+또는 합성 결함 프레임(synthetic_frames.py)으로 바꿔 검사 주기를 생산 속도로 몇 시간 동안 반복합니다.
+sample 간격마다 RSS, 열린 파일 핸들 수, Qt 위젯 수, 로그 테이블 행 수, gc 객체 수(유형별),
+tracemalloc 추적 메모리, 주기 지연(중앙값)을 기록하고, 워밍업 이후 샘플의 시간당 증가 기울기(최소제곱)가
+config.json "soak" 한도를 넘으면 실패(종료 코드 1)로 끝납니다.
+RSS/tracemalloc은 한 번의 계단(할당자 arena 확장, 캐시 최초 채움 등)을 max_*_step 한도까지 빼고 기울기를 구하므로
+한 번 늘고 평탄해진 메모리는 누수로 판정하지 않습니다. 기울기가 한도를 넘어도 그 차이가 잡음(기울기 표준오차의
+2배) 이내이면 실패로 보지 않습니다 - 짧은 실행은 느슨하고, 몇 시간 실행하면 오차가 줄어 작은 증가도 잡힙니다.
+
+사용 예:
+    python soak_test.py --hours 4 --rate 2 --synthetic 500
+    python soak_test.py --minutes 30 --frames data/captures/session_01 --sample-interval 30
+"""
+import argparse
+import csv
+import gc
+import math
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+import config
+
+# 기울기 검사 항목: 샘플 열 -> config "soak" 한도 키 (단위: 시간당 증가량)
+DRIFT_LIMITS = {
+    "rss_mb": "max_rss_mb_per_hour",
+    "traced_mb": "max_traced_mb_per_hour",
+    "objects": "max_objects_per_hour",
+    "handles": "max_handles_per_hour",
+    "widgets": "max_widgets_per_hour",
+    "log_rows": "max_log_rows_per_hour",
+    "latency_ms": "max_latency_ms_per_hour",
+}
+# 한 번의 계단을 허용하는 항목: 샘플 열 -> config "soak" 계단 크기 한도 키
+STEP_LIMITS = {
+    "rss_mb": "max_rss_step_mb",
+    "traced_mb": "max_traced_step_mb",
+}
+STEP_OUTLIER_RATIO = 5.0  # 가장 큰 증가량이 나머지 증가량 중앙값의 이 배수를 넘어야 계단으로 봄
+
+
+def rss_mb() -> float:
+    """현재 프로세스 RSS (MB). Linux는 /proc, 그 외에는 psutil이 있을 때만."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2 ** 20
+    except ImportError:
+        return math.nan
+
+
+def open_handles() -> float:
+    """열린 파일 디스크립터(Windows는 핸들) 수."""
+    if os.path.isdir("/proc/self/fd"):
+        return len(os.listdir("/proc/self/fd"))
+    try:
+        import psutil
+        process = psutil.Process()
+        return process.num_handles() if hasattr(process, "num_handles") else process.num_fds()
+    except ImportError:
+        return math.nan
+
+
+def object_counts() -> Counter:
+    return Counter(type(o).__name__ for o in gc.get_objects())
+
+
+def remove_step(values: list[float], max_step: float) -> tuple[list[float], float]:
+    """
+    한 번의 계단을 뺀 값 목록과 뺀 크기를 반환합니다.
+    연속 샘플 증가량 중 가장 큰 것이 나머지의 중앙값보다 STEP_OUTLIER_RATIO 배 이상 크고 max_step 이하이면
+    그 이후 값에서 빼고, 아니면 그대로 둡니다. 꾸준한 누수는 증가량이 고르므로 빠지지 않습니다.
+    """
+    if len(values) < 3:
+        return values, 0.0
+    diffs = np.diff(values)
+    i = int(np.argmax(diffs))
+    step = float(diffs[i])
+    rest = np.abs(np.delete(diffs, i))
+    if step <= 0 or step > max_step or step < STEP_OUTLIER_RATIO * float(np.median(rest)):
+        return values, 0.0
+    return [v - step if j > i else v for j, v in enumerate(values)], step
+
+
+def drift_slope(hours: list[float], values: list[float],
+                max_step: float | None = None) -> tuple[float, float, float]:
+    """
+    (시간당 기울기 (최소제곱 직선), 기울기 표준오차의 2배, 제외한 계단 크기). 샘플이 부족하면 기울기는 nan.
+    max_step이 있으면 그 크기 이하의 계단 하나는 빼고 기울기를 구합니다.
+    """
+    points = [(h, v) for h, v in zip(hours, values) if not math.isnan(v)]
+    if len(points) < 3 or points[-1][0] - points[0][0] <= 0:
+        return math.nan, math.nan, 0.0
+    xs, ys = (np.asarray(a, dtype=float) for a in zip(*points))
+    step = 0.0
+    if max_step:
+        ys, step = remove_step(list(ys), max_step)
+    slope, intercept = np.polyfit(xs, ys, 1)
+    residuals = ys - (slope * xs + intercept)
+    stderr = math.sqrt(float(residuals @ residuals) / (len(xs) - 2) / float(((xs - xs.mean()) ** 2).sum()))
+    return float(slope), 2 * stderr, step
+
+
+def prepare_synthetic(count: int, app_config: dict) -> str:
+    """
+    합성 결함 프레임을 임시 폴더에 카메라별 이름(synth_front_*, synth_back_*)으로 써서 REPLAY 소스로 사용합니다.
+    두 카메라가 서로 다른 프레임을 재생하도록 index 범위를 나눕니다.
+    """
+    import cv2
+    from synthetic_frames import generate
+
+    out_dir = tempfile.mkdtemp(prefix="soak_frames_")
+    capture = app_config.get("front", {}).get("capture", {})
+    settings = {
+        "width": int(capture.get("width") or 1280),
+        "height": int(capture.get("height") or 720),
+        "pixels_per_mm": float(app_config.get("front", {}).get("pixels_per_mm", 10.0)),
+    }
+    for index, image, _truth in generate(2 * count, settings):
+        camera = "front" if index < count else "back"
+        cv2.imwrite(os.path.join(out_dir, f"synth_{camera}_{index % count:06d}.png"), image)
+    print(f"Soak: {count} synthetic frames per camera in {out_dir}")
+    return out_dir
+
+
+class SoakRunner:
+    """
+    QTimer로 검사 주기와 샘플링을 구동하고, 끝나면 기울기를 판정합니다.
+    실행 시간과 워밍업은 첫 검사 주기부터 셉니다 (torch import/모델 로딩은 기울기에서 제외).
+    """
+    def __init__(self, app, window, soak_config: dict, duration_s: float, rate: float, sample_interval: float,
+                 warmup_s: float, csv_path, use_tracemalloc: bool):
+        self.app = app
+        self.window = window
+        self.limits = soak_config
+        self.duration_s = duration_s
+        self.rate = rate
+        self.sample_interval = sample_interval
+        self.warmup_s = warmup_s
+        self.csv_path = csv_path
+        self.use_tracemalloc = use_tracemalloc
+        self.start_time = None
+        self.first_cycle_time = None
+        self.cycles = 0
+        self.errors = 0
+        self.popups = 0
+        self.latencies = []
+        self.rows = []
+        self.baseline_objects = None
+        self.baseline_snapshot = None
+        self._last_counts = Counter()
+        self.failed = False
+
+    def start(self):
+        from PyQt5.QtCore import QTimer
+
+        if self.use_tracemalloc:
+            tracemalloc.start(1)
+        self.start_time = time.perf_counter()
+        self.cycle_timer = QTimer()
+        self.cycle_timer.timeout.connect(self._cycle)
+        self.cycle_timer.start(max(1, int(1000 / self.rate)))
+        self.sample_timer = QTimer()
+        self.sample_timer.timeout.connect(self._sample)
+        self.sample_timer.start(int(self.sample_interval * 1000))
+
+    def _cycle(self):
+        if not self.window._model_load_done:
+            return  # 모델 로딩이 끝난 뒤부터 측정
+        if self.window.canvas is None:
+            self.window._init_charts()  # 대시보드 차트 갱신 경로도 매 주기 실행
+        t0 = time.perf_counter()
+        try:
+            self.window._run_inspection()
+        except Exception as e:
+            self.errors += 1
+            print(f"Soak: inspection error: {e!r}")
+        self.latencies.append((time.perf_counter() - t0) * 1000)
+        self.cycles += 1
+        if self.first_cycle_time is None:
+            from PyQt5.QtCore import QTimer
+
+            self.first_cycle_time = time.perf_counter()
+            QTimer.singleShot(int(self.duration_s * 1000), self._finish)
+        self.window._resume_preview()  # 다음 검사까지 프리뷰 경로 실행
+
+    def _sample(self):
+        gc.collect()
+        now = time.perf_counter()
+        elapsed = now - self.start_time
+        run_s = now - self.first_cycle_time if self.first_cycle_time is not None else math.nan
+        counts = object_counts()
+        from PyQt5.QtWidgets import QApplication
+
+        row = {
+            "elapsed_h": elapsed / 3600,
+            "run_h": run_s / 3600,
+            "cycles": self.cycles,
+            "rss_mb": rss_mb(),
+            "traced_mb": tracemalloc.get_traced_memory()[0] / 2 ** 20 if self.use_tracemalloc else math.nan,
+            "objects": sum(counts.values()),
+            "handles": open_handles(),
+            "widgets": len(QApplication.allWidgets()),
+            "log_rows": self.window.log_table.rowCount(),
+            "latency_ms": float(np.median(self.latencies)) if self.latencies else math.nan,
+            "errors": self.errors,
+            "popups": self.popups,
+        }
+        self.latencies = []
+        self.rows.append(row)
+        if self.baseline_objects is None and run_s >= self.warmup_s:
+            self.baseline_objects = counts
+            if self.use_tracemalloc:
+                self.baseline_snapshot = tracemalloc.take_snapshot()
+        self._last_counts = counts
+        print(f"Soak {elapsed / 60:6.1f} min: cycles {row['cycles']}, rss {row['rss_mb']:.1f} MB, "
+              f"objects {row['objects']}, handles {row['handles']}, latency {row['latency_ms']:.1f} ms")
+
+    def _finish(self):
+        self.cycle_timer.stop()
+        self.sample_timer.stop()
+        self._sample()
+        self._write_csv()
+        self.failed = not self._report()
+        self.window.close()
+        self.app.quit()
+
+    def _write_csv(self):
+        self.csv_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(self.rows[0].keys()))
+            writer.writeheader()
+            writer.writerows(self.rows)
+
+    def _report(self) -> bool:
+        rows = [r for r in self.rows if r["run_h"] * 3600 >= self.warmup_s]
+        hours = [r["run_h"] for r in rows]
+        ok = True
+        print(f"\nSoak finished: {self.cycles} cycles, {self.errors} errors, {self.popups} dialogs, "
+              f"{len(rows)} samples after warmup (csv: {self.csv_path})")
+        from main_window import MAX_LOG_ROWS
+
+        print(f"{'metric':<12} {'slope/h':>12} {'±2σ':>10} {'limit/h':>10}")
+        for column, limit_key in DRIFT_LIMITS.items():
+            values = [r[column] for r in rows]
+            column_hours = hours
+            limit = self.limits.get(limit_key)
+            note = ''
+            if column == "log_rows" and values and max(values) < MAX_LOG_ROWS:
+                limit, note = None, f"(filling up to {MAX_LOG_ROWS})"  # 상한에 닿기 전의 증가는 정상
+            elif column == "log_rows" and values:
+                first = next(i for i, v in enumerate(values) if v >= MAX_LOG_ROWS)
+                column_hours, values = hours[first:], values[first:]  # 상한에 닿은 뒤(평탄 구간)만 판정
+            slope, margin, step = drift_slope(column_hours, values, self.limits.get(STEP_LIMITS.get(column)))
+            if step:
+                note = f"(one-off step {step:+.1f} excluded)"
+            failed = limit is not None and not math.isnan(slope) and slope - margin > limit
+            if column == "log_rows" and values and max(values) > MAX_LOG_ROWS:
+                failed, note = True, f"(> {MAX_LOG_ROWS})"
+            ok &= not failed
+            print(f"{column:<12} {slope:>12.3f} {margin:>10.3f} {limit if limit is not None else '-':>10} "
+                  f"{'FAIL' if failed else ''} {note}")
+        if self.errors > self.limits.get("max_errors", 0):
+            ok = False
+            print(f"inspection errors {self.errors} > {self.limits.get('max_errors', 0)}  FAIL")
+
+        if self.baseline_objects is not None:
+            growth = (self._last_counts - self.baseline_objects).most_common(10)
+            if growth:
+                print("object types grown since warmup: " + ", ".join(f"{name} +{n}" for name, n in growth))
+        if self.baseline_snapshot is not None:
+            print("top allocation growth since warmup (tracemalloc):")
+            for stat in tracemalloc.take_snapshot().compare_to(self.baseline_snapshot, "lineno")[:10]:
+                print(f"  {stat}")
+        print("SOAK PASS" if ok else "SOAK FAIL")
+        return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="장시간 soak 테스트 (메모리/핸들/지연 증가 추적)")
+    parser.add_argument("--hours", type=float, default=None)
+    parser.add_argument("--minutes", type=float, default=None, help="--hours 대신 분 단위")
+    parser.add_argument("--rate", type=float, default=2.0, help="초당 검사 횟수 (생산 속도)")
+    parser.add_argument("--frames", help="재생할 녹화 세션 폴더/동영상 (두 카메라 공용)")
+    parser.add_argument("--synthetic", type=int, default=300, help="--frames 가 없을 때 만들 합성 프레임 수")
+    parser.add_argument("--sample-interval", type=float, default=60.0, help="샘플 간격(초)")
+    parser.add_argument("--warmup", type=float, default=None, help="기울기 계산에서 제외할 처음 구간(초)")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="tracemalloc 끄기 (오버헤드 제거)")
+    parser.add_argument("--output", help="샘플 CSV 경로 (기본: data/results/soak_<시각>.csv)")
+    parser.add_argument("--model", help="이 실행에서만 사용할 모델 파일 (config.json model_path 대신)")
+    args = parser.parse_args()
+
+    duration_s = (args.minutes * 60 if args.minutes else (args.hours or 1.0) * 3600)
+    warmup_s = args.warmup if args.warmup is not None else min(600.0, duration_s * 0.1)
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    app_config = config.load_config()
+    if args.model:
+        app_config["model_path"] = args.model
+    source = args.frames or prepare_synthetic(args.synthetic, app_config)
+    for camera in ("front", "back"):
+        # fps 0은 설정 대화상자의 '기본값'이므로 30 FPS로 재생
+        fps = app_config[camera].get("capture", {}).get("fps") or 30
+        app_config[camera] = dict(app_config[camera], type="REPLAY", address=source, replay_speed=fps,
+                                  replay_loop=True)
+
+    # MainWindow가 읽는 설정을 이 실행에서만 바꿈 (config.json은 건드리지 않음)
+    config.load_config = lambda: dict(app_config)
+
+    from PyQt5.QtWidgets import QApplication, QMessageBox
+
+    app = QApplication(sys.argv)
+    from main_window import MainWindow
+
+    runner = None
+
+    # 무인 실행이므로 모달 대화상자는 띄우지 않고 횟수만 셈 (종료 확인은 '아니오')
+    def _dialog(*args, **kwargs):
+        if runner is not None:
+            runner.popups += 1
+        print(f"Soak: dialog suppressed: {args[1:3]}")
+        return QMessageBox.No
+
+    for name in ("information", "warning", "critical", "question"):
+        setattr(QMessageBox, name, staticmethod(_dialog))
+
+    window = MainWindow()
+    window.show()
+    csv_path = Path(args.output) if args.output else \
+        config.RESULT_DIR / f"soak_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    runner = SoakRunner(app, window, app_config.get("soak", {}), duration_s, args.rate, args.sample_interval,
+                        warmup_s, csv_path, not args.no_tracemalloc)
+    runner.start()
+    app.exec_()
+    sys.exit(1 if runner.failed else 0)
+
+
+if __name__ == "__main__":
+    main()
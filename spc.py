@@ -0,0 +1,338 @@
+"""
+측정값(크랙 길이, 홀 지름) 스트리밍 SPC 통계.
+
+Defect 측정값을 받을 때마다 O(1)(t-digest는 분할 상환 O(1))로 다음 집계를 갱신하므로
+대시보드는 이력을 다시 훑지 않고 바로 조회할 수 있습니다.
+    누적      : Welford 평균/분산, 최소/최대, t-digest 분위수
+    최근 window: 고정 크기 링 버퍼의 평균/분산 (추세 차트 데이터 겸용), 이동범위(MR) 평균
+    이동평균   : EWMA
+    공정능력   : Cp/Cpk (군내 σ = MR평균/1.128), Pp/Ppk (전체 σ)
+    관리한계   : I-MR 개별값 관리도 UCL/LCL = 중심 ± 3σ
+    불량률     : 교대(shift)별 검사 수 대비 결함 유형별 건수
+
+카메라(FRONT/BACK)별과 전체("ALL")를 결함 유형별로 따로 유지합니다.
+
+config.json 예:
+    "spc": {"window": 50, "ewma_alpha": 0.2, "compression": 100,
+            "spec_limits": {"crack": {"usl": 3.0}, "hole": {"usl": 5.0}},
+            "shifts": {"A": "06:00-14:00", "B": "14:00-22:00", "C": "22:00-06:00"}, "keep_shifts": 21}
+"""
+import math
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# 결함 유형별 SPC 대상 측정값 (Defect 필드)
+METRICS = {"crack": "length_mm", "hole": "diameter_mm"}
+D2 = 1.128  # 크기 2 이동범위의 d2 상수
+
+
+class Welford:
+    """누적 평균/분산 (수치적으로 안정적인 한 번 통과 알고리즘)."""
+    __slots__ = ("count", "mean", "_m2", "min", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, x: float):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+        self.min = min(self.min, x)
+        self.max = max(self.max, x)
+
+    @property
+    def variance(self) -> float:
+        """표본 분산 (ddof=1). 두 개 미만이면 nan."""
+        return self._m2 / (self.count - 1) if self.count > 1 else math.nan
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class RollingWindow:
+    """
+    최근 size개 값의 링 버퍼. 값이 밀려날 때 평균/분산을 O(1)로 갱신하고,
+    버퍼가 한 바퀴 돌 때마다 버퍼에서 다시 계산하여 부동소수 오차 누적을 막습니다.
+    """
+    def __init__(self, size: int):
+        self.size = int(size)
+        self._data = np.zeros(self.size, dtype=np.float64)
+        self._pos = 0
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, x: float):
+        if self.count < self.size:
+            self.count += 1
+            delta = x - self.mean
+            self.mean += delta / self.count
+            self._m2 += delta * (x - self.mean)
+        else:
+            old = self._data[self._pos]
+            new_mean = self.mean + (x - old) / self.size
+            self._m2 += (x - old) * (x - new_mean + old - self.mean)
+            self.mean = new_mean
+        self._data[self._pos] = x
+        self._pos = (self._pos + 1) % self.size
+        if self._pos == 0 and self.count == self.size:
+            self.mean = float(self._data.mean())
+            self._m2 = float(((self._data - self.mean) ** 2).sum())
+
+    @property
+    def variance(self) -> float:
+        return max(self._m2, 0.0) / (self.count - 1) if self.count > 1 else math.nan
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def values(self) -> np.ndarray:
+        """시간 순서의 창 내용 (차트용 사본)."""
+        if self.count < self.size:
+            return self._data[:self.count].copy()
+        return np.concatenate((self._data[self._pos:], self._data[:self._pos]))
+
+
+class TDigest:
+    """
+    병합형 t-digest (k1 척도 함수). 값은 버퍼에 모았다가 가득 차면 중심점(centroid)과 한 번에 병합하므로
+    갱신은 분할 상환 O(1)이고, 메모리는 compression에 비례합니다. 꼬리 분위수일수록 정확합니다.
+    """
+    def __init__(self, compression: float = 100, buffer_size: int | None = None):
+        self.compression = float(compression)
+        self.buffer_size = int(buffer_size or 5 * compression)
+        self._means = np.zeros(0)
+        self._weights = np.zeros(0)
+        self._buffer = []
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, x: float):
+        self._buffer.append(x)
+        self.count += 1
+        self.min = min(self.min, x)
+        self.max = max(self.max, x)
+        if len(self._buffer) >= self.buffer_size:
+            self._merge()
+
+    def _k(self, q: float) -> float:
+        return self.compression / (2 * math.pi) * math.asin(2 * min(max(q, 0.0), 1.0) - 1)
+
+    def _q(self, k: float) -> float:
+        return (math.sin(min(k * 2 * math.pi / self.compression, math.pi / 2)) + 1) / 2
+
+    def _merge(self):
+        if not self._buffer:
+            return
+        means = np.concatenate((self._means, np.asarray(self._buffer, dtype=np.float64)))
+        weights = np.concatenate((self._weights, np.ones(len(self._buffer))))
+        self._buffer = []
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+
+        new_means, new_weights = [], []
+        cur_mean, cur_weight = means[0], weights[0]
+        weight_so_far = 0.0
+        q_limit = self._q(self._k(0.0) + 1)
+        for m, w in zip(means[1:], weights[1:]):
+            if (weight_so_far + cur_weight + w) / total <= q_limit:
+                cur_weight += w
+                cur_mean += (m - cur_mean) * w / cur_weight
+            else:
+                new_means.append(cur_mean)
+                new_weights.append(cur_weight)
+                weight_so_far += cur_weight
+                q_limit = self._q(self._k(weight_so_far / total) + 1)
+                cur_mean, cur_weight = m, w
+        new_means.append(cur_mean)
+        new_weights.append(cur_weight)
+        self._means = np.array(new_means)
+        self._weights = np.array(new_weights)
+
+    def quantile(self, q: float) -> float:
+        self._merge()
+        if self.count == 0:
+            return math.nan
+        # 중심점 가중치의 중앙을 기준점으로 선형 보간 (양 끝은 실제 최소/최대)
+        centers = np.cumsum(self._weights) - self._weights / 2
+        xs = np.concatenate(([0.0], centers, [float(self.count)]))
+        ys = np.concatenate(([self.min], self._means, [self.max]))
+        return float(np.interp(q * self.count, xs, ys))
+
+    @property
+    def centroids(self) -> int:
+        self._merge()
+        return len(self._means)
+
+
+class MeasurementStats:
+    """한 (카메라, 결함 유형) 측정값 흐름의 모든 집계."""
+    def __init__(self, window: int = 50, ewma_alpha: float = 0.2, compression: float = 100,
+                 lsl: float | None = None, usl: float | None = None):
+        self.total = Welford()
+        self.recent = RollingWindow(window)
+        self.moving_range = RollingWindow(max(window - 1, 1))
+        self.moving_range_total = Welford()
+        self.digest = TDigest(compression)
+        self.ewma_alpha = ewma_alpha
+        self.ewma = math.nan
+        self.last = math.nan
+        self.lsl = lsl
+        self.usl = usl
+
+    def update(self, x: float):
+        if not math.isnan(self.last):
+            mr = abs(x - self.last)
+            self.moving_range.update(mr)
+            self.moving_range_total.update(mr)
+        self.last = x
+        self.total.update(x)
+        self.recent.update(x)
+        self.digest.update(x)
+        self.ewma = x if math.isnan(self.ewma) else self.ewma_alpha * x + (1 - self.ewma_alpha) * self.ewma
+
+    def _capability(self, mean: float, sigma: float) -> tuple[float, float]:
+        """(Cp, Cpk). 규격 한쪽만 있으면 Cp는 nan, Cpk는 한쪽 지수."""
+        if not sigma or math.isnan(sigma):
+            return math.nan, math.nan
+        sides = []
+        if self.usl is not None:
+            sides.append((self.usl - mean) / (3 * sigma))
+        if self.lsl is not None:
+            sides.append((mean - self.lsl) / (3 * sigma))
+        cp = (self.usl - self.lsl) / (6 * sigma) if self.usl is not None and self.lsl is not None else math.nan
+        return cp, (min(sides) if sides else math.nan)
+
+    def summary(self, recent: bool = True) -> dict:
+        """recent=True 이면 최근 window 기준, False 이면 누적 기준의 평균/σ/관리한계/공정능력."""
+        if recent:
+            count, mean, std, mr = self.recent.count, self.recent.mean, self.recent.std, self.moving_range
+        else:
+            count, mean, std, mr = self.total.count, self.total.mean, self.total.std, self.moving_range_total
+        sigma_within = mr.mean / D2 if mr.count else math.nan
+        cp, cpk = self._capability(mean, sigma_within)
+        pp, ppk = self._capability(mean, std)
+        return {
+            "count": count,
+            "mean": mean if count else math.nan,
+            "std": std,
+            "ewma": self.ewma,
+            "min": self.total.min if self.total.count else math.nan,
+            "max": self.total.max if self.total.count else math.nan,
+            "p50": self.digest.quantile(0.5),
+            "p95": self.digest.quantile(0.95),
+            "sigma_within": sigma_within,
+            "ucl": mean + 3 * sigma_within,
+            "lcl": mean - 3 * sigma_within,
+            "cp": cp, "cpk": cpk, "pp": pp, "ppk": ppk,
+            "last_out_of_control": bool(count > 1 and not math.isnan(sigma_within)
+                                        and abs(self.last - mean) > 3 * sigma_within),
+        }
+
+
+class ShiftCounter:
+    """교대별 검사 수와 결함 유형별 건수. 최근 keep_shifts개 교대만 보관합니다."""
+    def __init__(self, shifts: dict | None = None, keep: int = 21):
+        shifts = shifts or {"A": "06:00-14:00", "B": "14:00-22:00", "C": "22:00-06:00"}
+        self.shifts = []
+        for name, span in shifts.items():
+            start, end = (datetime.strptime(t.strip(), "%H:%M").time() for t in span.split("-"))
+            self.shifts.append((name, start, end))
+        self.keep = keep
+        self.counts = OrderedDict()   # (교대 시작 날짜, 이름) -> {"inspections": n, 유형: 건수}
+
+    def shift_of(self, timestamp: datetime) -> tuple[str, str]:
+        """시각이 속한 교대 (교대가 시작된 날짜, 이름). 자정을 넘는 교대는 전날 날짜."""
+        t = timestamp.time()
+        for name, start, end in self.shifts:
+            if start <= end and start <= t < end:
+                return timestamp.date().isoformat(), name
+            if start > end and (t >= start or t < end):
+                day = timestamp.date() if t >= start else timestamp.date() - timedelta(days=1)
+                return day.isoformat(), name
+        return timestamp.date().isoformat(), "-"
+
+    def _bucket(self, timestamp: datetime) -> dict:
+        key = self.shift_of(timestamp)
+        bucket = self.counts.get(key)
+        if bucket is None:
+            bucket = self.counts[key] = {"inspections": 0}
+            while len(self.counts) > self.keep:
+                self.counts.popitem(last=False)
+        return bucket
+
+    def add_inspection(self, timestamp: datetime):
+        self._bucket(timestamp)["inspections"] += 1
+
+    def add_defect(self, defect_type: str, timestamp: datetime):
+        bucket = self._bucket(timestamp)
+        bucket[defect_type] = bucket.get(defect_type, 0) + 1
+
+    def rates(self, last: int = 3) -> list[tuple[str, int, dict]]:
+        """최근 교대부터 (라벨, 검사 수, {유형: 검사당 건수})."""
+        rows = []
+        for (day, name), bucket in reversed(list(self.counts.items())[-last:]):
+            n = bucket["inspections"]
+            rows.append((f"{day} {name}", n,
+                         {k: v / n if n else math.nan for k, v in bucket.items() if k != "inspections"}))
+        return rows
+
+
+class SPCEngine:
+    """검사 결과를 받아 카메라별/전체 x 결함 유형별 SPC 통계와 교대별 불량률을 유지합니다."""
+    def __init__(self, spc_config: dict | None = None):
+        spc_config = spc_config or {}
+        self.window = int(spc_config.get('window', 50))
+        self.ewma_alpha = float(spc_config.get('ewma_alpha', 0.2))
+        self.compression = float(spc_config.get('compression', 100))
+        self.spec_limits = {k.lower(): v for k, v in spc_config.get('spec_limits', {}).items()}
+        self.streams = {}   # (카메라, 결함 유형) -> MeasurementStats
+        self.shifts = ShiftCounter(spc_config.get('shifts'), int(spc_config.get('keep_shifts', 21)))
+
+    def _stream(self, camera: str, defect_type: str) -> MeasurementStats:
+        key = (camera, defect_type)
+        stats = self.streams.get(key)
+        if stats is None:
+            limits = self.spec_limits.get(defect_type, {})
+            stats = self.streams[key] = MeasurementStats(self.window, self.ewma_alpha, self.compression,
+                                                         limits.get('lsl'), limits.get('usl'))
+        return stats
+
+    def record_inspection(self, timestamp: datetime | None = None):
+        """검사 1회 (불량률의 분모)."""
+        self.shifts.add_inspection(timestamp or datetime.now())
+
+    def add_defects(self, defects, timestamp: datetime | None = None):
+        """물리적 결함당 한 번씩 호출합니다 (추적기를 쓰면 끝난 추적의 대표 결함)."""
+        timestamp = timestamp or datetime.now()
+        for d in defects:
+            self.shifts.add_defect(d.defect_type, timestamp)
+            field = METRICS.get(d.defect_type)
+            value = getattr(d, field) if field else None
+            if value is None:
+                continue
+            self._stream(d.camera, d.defect_type).update(float(value))
+            self._stream("ALL", d.defect_type).update(float(value))
+
+    def summary(self, defect_type: str, camera: str = "ALL", recent: bool = True) -> dict | None:
+        stats = self.streams.get((camera, defect_type))
+        return stats.summary(recent) if stats is not None else None
+
+    def trend(self, defect_type: str, camera: str = "ALL") -> np.ndarray:
+        """최근 window 측정값 (시간 순)."""
+        stats = self.streams.get((camera, defect_type))
+        return stats.recent.values() if stats is not None else np.zeros(0)
+
+    def shift_rates(self, last: int = 3) -> list[tuple[str, int, dict]]:
+        return self.shifts.rates(last)
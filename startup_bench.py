@@ -0,0 +1,100 @@
+"""
+애플리케이션 시작 시간 벤치마크.
+
+1) `python -X importtime` 으로 main_window import 비용이 큰 모듈을 집계하고,
+2) `main.py --startup-benchmark` 를 실행해 창 표시 / 첫 프레임 / 모델 로딩 완료까지의 시간을 측정합니다.
+
+사용 예:
+    python startup_bench.py --runs 3
+    python startup_bench.py --output data/results/startup_bench.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+EVENTS = ("window_shown", "first_frame", "model_ready")
+
+
+def _bench_env() -> dict:
+    env = os.environ.copy()
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")  # 화면 없이 실행
+    return env
+
+
+def measure_import_time(module: str = "main_window", top: int = 15) -> dict:
+    """-X importtime 출력에서 누적 import 시간이 큰 최상위 모듈을 반환합니다 (단위 ms)."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=BASE_DIR, env=_bench_env(), capture_output=True, text=True)
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        name = name[1:]  # 구분자 뒤 공백 1칸 제거, 나머지 들여쓰기는 import 깊이
+        if name and not name.startswith(" "):
+            modules[name.strip()] = int(cumulative_us) / 1000
+    ordered = sorted(modules.items(), key=lambda item: item[1], reverse=True)
+    return {
+        "total_ms": sum(modules.values()),
+        "top": ordered[:top],
+        "error": proc.stderr.strip().splitlines()[-1] if proc.returncode != 0 and proc.stderr.strip() else None,
+    }
+
+
+def measure_startup(timeout: float = 180.0) -> dict:
+    """main.py를 벤치마크 모드로 실행하여 프로세스 시작 기준 각 이벤트까지의 시간(ms)을 측정합니다."""
+    start = time.time()
+    proc = subprocess.run([sys.executable, "main.py", "--startup-benchmark"],
+                          cwd=BASE_DIR, env=_bench_env(), capture_output=True, text=True, timeout=timeout)
+    result = {"returncode": proc.returncode}
+    for line in proc.stdout.splitlines():
+        parts = line.split()
+        if len(parts) == 3 and parts[0] == "STARTUP" and parts[1] in EVENTS:
+            result[parts[1]] = (float(parts[2]) - start) * 1000
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="시작 시간 벤치마크")
+    parser.add_argument("--runs", type=int, default=3, help="main.py 실행 반복 횟수")
+    parser.add_argument("--output", help="결과를 저장할 JSON 파일 (실행 간 추이 비교용)")
+    args = parser.parse_args()
+
+    imports = measure_import_time()
+    print(f"main_window import: {imports['total_ms']:.0f} ms (top-level modules)")
+    if imports["error"]:
+        print(f"  import failed: {imports['error']}")
+    for name, ms in imports["top"]:
+        print(f"  {ms:8.1f} ms  {name}")
+
+    runs = []
+    for i in range(args.runs):
+        run = measure_startup()
+        runs.append(run)
+        cols = "  ".join(f"{event}={run[event]:.0f}ms" if event in run else f"{event}=-" for event in EVENTS)
+        print(f"run {i + 1}: {cols}")
+
+    summary = {}
+    for event in EVENTS:
+        values = sorted(run[event] for run in runs if event in run)
+        if values:
+            summary[event] = {"min_ms": values[0], "median_ms": values[len(values) // 2], "max_ms": values[-1]}
+            print(f"{event:<13} median {summary[event]['median_ms']:.0f} ms")
+
+    if args.output:
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        record = {"timestamp": time.strftime("%Y-%m-%d %H:%M:%S"), "imports": imports,
+                  "runs": runs, "summary": summary}
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=4, ensure_ascii=False)
+        print(f"saved: {output}")
+
+
+if __name__ == "__main__":
+    main()
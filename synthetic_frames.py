@@ -0,0 +1,320 @@
+"""
+합성 결함 프레임 생성기 (부하/정확도 회귀 테스트용).
+
+NEU-DET 어노테이션(XML) 박스로 잘라낸 결함 패치를 합성 강판 텍스처(압연 방향 줄무늬 + 입자 잡음 +
+조명 불균일) 위에 알려진 위치/배율로 붙여 고해상도 프레임을 만듭니다. 패치는 박스 바깥 여백만
+경계 페더링하고 배경 밝기를 맞추므로 박스 안 결함은 원본 그대로이며, 정답 박스와 mm 치수
+(measurement.py와 같은 방식의 길이/지름)가 정확히 알려집니다.
+프레임 i는 (seed, i)로 결정되므로 같은 설정이면 언제든 같은 프레임을 다시 만들 수 있습니다.
+
+사용 예:
+    python synthetic_frames.py --count 2000 --workers 8 --out data/synthetic     (이미지 + YOLO 라벨 + gt.jsonl)
+    python synthetic_frames.py --count 500 --detect                               (검출기로 바로 흘려 재현율/치수 오차)
+    python synthetic_frames.py --count 2000 --workers 8                           (생성 속도만 측정)
+"""
+import argparse
+import json
+import multiprocessing as mp
+import os
+import time
+import xml.etree.ElementTree as ET
+from functools import partial
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+import measurement
+from convert import CLASSES, convert_box
+
+PATCH_MARGIN = 8   # 패치 주변 원본 배경 여백 (이 영역만 페더링)
+
+
+def load_patches(root: str = './NEU-DET', splits=('train', 'validation'), classes=None,
+                 min_size: int = 8) -> list[tuple[str, np.ndarray, tuple]]:
+    """
+    NEU-DET XML 박스마다 (클래스, 여백 포함 흑백 패치, 패치 안 박스 (x0, y0, x1, y1)) 를 만듭니다.
+    이미지는 images/<클래스>/<id>.jpg, 어노테이션은 annotations/<id>.xml (convert.py와 같은 구조).
+    """
+    classes = classes or CLASSES
+    patches = []
+    for split in splits:
+        xml_root = Path(root) / split / 'annotations'
+        for xml_path in sorted(xml_root.glob('*.xml')):
+            tree = ET.parse(xml_path).getroot()
+            objects = [(obj.find('name').text, obj.find('bndbox')) for obj in tree.iter('object')]
+            objects = [(name, box) for name, box in objects if name in classes]
+            if not objects:
+                continue
+            image = None
+            for ext in ('.jpg', '.bmp', '.png'):
+                path = Path(root) / split / 'images' / objects[0][0] / (xml_path.stem + ext)
+                if path.exists():
+                    image = cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
+                    break
+            if image is None:
+                continue
+            h, w = image.shape
+            for name, box in objects:
+                x0, y0, x1, y1 = (int(float(box.find(k).text)) for k in ('xmin', 'ymin', 'xmax', 'ymax'))
+                if x1 - x0 < min_size or y1 - y0 < min_size:
+                    continue
+                cx0, cy0 = max(0, x0 - PATCH_MARGIN), max(0, y0 - PATCH_MARGIN)
+                cx1, cy1 = min(w, x1 + PATCH_MARGIN), min(h, y1 + PATCH_MARGIN)
+                patches.append((name, image[cy0:cy1, cx0:cx1].copy(), (x0 - cx0, y0 - cy0, x1 - cx0, y1 - cy0)))
+    return patches
+
+
+def steel_texture(height: int, width: int, rng) -> np.ndarray:
+    """합성 강판 표면 (uint8 흑백). 저해상도 잡음을 늘려 압연 방향(가로) 줄무늬를 만듭니다."""
+    level = rng.uniform(90, 160)
+    streaks = cv2.resize(rng.normal(0, 1, (height, max(1, width // 16))).astype(np.float32), (width, height),
+                         interpolation=cv2.INTER_LINEAR)
+    grain = rng.normal(0, 1, (height, width)).astype(np.float32)
+    yy = np.linspace(-1, 1, height, dtype=np.float32)[:, None]
+    xx = np.linspace(-1, 1, width, dtype=np.float32)[None, :]
+    light = rng.uniform(-8, 8) * xx + rng.uniform(-8, 8) * yy - rng.uniform(0, 12) * (xx ** 2 + yy ** 2)
+    surface = level + rng.uniform(3, 8) * streaks + rng.uniform(2, 5) * grain + light
+    return np.clip(surface, 0, 255).astype(np.uint8)
+
+
+class SyntheticFrameGenerator:
+    def __init__(self, patches, width: int = 1280, height: int = 720, pixels_per_mm: float = 10.0,
+                 min_defects: int = 0, max_defects: int = 3, scale_range=(0.5, 2.0), seed: int = 0,
+                 channels: int = 3, texture_bank: int = 4):
+        self.patches = patches
+        self.width = width
+        self.height = height
+        self.pixels_per_mm = pixels_per_mm
+        self.min_defects = min_defects
+        self.max_defects = max_defects
+        self.scale_range = scale_range
+        self.seed = seed
+        self.channels = channels
+        # 텍스처는 몇 장만 만들어 두고 프레임마다 반전/밝기 변화로 재사용 (프레임당 생성 비용 제거)
+        rng = np.random.default_rng([seed, 2 ** 32 - 1])  # 프레임 index와 겹치지 않는 텍스처 전용 키
+        self.textures = [steel_texture(height, width, rng) for _ in range(texture_bank)]
+
+    def frame(self, index: int) -> tuple[np.ndarray, list[dict]]:
+        """index번 프레임과 정답 목록을 만듭니다."""
+        rng = np.random.default_rng([self.seed, index])
+        texture = self.textures[rng.integers(len(self.textures))]
+        flip = (None, 0, 1, -1)[rng.integers(4)]
+        canvas = texture.copy() if flip is None else cv2.flip(texture, flip)
+        cv2.convertScaleAbs(canvas, dst=canvas, alpha=rng.uniform(0.9, 1.1), beta=rng.uniform(-10, 10))
+
+        truth, placed = [], []
+        for _ in range(rng.integers(self.min_defects, self.max_defects + 1)):
+            label, patch, (bx0, by0, bx1, by1) = self.patches[rng.integers(len(self.patches))]
+            scale = float(np.exp(rng.uniform(np.log(self.scale_range[0]), np.log(self.scale_range[1]))))
+            ph, pw = max(2, round(patch.shape[0] * scale)), max(2, round(patch.shape[1] * scale))
+            if ph >= self.height or pw >= self.width:
+                continue
+            sx, sy = pw / patch.shape[1], ph / patch.shape[0]   # 반올림 후 실제 배율
+            for _attempt in range(10):  # 다른 결함과 겹치지 않는 위치
+                x, y = int(rng.integers(0, self.width - pw)), int(rng.integers(0, self.height - ph))
+                if all(x + pw <= ox0 or ox1 <= x or y + ph <= oy0 or oy1 <= y for ox0, oy0, ox1, oy1 in placed):
+                    break
+            else:
+                continue
+            placed.append((x, y, x + pw, y + ph))
+            resized = cv2.resize(patch, (pw, ph), interpolation=cv2.INTER_LINEAR if scale > 1 else cv2.INTER_AREA)
+            box = (bx0 * sx, by0 * sy, bx1 * sx, by1 * sy)
+            self._paste(canvas, resized, x, y, box)
+            truth.append(self._ground_truth(label, x + box[0], y + box[1], x + box[2], y + box[3], scale))
+
+        if self.channels == 3:
+            canvas = cv2.cvtColor(canvas, cv2.COLOR_GRAY2BGR)
+        return canvas, truth
+
+    @staticmethod
+    def _paste(canvas: np.ndarray, patch: np.ndarray, x: int, y: int, box: tuple):
+        """배경 밝기를 맞춘 뒤, 박스 바깥 여백에서만 0으로 줄어드는 가중치로 섞습니다."""
+        ph, pw = patch.shape
+        region = canvas[y:y + ph, x:x + pw]
+        patch = patch.astype(np.float32)
+        border = np.ones((ph, pw), dtype=bool)
+        border[int(box[1]):int(np.ceil(box[3])), int(box[0]):int(np.ceil(box[2]))] = False
+        offset = float(region.mean()) - (float(patch[border].mean()) if border.any() else float(patch.mean()))
+
+        def _ramp(n, lo, hi):
+            i = np.arange(n, dtype=np.float32) + 0.5
+            return np.clip(np.minimum(i / max(lo, 1e-3), (n - i) / max(n - hi, 1e-3)), 0, 1)
+
+        alpha = np.minimum(_ramp(ph, box[1], box[3])[:, None], _ramp(pw, box[0], box[2])[None, :])
+        blended = alpha * (patch + offset) + (1 - alpha) * region
+        region[:] = np.clip(blended, 0, 255).astype(np.uint8)
+
+    def _ground_truth(self, label: str, x0: float, y0: float, x1: float, y1: float, scale: float) -> dict:
+        w, h = x1 - x0, y1 - y0
+        bbox = (x0, y0, w, h)
+        diameter_mm, area_mm2 = measurement.measure_hole(bbox, self.pixels_per_mm)
+        return {
+            "label": label,
+            "xyxy": [round(x0, 2), round(y0, 2), round(x1, 2), round(y1, 2)],
+            "width_mm": w / self.pixels_per_mm,
+            "height_mm": h / self.pixels_per_mm,
+            "length_mm": measurement.measure_scratch(bbox, self.pixels_per_mm),
+            "diameter_mm": diameter_mm,
+            "area_mm2": area_mm2,
+            "scale": round(scale, 4),
+        }
+
+
+_generator = None
+
+
+def _init_worker(patches, settings: dict):
+    global _generator
+    cv2.setNumThreads(1)  # 프로세스 단위로 병렬화하므로 OpenCV 내부 스레드는 끔
+    _generator = SyntheticFrameGenerator(patches, **settings)
+
+
+def _make_frame(index: int):
+    image, truth = _generator.frame(index)
+    return index, image, truth
+
+
+def _write_frame(index: int, out_dir: str, ext: str):
+    """디스크 모드: 작업 프로세스가 직접 이미지/YOLO 라벨을 쓰고 정답만 돌려줍니다 (프레임 전송 없음)."""
+    image, truth = _generator.frame(index)
+    name = f"synth_{index:06d}"
+    cv2.imwrite(os.path.join(out_dir, 'images', name + ext), image)
+    h, w = image.shape[:2]
+    lines = []
+    for t in truth:
+        x0, y0, x1, y1 = t["xyxy"]
+        cx, cy, bw, bh = convert_box((w, h), (x0, x1, y0, y1))
+        lines.append(f"{CLASSES.index(t['label'])} {cx:.6f} {cy:.6f} {bw:.6f} {bh:.6f}")
+    with open(os.path.join(out_dir, 'labels', name + '.txt'), 'w') as f:
+        f.write('\n'.join(lines))
+    return index, None, truth
+
+
+def generate(count: int, settings: dict, patches=None, workers: int | None = None, out_dir: str | None = None,
+             start: int = 0, ext: str = '.jpg'):
+    """
+    (index, 이미지 또는 None, 정답) 을 index 순서대로 내보내는 이터레이터를 돌려줍니다.
+    workers 개의 프로세스가 병렬로 만들며, out_dir를 주면 작업 프로세스가 디스크에 직접 씁니다.
+    패치 확인과 출력 폴더 생성은 호출 즉시 수행합니다 (첫 프레임을 꺼낼 때까지 미루지 않음).
+    """
+    patches = patches if patches is not None else load_patches()
+    if not patches:
+        raise FileNotFoundError("NEU-DET 패치를 찾을 수 없습니다 (NEU-DET/*/annotations 확인)")
+    if out_dir:
+        os.makedirs(os.path.join(out_dir, 'images'), exist_ok=True)
+        os.makedirs(os.path.join(out_dir, 'labels'), exist_ok=True)
+        fn = partial(_write_frame, out_dir=out_dir, ext=ext)
+    else:
+        fn = _make_frame
+    workers = workers or max(1, (os.cpu_count() or 2) - 1)
+    return _iter_frames(fn, range(start, start + count), patches, settings, workers)
+
+
+def _iter_frames(fn, indices, patches, settings: dict, workers: int):
+    if workers == 1:
+        _init_worker(patches, settings)
+        yield from map(fn, indices)
+        return
+    with mp.get_context("spawn").Pool(workers, _init_worker, (patches, settings)) as pool:
+        yield from pool.imap(fn, indices, chunksize=4)
+
+
+def _iou(a, b) -> float:
+    inter_w = min(a[2], b[2]) - max(a[0], b[0])
+    inter_h = min(a[3], b[3]) - max(a[1], b[1])
+    if inter_w <= 0 or inter_h <= 0:
+        return 0.0
+    inter = inter_w * inter_h
+    return inter / ((a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter)
+
+
+def evaluate_stream(frames, detector, camera: str = "FRONT", iou_threshold: float = 0.5) -> dict:
+    """생성 프레임을 바로 검출기에 넣어 재현율/정밀도와 일치한 결함의 mm 치수 오차를 계산합니다."""
+    gt_total = det_total = matched = 0
+    length_errors = []
+    detect_seconds = 0.0
+    for _index, image, truth in frames:
+        t0 = time.perf_counter()
+        defects = detector.detect(image, camera)
+        detect_seconds += time.perf_counter() - t0
+        gt_total += len(truth)
+        det_total += len(defects)
+        used = set()
+        for t in truth:
+            best, best_iou = None, iou_threshold
+            for k, d in enumerate(defects):
+                x, y, w, h = d.bbox
+                iou = _iou(t["xyxy"], (x, y, x + w, y + h))
+                if k not in used and iou >= best_iou and (d.label or d.defect_type) == t["label"]:
+                    best, best_iou = k, iou
+            if best is not None:
+                used.add(best)
+                matched += 1
+                if defects[best].length_mm is not None:
+                    length_errors.append(abs(defects[best].length_mm - t["length_mm"]))
+    return {
+        "recall": matched / gt_total if gt_total else float("nan"),
+        "precision": matched / det_total if det_total else float("nan"),
+        "length_mae_mm": float(np.mean(length_errors)) if length_errors else float("nan"),
+        "detect_seconds": detect_seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NEU-DET 패치 기반 합성 결함 프레임 생성기")
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=None, help="생성 프로세스 수 (기본: CPU 수 - 1)")
+    parser.add_argument("--width", type=int, help="프레임 너비 (기본: config.json front.capture)")
+    parser.add_argument("--height", type=int)
+    parser.add_argument("--max-defects", type=int, default=3)
+    parser.add_argument("--scale", type=float, nargs=2, default=(0.5, 2.0), metavar=("MIN", "MAX"))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--gray", action="store_true", help="흑백(2차원) 프레임 출력")
+    parser.add_argument("--out", help="저장 폴더 (images/, labels/, gt.jsonl)")
+    parser.add_argument("--detect", action="store_true", help="검출기로 바로 흘려 정확도 측정")
+    parser.add_argument("--neu-root", default="./NEU-DET")
+    args = parser.parse_args()
+    if args.detect and args.out:
+        parser.error("--detect 와 --out 은 함께 쓸 수 없습니다")
+
+    import config
+    app_config = config.load_config()
+    capture = app_config.get("front", {}).get("capture", {})
+    settings = {
+        "width": args.width or int(capture.get("width") or 1280),
+        "height": args.height or int(capture.get("height") or 720),
+        "pixels_per_mm": float(app_config.get("front", {}).get("pixels_per_mm", 10.0)),
+        "max_defects": args.max_defects,
+        "scale_range": tuple(args.scale),
+        "seed": args.seed,
+        "channels": 1 if args.gray else 3,
+    }
+    patches = load_patches(args.neu_root)
+    print(f"{len(patches)} patches, {settings['width']}x{settings['height']}, {args.count} frames")
+
+    start = time.perf_counter()
+    frames = generate(args.count, settings, patches, args.workers, args.out)
+    if args.detect:
+        from detector import DefectDetector
+        result = evaluate_stream(frames, DefectDetector(app_config))
+        elapsed = time.perf_counter() - start
+        print(f"recall {result['recall']:.3f}, precision {result['precision']:.3f}, "
+              f"length MAE {result['length_mae_mm']:.3f} mm")
+        print(f"{args.count / elapsed:.1f} frames/s end-to-end (detector {result['detect_seconds']:.1f} s)")
+        return
+
+    gt_file = open(os.path.join(args.out, "gt.jsonl"), 'w', encoding='utf-8') if args.out else None
+    defects = 0
+    for index, _image, truth in frames:
+        defects += len(truth)
+        if gt_file:
+            gt_file.write(json.dumps({"index": index, "file": f"synth_{index:06d}", "defects": truth}) + "\n")
+    if gt_file:
+        gt_file.close()
+    elapsed = time.perf_counter() - start
+    print(f"{args.count} frames ({defects} defects) in {elapsed:.1f} s = {args.count / elapsed * 60:.0f} frames/min")
+
+
+if __name__ == "__main__":
+    main()
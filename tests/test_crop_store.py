@@ -0,0 +1,42 @@
+"""crop_store.py: 오검출 표시 크롭의 YOLO 내보내기."""
+import numpy as np
+
+from crop_store import BACKGROUND, CropStore
+from defect import Defect
+
+
+def _defect(bbox, label, score=0.9):
+    return Defect("FRONT", "crack", "NG", bbox, None, None, None, None, score, label=label)
+
+
+def test_background_drops_only_source_box(tmp_path):
+    store = CropStore(tmp_path / "crops", {"context": 1.0, "queue_below": 0.0})
+    image = np.random.default_rng(0).integers(0, 255, (200, 300, 3), dtype=np.uint8)
+    false_positive = _defect((100, 80, 20, 20), "inclusion")
+    real = _defect((125, 85, 10, 10), "scratches")
+    records = store.add("FRONT", image, [false_positive, real])
+    source = next(r for r in records if r["label"] == "inclusion")
+    assert len(source["boxes"]) == 2
+
+    store.enqueue([source["id"]], "operator", BACKGROUND)
+    assert store.export(str(tmp_path / "out")) == 1
+    labels = list((tmp_path / "out" / "labels" / "train").glob("*.txt"))
+    lines = labels[0].read_text().splitlines()
+    assert len(lines) == 1 and lines[0].startswith("5 ")   # scratches 박스만 남음
+
+
+def test_background_alone_exports_empty_label(tmp_path):
+    store = CropStore(tmp_path / "crops", {"queue_below": 0.0})
+    image = np.zeros((100, 100, 3), dtype=np.uint8)
+    record = store.add("FRONT", image, [_defect((40, 40, 10, 10), "inclusion")])[0]
+    store.enqueue([record["id"]], "operator", BACKGROUND)
+    assert store.export(str(tmp_path / "out")) == 1
+    assert next((tmp_path / "out" / "labels" / "train").glob("*.txt")).read_text() == ""
+
+
+def test_background_with_unknown_neighbour_is_skipped(tmp_path):
+    store = CropStore(tmp_path / "crops", {"context": 1.0, "queue_below": 0.0})
+    image = np.random.default_rng(1).integers(0, 255, (100, 100, 3), dtype=np.uint8)
+    record = store.add("FRONT", image, [_defect((40, 40, 10, 10), "inclusion"), _defect((52, 40, 5, 5), "nut")])[0]
+    store.enqueue([record["id"]], "operator", BACKGROUND)
+    assert store.export(str(tmp_path / "out")) == 0
@@ -0,0 +1,68 @@
+from defect import Defect
+from defect_tracker import DefectTracker
+
+
+def _defect(x, y, score=0.8, defect_type="crack", w=20, h=10):
+    return Defect("FRONT", defect_type, "NG", (x, y, w, h), 5.0, None, None, None, score)
+
+
+def _tracker(**overrides):
+    config = {"enabled": True, "conveyor_speed_mm_s": 0.0, "direction": [0, 1], "iou_threshold": 0.3,
+              "max_center_dist_mm": 5.0, "max_age": 2, "max_gap_seconds": 2.0}
+    config.update(overrides)
+    return DefectTracker(config, {"front": {"pixels_per_mm": 10.0}})
+
+
+def test_same_defect_keeps_track_id_and_reports_best_once():
+    tracker = _tracker()
+    out1, fin1 = tracker.update("FRONT", [_defect(100, 100, 0.6), _defect(400, 100, 0.7)], timestamp=0.0)
+    out2, fin2 = tracker.update("FRONT", [_defect(102, 101, 0.9), _defect(401, 99, 0.5)], timestamp=0.1)
+    assert [d.track_id for d in out1] == [d.track_id for d in out2]
+    assert len({d.track_id for d in out1}) == 2
+    assert fin1 == [] and fin2 == []
+
+    finished = []
+    for i in range(3):  # max_age=2: 세 번 놓치면 종료
+        finished += tracker.update("FRONT", [], timestamp=0.2 + i * 0.1)[1]
+    assert sorted(d.score for d in finished) == [0.7, 0.9]
+
+
+def test_different_type_is_not_associated():
+    tracker = _tracker()
+    out1, _ = tracker.update("FRONT", [_defect(100, 100, defect_type="crack")], timestamp=0.0)
+    out2, _ = tracker.update("FRONT", [_defect(100, 100, defect_type="hole")], timestamp=0.1)
+    assert out1[0].track_id != out2[0].track_id
+
+
+def test_conveyor_shift_is_predicted():
+    # 50 mm/s * 0.5 s * 10 px/mm = 250 px 이동: 예측 없이는 IoU 0, 중심 거리 50 px 초과
+    moving = _tracker(conveyor_speed_mm_s=50.0)
+    out1, _ = moving.update("FRONT", [_defect(100, 100)], timestamp=0.0)
+    out2, _ = moving.update("FRONT", [_defect(100, 350)], timestamp=0.5)
+    assert out1[0].track_id == out2[0].track_id
+
+    still = _tracker()
+    out1, _ = still.update("FRONT", [_defect(100, 100)], timestamp=0.0)
+    out2, _ = still.update("FRONT", [_defect(100, 350)], timestamp=0.5)
+    assert out1[0].track_id != out2[0].track_id
+
+
+def test_gap_resets_tracks():
+    tracker = _tracker()
+    out1, _ = tracker.update("FRONT", [_defect(100, 100, 0.6)], timestamp=0.0)
+    out2, finished = tracker.update("FRONT", [_defect(100, 100, 0.7)], timestamp=5.0)
+    assert [d.track_id for d in finished] == [out1[0].track_id]
+    assert out2[0].track_id != out1[0].track_id
+
+
+def test_flush_returns_open_tracks_per_camera():
+    tracker = _tracker()
+    tracker.update("FRONT", [_defect(100, 100, 0.6)], timestamp=0.0)
+    tracker.update("FRONT", [_defect(101, 100, 0.8)], timestamp=0.1)
+    tracker.update("BACK", [_defect(50, 50, 0.5)], timestamp=0.1)
+
+    front = tracker.flush("FRONT")
+    assert [d.score for d in front] == [0.8]
+    assert tracker.flush("FRONT") == []
+    assert [d.score for d in tracker.flush()] == [0.5]
+    assert tracker.flush() == []
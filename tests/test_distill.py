@@ -0,0 +1,47 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from distill import DistillationLoss
+
+
+class _Head(torch.nn.Module):
+    reg_max = 16
+
+    def forward(self, x):
+        return x
+
+
+def _loss(base_loss=None):
+    return DistillationLoss(base_loss, teacher=None, student_head=_Head(), teacher_head=_Head(),
+                            feature_weight=0.0)
+
+
+def test_logit_loss_dict_and_level_outputs_agree():
+    kd = _loss()
+    torch.manual_seed(0)
+    levels_s = [torch.randn(2, 64 + 6, s, s) for s in (8, 4, 2)]
+    levels_t = [torch.randn(2, 64 + 6, s, s) for s in (8, 4, 2)]
+
+    def as_dict(levels):
+        flat = torch.cat([x.flatten(2) for x in levels], dim=2)
+        return {"boxes": flat[:, :64], "scores": flat[:, 64:], "feats": levels}
+
+    from_levels = kd._logit_loss(levels_s, levels_t)
+    from_dict = kd._logit_loss(as_dict(levels_s), as_dict(levels_t))
+    from_e2e = kd._logit_loss({"one2many": as_dict(levels_s)}, {"one2many": as_dict(levels_t)})
+    assert float(from_levels) > 0
+    assert float(from_dict) == pytest.approx(float(from_levels))
+    assert float(from_e2e) == pytest.approx(float(from_levels))
+    assert float(kd._logit_loss(as_dict(levels_s), as_dict(levels_s))) < float(from_dict)
+
+
+def test_kd_added_once_to_summed_loss():
+    base = torch.tensor([1.0, 2.0, 3.0]) * 2
+
+    kd = _loss(lambda preds, batch: (base, base.detach()))
+    preds = {"boxes": torch.zeros(2, 64, 5), "scores": torch.zeros(2, 6, 5), "feats": []}
+    teacher_preds = {"boxes": torch.zeros(2, 64, 5), "scores": torch.ones(2, 6, 5), "feats": []}
+    kd.teacher = lambda img: teacher_preds
+    loss, _ = kd(preds, {"img": torch.zeros(2, 3, 32, 32)})
+    assert float(loss.sum()) == pytest.approx(float(base.sum()) + kd.last_kd * 2)
@@ -0,0 +1,66 @@
+"""inference_worker.py: 시작/재시작 중에는 바로 실패하고, 시간 초과 시 슬롯을 돌려주고 재시작."""
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip("torch")
+ultralytics = pytest.importorskip("ultralytics")
+
+from inference_worker import RemoteDetector
+
+
+@pytest.fixture(scope="module")
+def model_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp("model") / "yolov8n_untrained.pt"
+    ultralytics.YOLO("yolov8n.yaml").save(str(path))
+    return str(path)
+
+
+def _config(model_path, **overrides):
+    config = {"model_path": model_path, "confidence_threshold": 1e-6, "imgsz": 320,
+              "front": {"pixels_per_mm": 10.0, "capture": {"width": 320, "height": 240}}}
+    config.update(overrides)
+    return config
+
+
+def _wait_until_ready(detector, timeout=120.0):
+    deadline = time.monotonic() + timeout
+    while not (detector.is_ready and not detector._restarting):
+        assert time.monotonic() < deadline, "worker did not start"
+        time.sleep(0.2)
+
+
+def test_submit_fails_fast_while_starting(model_path):
+    detector = RemoteDetector(_config(model_path), load_model=False, slots=2)
+    image = np.random.default_rng(0).integers(0, 256, (240, 320, 3), dtype=np.uint8)
+    try:
+        start = time.monotonic()
+        with pytest.raises(RuntimeError):
+            detector.detect(image, "FRONT")  # 워커 없음: 백그라운드 시작 후 즉시 실패
+        with pytest.raises(RuntimeError):
+            detector.detect(image, "FRONT")  # 시작 중: 기다리지 않음
+        assert time.monotonic() - start < 5.0
+
+        _wait_until_ready(detector)
+        assert isinstance(detector.detect(image, "FRONT"), list)
+    finally:
+        detector.close()
+
+
+def test_timeout_frees_slot_and_restarts(model_path):
+    detector = RemoteDetector(_config(model_path, inference_timeout=1e-4), slots=2)
+    image = np.random.default_rng(1).integers(0, 256, (240, 320, 3), dtype=np.uint8)
+    try:
+        assert detector.is_ready
+        old_pid = detector._process.pid
+        with pytest.raises(RuntimeError, match="timed out"):
+            detector.detect(image, "FRONT")
+        assert detector._restarting or detector._process.pid != old_pid
+        assert not detector._pending
+
+        _wait_until_ready(detector)
+        assert detector._process.pid != old_pid
+        assert detector._free_slots.qsize() == 2
+    finally:
+        detector.close()
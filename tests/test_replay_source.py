@@ -0,0 +1,52 @@
+import time
+
+import cv2
+import numpy as np
+
+from replay_source import ReplaySource
+
+
+def _write_frames(directory, stamps, camera="front"):
+    for i, stamp in enumerate(stamps):
+        image = np.full((16, 16, 3), i * 10, dtype=np.uint8)
+        cv2.imwrite(str(directory / f"capture_{camera}_{stamp}_{i:03d}.png"), image)
+
+
+def test_fixed_fps_pacing(tmp_path):
+    _write_frames(tmp_path, [f"20240101_0000{i:02d}" for i in range(6)])
+    source = ReplaySource(tmp_path, "FRONT", speed=20, loop=False)
+    try:
+        start = time.perf_counter()
+        frames = [source.read()[1] for _ in range(6)]
+        elapsed = time.perf_counter() - start
+        assert all(f is not None for f in frames)
+        assert 0.2 <= elapsed < 1.5  # 6프레임 @ 20fps: 첫 프레임 즉시, 이후 50 ms 간격
+        assert source.read() == (False, None)
+    finally:
+        source.release()
+
+
+def test_realtime_gap_is_capped(tmp_path):
+    # 두 녹화 사이 1시간 공백: 그대로 재현하지 않고 최대 1초만 기다림
+    _write_frames(tmp_path, ["20240101_000000", "20240101_010000", "20240101_010001"])
+    source = ReplaySource(tmp_path, "FRONT", speed="realtime", loop=False)
+    try:
+        start = time.perf_counter()
+        for _ in range(3):
+            ok, _frame = source.read()
+            assert ok
+        assert time.perf_counter() - start < 3.0
+    finally:
+        source.release()
+
+
+def test_undecodable_session_stops_instead_of_spinning(tmp_path):
+    for i in range(3):
+        (tmp_path / f"capture_front_{i}.png").write_bytes(b"not a png")
+    source = ReplaySource(tmp_path, "FRONT", speed="max", loop=True)
+    try:
+        assert source.read() == (False, None)
+        source._thread.join(timeout=2.0)
+        assert not source._thread.is_alive()
+    finally:
+        source.release()
@@ -0,0 +1,44 @@
+import copy
+
+import numpy as np
+
+from result_cache import ResultCache, detector_cache_key, frame_hash
+
+BASE = {"model_path": "missing.pt", "confidence_threshold": 0.5, "iou_threshold": 0.7,
+        "enabled_classes": None, "cascade": {"enabled": False, "threshold": 0.5}}
+
+
+def _with(**changes):
+    config = copy.deepcopy(BASE)
+    for key, value in changes.items():
+        config[key] = value
+    return config
+
+
+def test_key_tracks_result_settings():
+    key = detector_cache_key(BASE)
+    assert detector_cache_key(copy.deepcopy(BASE)) == key
+    assert detector_cache_key(_with(confidence_threshold=0.4)) != key
+    assert detector_cache_key(_with(enabled_classes=["crazing"])) != key
+    assert detector_cache_key(_with(enabled_classes=["crazing"])) != \
+        detector_cache_key(_with(enabled_classes=["crazing", "patches"]))
+
+
+def test_key_tracks_cascade_settings():
+    off = detector_cache_key(BASE)
+    # 꺼진 캐스케이드의 세부 설정은 결과와 무관
+    assert detector_cache_key(_with(cascade={"enabled": False, "threshold": 0.9})) == off
+    on = detector_cache_key(_with(cascade={"enabled": True, "threshold": 0.5}))
+    assert on != off
+    assert detector_cache_key(_with(cascade={"enabled": True, "threshold": 0.3})) != on
+    assert detector_cache_key(_with(cascade={"enabled": True, "threshold": 0.5, "mode": "tiles"})) != on
+
+
+def test_cache_misses_after_key_change():
+    cache = ResultCache()
+    image = np.random.default_rng(0).integers(0, 256, (64, 64), dtype=np.uint8)
+    h = frame_hash(image)
+    old_key = detector_cache_key(BASE)
+    cache.store("FRONT", old_key, h, [])
+    assert cache.lookup("FRONT", old_key, h) == []
+    assert cache.lookup("FRONT", detector_cache_key(_with(enabled_classes=["crazing"])), h) is None
@@ -0,0 +1,110 @@
+import json
+
+import numpy as np
+import pytest
+
+import sheet_map
+from defect import Defect
+from sheet_map import CoilMap, DefectIndex, SheetDefect, SheetPosition, StripMosaic
+
+MAP_CONFIG = {"mosaic_px_per_mm": 1.0, "strip_width_mm": 100, "along_axis": "y", "index_cell_mm": 50}
+CAMERAS = {"front": {"pixels_per_mm": 2.0}, "back": {"pixels_per_mm": 2.0, "across_offset_mm": 10.0}}
+
+
+def _defect(camera, x, y, w=10, h=20, score=0.9, track_id=None, defect_type="crack"):
+    return Defect(camera, defect_type, "NG", (x, y, w, h), None, None, None, None, score, track_id)
+
+
+def _sheet_defect(along, across=0.0, length=5.0, width=5.0, camera="FRONT"):
+    return SheetDefect(camera, "crack", "NG", along, across, length, width, 0.9, 0)
+
+
+def test_defect_index_query():
+    index = DefectIndex(cell_mm=100.0)
+    index.add(_sheet_defect(10))
+    index.add(_sheet_defect(95, length=30))      # 셀 0, 1에 걸침
+    index.add(_sheet_defect(250, across=50))
+    index.add(_sheet_defect(260, camera="BACK"))
+
+    assert [d.along_mm for d in index.query(0, 100)] == [10, 95]
+    assert [d.along_mm for d in index.query(110, 200)] == [95]  # 걸친 결함은 한 번만
+    assert [d.along_mm for d in index.query(200, 300)] == [250, 260]
+    assert [d.along_mm for d in index.query(200, 300, across0=40)] == [250]
+    assert [d.along_mm for d in index.query(200, 300, camera="BACK")] == [260]
+    assert index.query(500, 600) == []
+
+
+def test_coil_map_round_trip(tmp_path):
+    coil = CoilMap(str(tmp_path), "coil_a", MAP_CONFIG, CAMERAS)
+    frame = np.full((40, 60), 200, dtype=np.uint8)  # 20 x 30 mm @ 2 px/mm
+    coil.add_frame("FRONT", frame, [_defect("FRONT", 4, 10, score=0.5, track_id=1)], 0.0)
+    coil.add_frame("FRONT", frame, [_defect("FRONT", 4, 0, score=0.8, track_id=1)], 5.0)
+    coil.add_frame("BACK", frame, [_defect("BACK", 20, 20)], 20.0)
+    coil.close()
+
+    reopened = CoilMap.open(str(tmp_path), "coil_a")
+    try:
+        assert reopened.meta["frames"] == 3
+        assert reopened.length_mm() == pytest.approx(40.0)
+
+        front = reopened.query(0, 100, camera="FRONT")
+        assert [(d.along_mm, d.score) for d in front] == [(5.0, 0.8)]  # 같은 track_id는 최고 신뢰도만
+        assert len(reopened.query(0, 100, camera="FRONT", unique=False)) == 2
+
+        (back,) = reopened.query(0, 100, camera="BACK")
+        assert (back.along_mm, back.across_mm, back.length_mm) == (30.0, 20.0, 10.0)
+
+        region = reopened.mosaic_region("FRONT", 0, 25)
+        assert region.shape == (25, 100)
+        assert (region[:, :30] == 200).all() and (region[:, 30:] == 0).all()
+        assert (reopened.mosaic_region("BACK", 20, 40)[:, 10:40] == 200).all()
+    finally:
+        reopened.close()
+
+
+def test_strip_mosaic_recovers_rows_after_crash(tmp_path, monkeypatch):
+    monkeypatch.setattr(sheet_map, "GROW_ROWS", 16)
+    path = tmp_path / "front.u8"
+    mosaic = StripMosaic(path, width_px=8)
+    mosaic.write(0, 0, np.full((10, 8), 7, dtype=np.uint8))
+    mosaic.write(30, 2, np.full((5, 4), 9, dtype=np.uint8))  # 두 번째 GROW 블록 너머
+    assert mosaic.rows == 35
+    mosaic.close()
+
+    # meta.json이 10행에서 멈춘 상태로 비정상 종료된 코일
+    recovered = StripMosaic(path, width_px=8, rows=10, readonly=True)
+    try:
+        assert recovered.rows == 35
+        assert (recovered.region(30, 35)[:, 2:6] == 9).all()
+    finally:
+        recovered.close()
+
+
+def test_coil_map_meta_written_while_recording(tmp_path):
+    coil = CoilMap(str(tmp_path), "coil_b", MAP_CONFIG, CAMERAS)
+    try:
+        meta = json.loads((tmp_path / "coil_b" / "meta.json").read_text(encoding="utf-8"))
+        assert meta["frames"] == 0
+        coil.add_frame("FRONT", np.zeros((4, 4), dtype=np.uint8), [], 0.0)
+    finally:
+        coil.close()
+    reopened = CoilMap.open(str(tmp_path), "coil_b")
+    assert reopened.meta["frames"] == 1
+    reopened.close()
+
+
+def test_sheet_position_sources(capsys):
+    assert SheetPosition(0.0, 25.0).has_estimate
+    assert SheetPosition(50.0, None).has_estimate
+    position = SheetPosition(0.0, None)
+    assert not position.has_estimate
+    assert position.next(encoder_mm=12.5) == 12.5
+    assert "WARNING" not in capsys.readouterr().out
+    assert position.next(timestamp=1.0) == 0.0
+    assert "WARNING" in capsys.readouterr().out
+
+    pitch = SheetPosition(0.0, 25.0)
+    assert [pitch.next() for _ in range(3)] == [0.0, 25.0, 50.0]
+    speed = SheetPosition(50.0, None)
+    assert speed.next(timestamp=10.0) == 0.0
+    assert speed.next(timestamp=10.5) == pytest.approx(25.0)
@@ -0,0 +1,47 @@
+import math
+
+import numpy as np
+import pytest
+
+from soak_test import drift_slope, remove_step
+
+HOURS = [i / 12 for i in range(13)]  # 1시간, 5분 간격
+
+
+def _noise(n, scale=0.2, seed=0):
+    return np.random.default_rng(seed).normal(0.0, scale, n)
+
+
+def test_single_step_is_excluded():
+    values = [300.0 + (40.0 if i >= 6 else 0.0) + e for i, e in enumerate(_noise(13))]
+    assert drift_slope(HOURS, values)[0] > 20.0  # 최소제곱만 쓰면 누수로 판정
+    slope, _margin, step = drift_slope(HOURS, values, max_step=64.0)
+    assert step == pytest.approx(40.0, abs=1.0)
+    assert abs(slope) < 2.0
+
+
+def test_steady_leak_is_kept():
+    values = [300.0 + 30.0 * h + e for h, e in zip(HOURS, _noise(13))]
+    slope, margin, step = drift_slope(HOURS, values, max_step=64.0)
+    assert step == 0.0
+    assert slope == pytest.approx(30.0, rel=0.1)
+    assert slope - margin > 20.0  # 잡음보다 뚜렷한 누수는 한도 판정에 걸림
+
+
+def test_noise_margin_shrinks_with_more_samples():
+    short_hours = [i / 120 for i in range(60)]   # 30분
+    long_hours = [i / 120 for i in range(480)]   # 4시간
+    short = drift_slope(short_hours, list(800.0 + _noise(60, scale=40.0)))
+    long = drift_slope(long_hours, list(800.0 + _noise(480, scale=40.0)))
+    assert short[1] > 20.0 > long[1]
+
+
+def test_large_step_is_kept():
+    values = [300.0 + (200.0 if i >= 6 else 0.0) for i in range(13)]
+    assert remove_step(values, 64.0) == (values, 0.0)
+    assert drift_slope(HOURS, values, max_step=64.0)[0] > 100.0
+
+
+def test_too_few_samples():
+    slope, margin, step = drift_slope([0.0, 1.0], [1.0, 2.0], max_step=64.0)
+    assert math.isnan(slope) and math.isnan(margin) and step == 0.0
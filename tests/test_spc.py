@@ -0,0 +1,123 @@
+"""spc.py 스트리밍 집계를 같은 데이터의 NumPy 일괄 계산과 비교."""
+import math
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from spc import D2, MeasurementStats, RollingWindow, ShiftCounter, TDigest, Welford
+
+WINDOW = 50
+N = 10_037   # window의 배수가 아님: 마지막 재합산 이후 O(1) 슬라이딩 갱신이 37번 적용된 상태
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    # 크랙 길이와 비슷한 양의 비대칭 분포 + 큰 오프셋(상쇄 오차 확인)
+    return np.concatenate((rng.lognormal(0.5, 0.4, N // 2), 1e4 + rng.normal(2.0, 0.5, N - N // 2)))
+
+
+def test_welford_matches_numpy(data):
+    total = Welford()
+    for x in data:
+        total.update(float(x))
+    assert total.count == len(data)
+    assert total.mean == pytest.approx(data.mean(), rel=1e-12)
+    assert total.std == pytest.approx(data.std(ddof=1), rel=1e-9)
+    assert (total.min, total.max) == (data.min(), data.max())
+
+
+@pytest.mark.parametrize("n", [WINDOW - 1, WINDOW + 1, 3 * WINDOW + 17, N])
+def test_rolling_window_sliding_update(data, n):
+    recent = RollingWindow(WINDOW)
+    for x in data[:n]:
+        recent.update(float(x))
+    tail = data[max(0, n - WINDOW):n]
+    assert recent.count == len(tail)
+    assert np.array_equal(recent.values(), tail)
+    assert recent.mean == pytest.approx(tail.mean(), rel=1e-12)
+    assert recent.std == pytest.approx(tail.std(ddof=1), rel=1e-6)
+
+
+def test_rolling_window_every_step_after_wrap(data):
+    """창이 찬 뒤 매 값마다 (재합산 직후가 아닌 시점 포함) 일괄 계산과 일치."""
+    recent = RollingWindow(WINDOW)
+    for i, x in enumerate(data[:4 * WINDOW], start=1):
+        recent.update(float(x))
+        tail = data[max(0, i - WINDOW):i]
+        if len(tail) > 1:
+            assert recent.std == pytest.approx(tail.std(ddof=1), rel=1e-6, abs=1e-9)
+
+
+@pytest.mark.parametrize("q, tol", [(0.01, 0.002), (0.1, 0.01), (0.5, 0.01), (0.9, 0.01), (0.99, 0.002)])
+def test_tdigest_rank_error(data, q, tol):
+    """값 오차 대신 순위 오차(추정값 이하 비율 - q)로 비교."""
+    digest = TDigest(100)
+    for x in data:
+        digest.update(float(x))
+    rank = np.searchsorted(np.sort(data), digest.quantile(q), side='right') / len(data)
+    assert abs(rank - q) <= tol
+
+
+def test_measurement_stats_limits_and_capability(data):
+    lsl, usl = 1e4, 1e4 + 4.0
+    stats = MeasurementStats(window=WINDOW, usl=usl, lsl=lsl)
+    for x in data:
+        stats.update(float(x))
+
+    tail = data[-WINDOW:]
+    mean = tail.mean()
+    sigma_within = np.abs(np.diff(tail)).mean() / D2
+    summary = stats.summary(recent=True)
+    assert summary["sigma_within"] == pytest.approx(sigma_within, rel=1e-6)
+    assert summary["ucl"] == pytest.approx(mean + 3 * sigma_within, rel=1e-9)
+    assert summary["lcl"] == pytest.approx(mean - 3 * sigma_within, rel=1e-9)
+    assert summary["cp"] == pytest.approx((usl - lsl) / (6 * sigma_within), rel=1e-6)
+    assert summary["cpk"] == pytest.approx(min(usl - mean, mean - lsl) / (3 * sigma_within), rel=1e-6)
+    assert summary["ppk"] == pytest.approx(min(usl - mean, mean - lsl) / (3 * tail.std(ddof=1)), rel=1e-6)
+
+    summary = stats.summary(recent=False)
+    assert summary["sigma_within"] == pytest.approx(np.abs(np.diff(data)).mean() / D2, rel=1e-9)
+
+    ewma = data[0]
+    for x in data[1:]:
+        ewma = 0.2 * x + 0.8 * ewma
+    assert stats.ewma == pytest.approx(ewma, rel=1e-9)
+
+
+def test_one_sided_spec_has_no_cp():
+    stats = MeasurementStats(window=10, usl=3.0)
+    for x in (1.0, 1.2, 0.9, 1.1, 1.0):
+        stats.update(x)
+    summary = stats.summary()
+    assert math.isnan(summary["cp"])
+    assert summary["cpk"] == pytest.approx((3.0 - summary["mean"]) / (3 * summary["sigma_within"]))
+
+
+def test_shift_crossing_midnight():
+    counter = ShiftCounter({"A": "06:00-14:00", "B": "14:00-22:00", "C": "22:00-06:00"})
+    assert counter.shift_of(datetime(2026, 3, 1, 23, 30)) == ("2026-03-01", "C")
+    assert counter.shift_of(datetime(2026, 3, 2, 0, 10)) == ("2026-03-01", "C")
+    assert counter.shift_of(datetime(2026, 3, 2, 5, 59)) == ("2026-03-01", "C")
+    assert counter.shift_of(datetime(2026, 3, 2, 6, 0)) == ("2026-03-02", "A")
+    assert counter.shift_of(datetime(2026, 3, 1, 1, 0)) == ("2026-02-28", "C")
+
+    # 자정 전후 검사/결함이 같은 교대로 합산
+    for ts in (datetime(2026, 3, 1, 22, 0), datetime(2026, 3, 1, 23, 59), datetime(2026, 3, 2, 0, 1),
+               datetime(2026, 3, 2, 3, 0)):
+        counter.add_inspection(ts)
+    counter.add_defect("crack", datetime(2026, 3, 1, 23, 0))
+    counter.add_defect("crack", datetime(2026, 3, 2, 2, 0))
+    counter.add_inspection(datetime(2026, 3, 2, 6, 30))
+    rows = counter.rates(last=2)
+    assert rows[0][:2] == ("2026-03-02 A", 1)
+    assert rows[1] == ("2026-03-01 C", 4, {"crack": 0.5})
+
+
+def test_shift_counter_keeps_recent_shifts():
+    counter = ShiftCounter(keep=3)
+    for day in range(1, 4):
+        for hour in (7, 15, 23):
+            counter.add_inspection(datetime(2026, 3, day, hour))
+    assert list(counter.counts) == [("2026-03-03", "A"), ("2026-03-03", "B"), ("2026-03-03", "C")]
@@ -0,0 +1,76 @@
+"""synthetic_frames.py: 작은 가짜 NEU-DET 트리로 생성기와 정답 박스 확인."""
+import cv2
+import numpy as np
+
+from synthetic_frames import PATCH_MARGIN, SyntheticFrameGenerator, generate, load_patches
+
+BOX = (20, 30, 60, 50)  # NEU-DET 좌표 (xmin, ymin, xmax, ymax)
+
+ANNOTATION = """<annotation>
+    <filename>scratches_1.jpg</filename>
+    <object>
+        <name>scratches</name>
+        <bndbox><xmin>{}</xmin><ymin>{}</ymin><xmax>{}</xmax><ymax>{}</ymax></bndbox>
+    </object>
+</annotation>
+"""
+
+
+def _fake_neu(root):
+    rng = np.random.default_rng(1)
+    image = rng.integers(110, 140, (100, 100), dtype=np.uint8)
+    image[BOX[1]:BOX[3], BOX[0]:BOX[2]] = rng.integers(60, 200, (BOX[3] - BOX[1], BOX[2] - BOX[0]), dtype=np.uint8)
+    (root / 'train' / 'annotations').mkdir(parents=True)
+    (root / 'train' / 'images' / 'scratches').mkdir(parents=True)
+    (root / 'train' / 'annotations' / 'scratches_1.xml').write_text(ANNOTATION.format(*BOX))
+    cv2.imwrite(str(root / 'train' / 'images' / 'scratches' / 'scratches_1.png'), image)
+    return image
+
+
+def test_load_patches_keeps_margin(tmp_path):
+    _fake_neu(tmp_path)
+    patches = load_patches(str(tmp_path), splits=('train',))
+    assert len(patches) == 1
+    label, patch, box = patches[0]
+    assert label == 'scratches'
+    assert box == (PATCH_MARGIN, PATCH_MARGIN, PATCH_MARGIN + 40, PATCH_MARGIN + 20)
+    assert patch.shape == (20 + 2 * PATCH_MARGIN, 40 + 2 * PATCH_MARGIN)
+
+
+def test_frame_ground_truth_box(tmp_path):
+    image = _fake_neu(tmp_path)
+    patches = load_patches(str(tmp_path), splits=('train',))
+    generator = SyntheticFrameGenerator(patches, width=320, height=240, pixels_per_mm=10.0, min_defects=1,
+                                        max_defects=1, scale_range=(1.0, 1.0), seed=3, channels=1, texture_bank=1)
+    frame, truth = generator.frame(0)
+    assert frame.shape == (240, 320)
+    assert len(truth) == 1
+    t = truth[0]
+    assert t['label'] == 'scratches'
+    x0, y0, x1, y1 = (int(round(v)) for v in t['xyxy'])
+    assert (x1 - x0, y1 - y0) == (40, 20)
+    assert t['width_mm'] == 4.0 and t['height_mm'] == 2.0
+
+    # 박스 안은 원본 결함 + 밝기 오프셋 그대로 (페더링 없음)
+    pasted = frame[y0:y1, x0:x1].astype(np.int16)
+    original = image[BOX[1]:BOX[3], BOX[0]:BOX[2]].astype(np.int16)
+    diff = pasted - original
+    assert diff.max() - diff.min() <= 1
+
+    # 같은 (seed, index)면 같은 프레임
+    again, again_truth = generator.frame(0)
+    assert np.array_equal(frame, again) and again_truth == truth
+
+
+def test_generate_writes_dirs_before_iteration(tmp_path):
+    _fake_neu(tmp_path / 'neu')
+    patches = load_patches(str(tmp_path / 'neu'), splits=('train',))
+    out_dir = tmp_path / 'out'
+    frames = generate(2, {"width": 160, "height": 120, "min_defects": 1, "max_defects": 1,
+                          "scale_range": (1.0, 1.0), "texture_bank": 1}, patches, workers=1, out_dir=str(out_dir),
+                      ext='.png')
+    assert (out_dir / 'images').is_dir() and (out_dir / 'labels').is_dir()
+    results = list(frames)
+    assert [index for index, _image, _truth in results] == [0, 1]
+    assert (out_dir / 'images' / 'synth_000000.png').exists()
+    assert (out_dir / 'labels' / 'synth_000001.txt').read_text().startswith('5 ')
@@ -0,0 +1,174 @@
+"""
+코어 분할 벤치마크: 이 PC에서 캡처/UI와 추론에 코어를 어떻게 나눌지 찾습니다.
+
+분할마다 추론 워커 프로세스(추론 코어에 고정, torch 스레드 = 코어 수)가 검출을 쉬지 않고
+돌리는 동안, 메인 프로세스의 캡처 스레드 2개(UI/캡처 코어)가 카메라 속도로 JPEG 디코딩 +
+흑백 변환을 수행합니다. 캡처 프레임 누락률과 추론 지연(p50/p99)을 비교하여
+누락률이 기준 이하인 분할 중 추론 p99가 가장 낮은 분할을 고릅니다.
+--write 는 측정한 구성 그대로 적용되도록 resources와 함께 "inference_process": true 를 저장합니다.
+
+사용 예:
+    python thread_budget_bench.py --duration 10
+    python thread_budget_bench.py --model runs/detect/train4/weights/best.pt --write
+"""
+import argparse
+import copy
+import multiprocessing as mp
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+import config
+import resource_budget
+from inference_loadgen import load_frames
+
+
+def _inference_load(config_data: dict, frame: np.ndarray, duration: float, start_event, results):
+    """워커 프로세스: 예산 적용 -> 모델 로드 -> 시작 신호 후 duration 동안 연속 검출."""
+    resource_budget.apply_inference_process(config_data)
+    from detector import DefectDetector
+
+    detector = DefectDetector(config_data)
+    detector.detect(frame, "FRONT")  # 워밍업
+    results.put("ready")
+    start_event.wait()
+    latencies = []
+    stop_at = time.perf_counter() + duration
+    while time.perf_counter() < stop_at:
+        t0 = time.perf_counter()
+        detector.detect(frame, "FRONT")
+        latencies.append((time.perf_counter() - t0) * 1000)
+    results.put(latencies)
+
+
+def _capture_load(encoded: bytes, fps: float, duration: float, stats: dict, lock):
+    """카메라 1대 시뮬레이션: 주기마다 디코딩/변환, 다음 주기를 넘기면 누락으로 셈."""
+    resource_budget.pin_current_thread("capture", "ui")
+    buf = np.frombuffer(encoded, dtype=np.uint8)
+    interval = 1.0 / fps
+    next_due = time.perf_counter()
+    stop_at = next_due + duration
+    frames = dropped = 0
+    while next_due < stop_at:
+        now = time.perf_counter()
+        if now < next_due:
+            time.sleep(next_due - now)
+        img = cv2.imdecode(buf, cv2.IMREAD_COLOR)
+        cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        frames += 1
+        next_due += interval
+        late = time.perf_counter() - next_due
+        if late > 0:
+            skipped = int(late // interval) + 1  # 처리하지 못한 주기 = 누락 프레임
+            dropped += skipped
+            next_due += skipped * interval
+    with lock:
+        stats["frames"] += frames
+        stats["dropped"] += dropped
+
+
+def run_split(base_config: dict, budget: dict | None, frame: np.ndarray, duration: float, fps: float) -> dict:
+    config_data = copy.deepcopy(base_config)
+    config_data["resources"] = budget or {"enabled": False}
+    resource_budget.configure(config_data)
+    if budget is None:
+        cv2.setNumThreads(-1)  # OpenCV 기본 스레드 수로 복원
+    resource_budget.apply_opencv()
+
+    ctx = mp.get_context("spawn")
+    start_event = ctx.Event()
+    results = ctx.Queue()
+    worker = ctx.Process(target=_inference_load, args=(config_data, frame, duration, start_event, results),
+                         daemon=True)
+    worker.start()
+    results.get()  # 모델 로드 완료 대기
+
+    encoded = cv2.imencode(".jpg", frame)[1].tobytes()
+    stats = {"frames": 0, "dropped": 0}
+    lock = threading.Lock()
+    cameras = [threading.Thread(target=_capture_load, args=(encoded, fps, duration, stats, lock)) for _ in range(2)]
+    start_event.set()
+    for t in cameras:
+        t.start()
+    for t in cameras:
+        t.join()
+    latencies = sorted(results.get())
+    worker.join(timeout=10)
+
+    def _pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] if latencies else float("nan")
+
+    total = stats["frames"] + stats["dropped"]
+    return {
+        "drop_rate": stats["dropped"] / total if total else 0.0,
+        "capture_fps": stats["frames"] / duration / 2,
+        "infer_p50_ms": _pct(0.50),
+        "infer_p99_ms": _pct(0.99),
+        "infer_per_s": len(latencies) / duration,
+    }
+
+
+def candidate_budgets(num_cores: int) -> list[tuple[str, dict | None]]:
+    """앞쪽 k개 코어 = UI/캡처, 나머지 = 추론 (스레드 수 = 코어 수, 코어 수 - 1)."""
+    candidates = [("unpinned", None)]
+    for k in range(1, num_cores):
+        front = resource_budget.format_cores(range(k))
+        rest = resource_budget.format_cores(range(k, num_cores))
+        for threads in sorted({num_cores - k, max(1, num_cores - k - 1)}, reverse=True):
+            candidates.append((f"ui/cap {front} | infer {rest} x{threads}", {
+                "enabled": True,
+                "ui": {"cores": front},
+                "capture": {"cores": front},
+                "inference": {"cores": rest, "threads": threads, "interop_threads": 1},
+                "opencv_threads": max(1, k),
+            }))
+    return candidates
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU 코어 분할 벤치마크")
+    parser.add_argument("--model", help="검출 모델 (기본: config.json의 model_path)")
+    parser.add_argument("--duration", type=float, default=10.0, help="분할별 측정 시간(초)")
+    parser.add_argument("--fps", type=float, default=30.0, help="카메라 1대의 목표 FPS")
+    parser.add_argument("--max-drop", type=float, default=0.01, help="허용 캡처 누락률")
+    parser.add_argument("--images", help="테스트 이미지 폴더 (생략 시 무작위 프레임)")
+    parser.add_argument("--write", action="store_true",
+                        help="최적 분할을 config.json resources에 저장하고 inference_process를 켬")
+    args = parser.parse_args()
+
+    app_config = config.load_config()
+    base_config = copy.deepcopy(app_config)
+    base_config["inference_process"] = False
+    if args.model:
+        base_config["model_path"] = args.model
+    capture = app_config.get("front", {}).get("capture", {})
+    frame = load_frames(args.images, int(capture.get("width") or 1280), int(capture.get("height") or 720), 1)[0]
+
+    num_cores = os.cpu_count() or 1
+    rows = []
+    print(f"{num_cores} cores, {args.duration:.0f}s per split, 2 cameras @ {args.fps:.0f} fps")
+    print(f"{'split':<40} {'drop %':>7} {'cap fps':>8} {'p50 ms':>8} {'p99 ms':>8} {'inf/s':>7}")
+    for name, budget in candidate_budgets(num_cores):
+        row = run_split(base_config, budget, frame, args.duration, args.fps)
+        row.update(name=name, budget=budget)
+        rows.append(row)
+        print(f"{name:<40} {row['drop_rate'] * 100:>7.2f} {row['capture_fps']:>8.1f} "
+              f"{row['infer_p50_ms']:>8.1f} {row['infer_p99_ms']:>8.1f} {row['infer_per_s']:>7.1f}")
+
+    ok = [r for r in rows if r["drop_rate"] <= args.max_drop]
+    best = min(ok, key=lambda r: r["infer_p99_ms"]) if ok else min(rows, key=lambda r: r["drop_rate"])
+    print(f"best: {best['name']}")
+
+    if args.write:
+        # 모든 분할은 추론을 별도 프로세스로 돌려 측정했으므로 같은 구성(inference_process)으로 저장
+        app_config["resources"] = best["budget"] or {**app_config.get("resources", {}), "enabled": False}
+        app_config["inference_process"] = True
+        config.save_config(app_config)
+        print(f"saved to {config.CONFIG_FILE} (resources + \"inference_process\": true, 측정과 같은 구성)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+import os
+
 from ultralytics import YOLO
 import torch
 
@@ -28,6 +30,117 @@ def train():
         patience=30          # 성능 정체 시 30에폭 기다려보고 종료
     )
 
+def train_tile_classifier(tile=64, epochs=30, device=None):
+    """
+    캐스케이드용 타일 분류기(결함/정상) 학습.
+    neu_yolo_data 라벨로 타일 데이터셋(neu_tile_data)을 만든 뒤 yolov8n-cls로 학습합니다.
+    학습 후 cascade_bench.py calibrate 로 재현율 목표에 맞는 임계값을 정합니다.
+    """
+    from cascade import build_tile_dataset
+
+    counts = build_tile_dataset('./neu_yolo_data', './neu_tile_data', tile=tile)
+    print(f"Tile dataset: {counts}")
+
+    if device is None:
+        device = 0 if torch.cuda.is_available() else 'cpu'
+    model = YOLO('yolov8n-cls.pt')
+    model.train(
+        data='neu_tile_data',
+        epochs=epochs,
+        imgsz=tile,
+        batch=256 if device != 'cpu' else 64,
+        device=device,
+        project='runs/classify',
+        name='tile_gate',
+        exist_ok=True
+    )
+
+def train_grayscale(model_name='yolov8n.pt', epochs=100, imgsz=640, device=None, export_format='onnx'):
+    """
+    흑백(1채널) 입력 모델 학습 및 내보내기.
+    data_gray.yaml(channels: 1)로 NEU-DET를 1채널로 읽어 첫 conv 층이 1채널인 모델을 만듭니다.
+    사전학습 가중치는 첫 층을 제외하고 이어받습니다. (ultralytics 8.3 이상의 channels 지원 필요)
+    config.json: "grayscale": true, "model_path": <best.pt 또는 내보낸 파일>,
+    내보낸 파일을 쓰면 "model_channels": 1 도 지정합니다.
+    """
+    if device is None:
+        device = 0 if torch.cuda.is_available() else 'cpu'
+    model = YOLO(model_name)
+    model.train(
+        data='data_gray.yaml',
+        epochs=epochs,
+        imgsz=imgsz,
+        batch=64 if device != 'cpu' else 16,
+        device=device,
+        name='gray',
+        exist_ok=True
+    )
+    best = os.path.join(str(model.trainer.save_dir), 'weights', 'best.pt')
+    print(f"Grayscale model: {best}")
+    if export_format:
+        exported = YOLO(best).export(format=export_format, imgsz=imgsz)
+        print(f"Exported: {exported}")
+
+def train_distill(student='yolov8n.pt', teacher=None, epochs=100, imgsz=640, device=None,
+                  logit_weight=1.0, feature_weight=1.0, temperature=2.0, smoke=False):
+    """
+    교사(train4 best.pt) -> 학생(nano/small) 지식 증류 학습 후, 교사와 mAP / CPU 지연을 비교합니다.
+    smoke=True 이면 CPU에서도 몇 분 안에 끝나도록 데이터 일부, 1 에폭, 작은 해상도로 돌립니다.
+    """
+    from distill import DEFAULT_TEACHER, distill, compare_models, format_table
+
+    teacher = teacher or DEFAULT_TEACHER
+    if device is None:
+        device = 0 if torch.cuda.is_available() else 'cpu'
+    overrides = {}
+    if smoke:
+        epochs, imgsz, device = 1, 320, 'cpu'
+        overrides = dict(fraction=0.05, workers=0, plots=False)
+    batch = 4 if smoke else (16 if device == 'cpu' else 64)
+
+    name = f"{os.path.splitext(os.path.basename(student))[0]}_distill{'_smoke' if smoke else ''}"
+    best = distill(student, teacher, 'data.yaml', epochs, imgsz, batch, device,
+                   logit_weight=logit_weight, feature_weight=feature_weight, temperature=temperature,
+                   name=name, **overrides)
+    print(f"Student model: {best}")
+
+    rows = compare_models({'teacher': teacher, 'student': best}, 'data.yaml', imgsz,
+                          latency_images=5 if smoke else 20)
+    table = format_table(rows)
+    print(table)
+    out_path = os.path.join(os.path.dirname(os.path.dirname(best)), 'comparison.md')
+    with open(out_path, 'w', encoding='utf-8') as f:
+        f.write(table + "\n")
+    print(f"Comparison saved: {out_path}")
+
 if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="모델 학습")
+    parser.add_argument('--tile-classifier', action='store_true', help="캐스케이드용 타일 분류기 학습")
+    parser.add_argument('--tile', type=int, default=64)
+    parser.add_argument('--epochs', type=int, default=None, help="기본: 타일 분류기 30, 증류 100")
+    parser.add_argument('--distill', action='store_true', help="교사 모델로 소형 학생 모델 증류 학습")
+    parser.add_argument('--student', default='yolov8n.pt', help="학생(--distill) / 기본(--grayscale) 모델 (yolov8n.pt / yolov8s.pt)")
+    parser.add_argument('--teacher', default=None, help="교사 가중치 (기본: runs/detect/train4/weights/best.pt)")
+    parser.add_argument('--imgsz', type=int, default=640)
+    parser.add_argument('--device', default=None, help="예: 0, cpu")
+    parser.add_argument('--logit-weight', type=float, default=1.0, help="헤드 출력 증류 가중치 (0 = 끔)")
+    parser.add_argument('--feature-weight', type=float, default=1.0, help="넥 특징 증류 가중치 (0 = 끔)")
+    parser.add_argument('--temperature', type=float, default=2.0)
+    parser.add_argument('--grayscale', action='store_true', help="흑백 1채널 입력 모델 학습 + 내보내기")
+    parser.add_argument('--export', default='onnx', help="--grayscale 내보내기 형식 (빈 문자열이면 생략)")
+    parser.add_argument('--smoke', action='store_true', help="CPU 스모크 테스트 (1 에폭, 데이터 5%%, imgsz 320)")
+    args = parser.parse_args()
+
     # 윈도우 멀티프로세싱 에러 방지 (필수)
-    train()
\ No newline at end of file
+    if args.tile_classifier:
+        train_tile_classifier(tile=args.tile, epochs=args.epochs or 30)
+    elif args.grayscale:
+        train_grayscale(model_name=args.student, epochs=args.epochs or 100, imgsz=args.imgsz,
+                        device=args.device, export_format=args.export)
+    elif args.distill:
+        train_distill(student=args.student, teacher=args.teacher, epochs=args.epochs or 100, imgsz=args.imgsz,
+                      device=args.device, logit_weight=args.logit_weight, feature_weight=args.feature_weight,
+                      temperature=args.temperature, smoke=args.smoke)
+    else:
+        train()
\ No newline at end of file
@@ -0,0 +1,138 @@
+"""
+경계 점수 검출에만 적용하는 선택적 TTA(test-time augmentation).
+
+점수가 클래스별 conf 임계값 근처(± band)에 있는 박스는 프레임마다 OK/NG가 뒤집히기 쉽습니다.
+이런 박스가 있는 프레임에서만 해당 ROI를 잘라 (배율별 크롭 + 좌우/상하 반전) 작은 배치 하나로
+다시 추론하고, 원래 점수와 변형별 점수(같은 클래스 박스가 없으면 0)를 평균하여 점수를 바꿉니다.
+분명한 프레임(경계 박스 없음)은 추가 비용이 없습니다.
+
+config.json 예:
+    "tta": {"enabled": true, "band": 0.15, "scales": [1.0, 1.5], "flips": ["h", "v"],
+            "context": 0.5, "crop_size": 320, "match_iou": 0.3, "max_rois": 8}
+"""
+import time
+
+import cv2
+import numpy as np
+
+
+def box_iou(box: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+    """박스 하나와 박스 배열(xyxy) 사이의 IoU."""
+    inter_w = np.clip(np.minimum(box[2], boxes[:, 2]) - np.maximum(box[0], boxes[:, 0]), 0, None)
+    inter_h = np.clip(np.minimum(box[3], boxes[:, 3]) - np.maximum(box[1], boxes[:, 1]), 0, None)
+    inter = inter_w * inter_h
+    area = (box[2] - box[0]) * (box[3] - box[1])
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    return inter / (area + areas - inter + 1e-9)
+
+
+class BorderlineTTA:
+    """
+    DefectDetector의 2차 추론 단계. refine()은 클래스별 임계값 적용 전의 (xyxy, score, class_id)
+    배열을 받아 경계 박스의 점수만 융합 점수로 바꿔 돌려줍니다.
+    """
+    def __init__(self, detector, tta_config: dict):
+        self.detector = detector
+        self.band = float(tta_config.get('band', 0.15))
+        self.scales = [float(s) for s in tta_config.get('scales', [1.0, 1.5])] or [1.0]
+        self.flips = [f for f in tta_config.get('flips', ['h', 'v']) if f in ('h', 'v')]
+        self.context = float(tta_config.get('context', 0.5))   # 박스 크기 대비 주변 여백 (한쪽)
+        self.crop_size = int(tta_config.get('crop_size', 320))
+        self.match_iou = float(tta_config.get('match_iou', 0.3))
+        self.max_rois = int(tta_config.get('max_rois', 8))     # 한 번의 2차 추론에 넣을 최대 ROI 수
+        # (배율, 반전) 변형 목록: 배율별 크롭 + 첫 배율 크롭의 반전
+        self.variants = [(s, None) for s in self.scales] + [(self.scales[0], f) for f in self.flips]
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.frames = 0
+        self.frames_fired = 0
+        self.rois = 0
+        self.crossings = 0        # 융합 후 임계값 기준 판정(통과/탈락)이 바뀐 박스 수
+        self.seconds = 0.0
+
+    def tta_stats(self) -> dict:
+        return {
+            "frames": self.frames,
+            "fire_rate": self.frames_fired / self.frames if self.frames else 0.0,
+            "rois": self.rois,
+            "crossings": self.crossings,
+            "ms_per_fired_frame": self.seconds / self.frames_fired * 1000 if self.frames_fired else 0.0,
+            "ms_per_frame": self.seconds / self.frames * 1000 if self.frames else 0.0,
+        }
+
+    def borderline(self, scores: np.ndarray, class_ids: np.ndarray) -> np.ndarray:
+        """경계 박스 인덱스 (임계값에 가까운 순, 최대 max_rois 개)."""
+        margin = np.abs(scores - self.detector.class_conf[class_ids])
+        idx = np.flatnonzero(margin <= self.band)
+        return idx[np.argsort(margin[idx])][:self.max_rois]
+
+    def _crop_window(self, box: np.ndarray, scale: float, height: int, width: int) -> tuple[int, int, int, int]:
+        """박스 중심의 정사각형 크롭 창 (x0, y0, x1, y1). 프레임 밖으로 나가면 안쪽으로 밀어 넣습니다."""
+        cx, cy = (box[0] + box[2]) / 2, (box[1] + box[3]) / 2
+        side = max(box[2] - box[0], box[3] - box[1]) * (1 + 2 * self.context) * scale
+        side = int(min(max(side, 32), height, width))
+        x0 = int(min(max(cx - side / 2, 0), width - side))
+        y0 = int(min(max(cy - side / 2, 0), height - side))
+        return x0, y0, x0 + side, y0 + side
+
+    def refine(self, images: list[np.ndarray], predictions: list) -> list:
+        self.frames += len(images)
+        jobs = []   # (프레임 번호, 박스 번호)
+        for i, (_xyxy, scores, class_ids) in enumerate(predictions):
+            jobs.extend((i, j) for j in self.borderline(scores, class_ids))
+        if not jobs:
+            return predictions
+
+        start = time.perf_counter()
+        self.frames_fired += len({i for i, _ in jobs})
+        jobs = jobs[:self.max_rois]
+        self.rois += len(jobs)
+
+        size = self.crop_size
+        crops, windows = [], []
+        for i, j in jobs:
+            image = images[i]
+            h, w = image.shape[:2]
+            for scale, flip in self.variants:
+                x0, y0, x1, y1 = self._crop_window(predictions[i][0][j], scale, h, w)
+                crop = cv2.resize(image[y0:y1, x0:x1], (size, size), interpolation=cv2.INTER_LINEAR)
+                if flip == 'h':
+                    crop = cv2.flip(crop, 1)
+                elif flip == 'v':
+                    crop = cv2.flip(crop, 0)
+                crops.append(self.detector._model_input(crop))
+                windows.append((x0, y0, (x1 - x0) / size, flip))
+
+        # 모든 ROI x 변형을 한 번의 배치로 추론 (경계 band 아래까지 보도록 conf를 낮춤)
+        params = dict(self.detector.inference_params, imgsz=size)
+        results = self.detector.model(crops, verbose=False, device=self.detector.device, **params)
+
+        fused = [scores.copy() for _xyxy, scores, _cls in predictions]
+        per_roi = len(self.variants)
+        for k, (i, j) in enumerate(jobs):
+            box = predictions[i][0][j]
+            cls_id = predictions[i][2][j]
+            votes = [float(predictions[i][1][j])]
+            for result, (x0, y0, ratio, flip) in zip(results[k * per_roi:(k + 1) * per_roi],
+                                                       windows[k * per_roi:(k + 1) * per_roi]):
+                xyxy, scores, class_ids = self.detector._box_arrays(result.boxes)
+                same = class_ids == cls_id
+                if not same.any():
+                    votes.append(0.0)
+                    continue
+                xyxy, scores = xyxy[same].copy(), scores[same]
+                if flip == 'h':
+                    xyxy[:, [0, 2]] = size - xyxy[:, [2, 0]]
+                elif flip == 'v':
+                    xyxy[:, [1, 3]] = size - xyxy[:, [3, 1]]
+                xyxy = xyxy * ratio + np.array([x0, y0, x0, y0], dtype=xyxy.dtype)
+                iou = box_iou(box, xyxy)
+                votes.append(float(scores[iou.argmax()]) if iou.max() >= self.match_iou else 0.0)
+            fused[i][j] = np.mean(votes)
+            threshold = self.detector.class_conf[cls_id]
+            if (fused[i][j] >= threshold) != (predictions[i][1][j] >= threshold):
+                self.crossings += 1
+
+        self.seconds += time.perf_counter() - start
+        return [(xyxy, f, class_ids) for (xyxy, _scores, class_ids), f in zip(predictions, fused)]
@@ -0,0 +1,99 @@
+"""
+경계 점수 TTA 리포트: 2차 추론이 얼마나 자주 실행되는지, 비용은 얼마인지, 판정이 안정되는지 측정합니다.
+
+각 이미지를 작게 흔든(1~2 px 이동 + 밝기 변화) 사본 여러 장으로 검출하여
+TTA 끄기/켜기에서 같은 이미지의 최종 판정(PASS/NG)이 사본마다 바뀌는 비율을 비교합니다.
+
+사용 예:
+    python tta_report.py
+    python tta_report.py --images data/captures --band 0.1 --jitter 8
+"""
+import argparse
+import copy
+import time
+
+import numpy as np
+
+import config
+from detector import DefectDetector
+from inference_loadgen import load_frames
+
+
+def jittered(image: np.ndarray, count: int, rng) -> list[np.ndarray]:
+    """컨베이어 위 같은 위치를 연속 촬영한 것처럼 조금씩 다른 사본 (첫 장은 원본)."""
+    frames = [image]
+    for _ in range(count - 1):
+        dy, dx = rng.integers(-2, 3, size=2)
+        shifted = np.roll(image, (int(dy), int(dx)), axis=(0, 1)).astype(np.int16)
+        frames.append(np.clip(shifted + int(rng.integers(-4, 5)), 0, 255).astype(np.uint8))
+    return frames
+
+
+def verdict(defects) -> str:
+    """MainWindow와 같은 최종 판정: NG/WARNING 결함이 하나라도 있으면 NG."""
+    return "NG" if any(d.status in ("NG", "WARNING") for d in defects) else "PASS"
+
+
+def run(detector: DefectDetector, images: list[np.ndarray], jitter: int, seed: int) -> dict:
+    rng = np.random.default_rng(seed)
+    detector.detect(images[0], "FRONT")  # 워밍업
+    if detector._tta is not None:
+        detector._tta.reset_stats()
+    latencies, unstable = [], 0
+    for image in images:
+        verdicts = set()
+        for frame in jittered(image, jitter, rng):
+            start = time.perf_counter()
+            defects = detector.detect(frame, "FRONT")
+            latencies.append((time.perf_counter() - start) * 1000)
+            verdicts.add(verdict(defects))
+        unstable += len(verdicts) > 1
+    latencies = np.array(latencies)
+    return {
+        "ms_mean": float(latencies.mean()),
+        "ms_p95": float(np.percentile(latencies, 95)),
+        "unstable_rate": unstable / len(images),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="경계 점수 TTA 발동률/비용/판정 안정성 리포트")
+    parser.add_argument("--model", help="검출 모델 (기본: config.json의 model_path)")
+    parser.add_argument("--images", default="neu_yolo_data/images/val", help="테스트 이미지 폴더")
+    parser.add_argument("--count", type=int, default=100, help="사용할 이미지 수")
+    parser.add_argument("--jitter", type=int, default=5, help="이미지당 흔든 사본 수")
+    parser.add_argument("--band", type=float, help="경계 폭 (기본: config.json tta.band)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    base_config = config.load_config()
+    if args.model:
+        base_config["model_path"] = args.model
+    images = load_frames(args.images, 200, 200, args.count)[:args.count]
+
+    rows = {}
+    for enabled in (False, True):
+        config_data = copy.deepcopy(base_config)
+        tta_config = config_data.setdefault("tta", {})
+        tta_config["enabled"] = enabled
+        if args.band is not None:
+            tta_config["band"] = args.band
+        detector = DefectDetector(config_data)
+        rows[enabled] = run(detector, images, args.jitter, args.seed)
+        if enabled:
+            stats = detector._tta.tta_stats()
+
+    base, tta = rows[False], rows[True]
+    print(f"{len(images)} images x {args.jitter} jittered frames, band ±{detector._tta.band}")
+    print(f"{'mode':<8} {'ms/frame':>9} {'p95 ms':>8} {'unstable verdict %':>19}")
+    for name, r in (("off", base), ("tta", tta)):
+        print(f"{name:<8} {r['ms_mean']:>9.2f} {r['ms_p95']:>8.2f} {r['unstable_rate'] * 100:>19.1f}")
+    print(f"second pass fired on {stats['fire_rate'] * 100:.1f}% of frames ({stats['rois']} ROIs), "
+          f"{stats['ms_per_fired_frame']:.2f} ms per fired frame, "
+          f"{stats['ms_per_frame']:.2f} ms per frame on average "
+          f"(+{(tta['ms_mean'] / base['ms_mean'] - 1) * 100:.0f}% total)")
+    print(f"boxes moved across their class threshold by fusion: {stats['crossings']}")
+
+
+if __name__ == "__main__":
+    main()
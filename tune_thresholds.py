@@ -0,0 +1,76 @@
+"""
+NEU-DET 검증셋의 PR 곡선으로 클래스별 최적 confidence 임계값을 찾는 도구.
+
+기본은 클래스별 F1이 최대가 되는 conf를 고르고, --min-recall 을 주면
+해당 재현율을 만족하는 가장 높은 conf(= 오검출이 가장 적은 값)를 고릅니다.
+
+사용 예:
+    python tune_thresholds.py
+    python tune_thresholds.py --min-recall 0.9 --write
+"""
+import argparse
+
+import numpy as np
+
+import config
+
+
+def pick_thresholds(px: np.ndarray, p_curve: np.ndarray, r_curve: np.ndarray, f1_curve: np.ndarray,
+                    class_ids, names: dict, min_recall: float | None = None) -> dict:
+    """클래스별 곡선(행)에서 임계값을 골라 {클래스명: {conf, precision, recall, f1}} 으로 반환합니다."""
+    picked = {}
+    for row, cls_id in enumerate(class_ids):
+        recall = r_curve[row]
+        if min_recall is not None:
+            ok = np.flatnonzero(recall >= min_recall)
+            # px는 오름차순이므로 조건을 만족하는 마지막 인덱스가 가장 높은 conf
+            idx = int(ok[-1]) if len(ok) else int(np.argmax(f1_curve[row]))
+        else:
+            idx = int(np.argmax(f1_curve[row]))
+        picked[names[int(cls_id)]] = {
+            "conf": round(float(px[idx]), 3),
+            "precision": float(p_curve[row][idx]),
+            "recall": float(recall[idx]),
+            "f1": float(f1_curve[row][idx]),
+        }
+    return picked
+
+
+def main():
+    parser = argparse.ArgumentParser(description="클래스별 confidence 임계값 튜닝")
+    parser.add_argument("--model", help="평가할 모델 (기본: config.json의 model_path)")
+    parser.add_argument("--data", default="data.yaml")
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--device", default=None, help="예: 0, cpu")
+    parser.add_argument("--min-recall", type=float, default=None, help="클래스별 최소 재현율 (생략 시 F1 최대)")
+    parser.add_argument("--write", action="store_true", help="결과를 config.json의 class_thresholds에 저장")
+    args = parser.parse_args()
+
+    from ultralytics import YOLO
+
+    app_config = config.load_config()
+    model = YOLO(args.model or app_config.get("model_path", "yolov8n.pt"))
+    # conf를 낮게 두어 전체 PR 곡선을 얻음
+    metrics = model.val(data=args.data, imgsz=args.imgsz, split="val", conf=0.001, plots=False,
+                        device=args.device, verbose=False)
+    box = metrics.box
+    names = {int(k): v for k, v in metrics.names.items()}
+
+    picked = pick_thresholds(np.asarray(box.px), np.asarray(box.p_curve), np.asarray(box.r_curve),
+                             np.asarray(box.f1_curve), box.ap_class_index, names, args.min_recall)
+
+    print(f"{'class':<18} {'conf':>6} {'P':>6} {'R':>6} {'F1':>6}")
+    for name, t in picked.items():
+        print(f"{name:<18} {t['conf']:>6.3f} {t['precision']:>6.3f} {t['recall']:>6.3f} {t['f1']:>6.3f}")
+
+    if args.write:
+        thresholds = app_config.get("class_thresholds", {})
+        for name, t in picked.items():
+            thresholds.setdefault(name, {})["conf"] = t["conf"]  # 기존 iou 설정은 유지
+        app_config["class_thresholds"] = thresholds
+        config.save_config(app_config)
+        print(f"saved to {config.CONFIG_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,12 +10,12 @@ else:
     print("Could not open Camera 0 (might not exist or busy).")
 
 print("\nTrying to search for cameras WHILE camera 0 is open (should find fewer or none if exclusive)...")
-found = CameraManager.get_available_cameras()
+found = CameraManager.get_available_cameras(refresh=True)
 print(f"Cameras found during conflict: {found}")
 
 print("\nReleasing Camera 0...")
 cam0.release()
 
 print("\nTrying to search after release (should find camera 0)...")
-found_after = CameraManager.get_available_cameras()
+found_after = CameraManager.get_available_cameras(refresh=True)
 print(f"Cameras found after release: {found_after}")